@@ -0,0 +1,428 @@
+"""
+Benchmark Module
+Times the gesture, face and render stages on a replayable frame source.
+
+Usage:
+    python -m gesture_mode.benchmark --source rekaman.mp4 --frames 300
+    python -m gesture_mode.benchmark --source synthetic --mode all
+    python -m gesture_mode.benchmark --source rekaman.mp4 --mode keyframe --keyframe-rate 12
+    python -m gesture_mode.benchmark --source rekaman.mp4 --quality-budget 33
+    python -m gesture_mode.benchmark --source rekaman.mp4 --mode filter --save-trajectory lintasan.npz
+    python -m gesture_mode.benchmark --mode filter --trajectory lintasan.npz --latency 80
+"""
+import argparse
+import time
+
+import numpy as np
+
+from .frame_packet import BufferPool, FramePacket
+from .frame_source import create_source
+
+
+def _summary(name, samples):
+    """Format timing samples (seconds) as a one-line report."""
+    if not samples:
+        return f"{name:<10} no samples"
+    ordered = sorted(samples)
+    mean = sum(ordered) / len(ordered)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"{name:<10} mean {mean * 1000:7.2f} ms   p95 {p95 * 1000:7.2f} ms   n={len(ordered)}"
+
+
+def run_sequential(source, max_frames, backend="solutions", roi_tracking=False, quality_budget_ms=None,
+                   motion_gate=False):
+    """
+    Run the current single-threaded pipeline over a source.
+
+    Args:
+        source: Unopened FrameSource
+        max_frames: Maximum number of frames to process
+        backend: MediaPipe landmark backend ("solutions" or "tasks")
+        roi_tracking: Run hand inference on the tracked crop (HandRoiTracker)
+        quality_budget_ms: Let a QualityGovernor adapt the detectors to this
+                           hand + face budget (level changes are printed)
+        motion_gate: Reuse landmarks on static frames (skip ratio and reuse
+                     error are printed)
+
+    Returns:
+        Dict of stage name -> list of per-frame durations in seconds
+    """
+    # Import di sini agar --help tetap jalan tanpa MediaPipe
+    from .face_detection import FaceDetector
+    from .hand_gesture import HandGestureDetector
+    from .glasses_renderer import GlassesRenderer
+    from .quality import QualityGovernor
+
+    gesture_detector = HandGestureDetector(backend=backend, roi_tracking=roi_tracking, motion_gate=motion_gate)
+    face_detector = FaceDetector(backend=backend, motion_gate=motion_gate)
+    face_detector.detection_interval = 0  # benchmark every frame
+    renderer = GlassesRenderer()
+    pool = BufferPool()
+    governor = QualityGovernor(budget_ms=quality_budget_ms) if quality_budget_ms else None
+
+    timings = {"hand": [], "face": [], "render": [], "total": []}
+    if not source.open():
+        raise RuntimeError("Could not open frame source.")
+    try:
+        while len(timings["total"]) < max_frames:
+            ret, frame = source.read()
+            if not ret:
+                break
+            packet = FramePacket(frame, mirror=True, pool=pool)
+
+            t0 = time.perf_counter()
+            gesture_detector.process_frame(packet)
+            t1 = time.perf_counter()
+            _, face_data = face_detector.detect_face(packet)
+            t2 = time.perf_counter()
+            renderer.render(packet, face_data, "Rectangle", "Black")
+            t3 = time.perf_counter()
+
+            if governor is not None:
+                level = governor.observe((t2 - t0) * 1000, packet.timestamp)
+                if level is not None:
+                    print(f"frame {len(timings['total'])}: quality -> {level.name}")
+                    gesture_detector.apply_quality(level)
+                    face_detector.apply_quality(level)
+
+            timings["hand"].append(t1 - t0)
+            timings["face"].append(t2 - t1)
+            timings["render"].append(t3 - t2)
+            timings["total"].append(t3 - t0)
+    finally:
+        source.release()
+        if gesture_detector.roi_tracker:
+            print(gesture_detector.roi_tracker.report())
+        print(renderer.sprites.report())
+        if governor is not None:
+            print(governor.report())
+        if motion_gate:
+            print(f"hand {gesture_detector.motion_gate.report()}")
+            print(f"face {face_detector.motion_gate.report()}")
+        gesture_detector.release()
+        face_detector.release()
+    return timings
+
+
+def run_parallel(source, max_frames, pipelined=False, slots=4, backend="solutions"):
+    """
+    Run hand and face inference in worker processes (ParallelInference).
+
+    Args:
+        source: Unopened FrameSource
+        max_frames: Maximum number of frames to process
+        pipelined: If True keep up to ``slots`` frames in flight instead of
+                   waiting for each frame before submitting the next one
+        slots: Shared-memory ring size
+        backend: MediaPipe landmark backend used by the workers
+
+    Returns:
+        Dict of stage name -> list of per-frame durations in seconds.
+        "total" is the submit-to-result latency of each frame; "interval"
+        is the time between consecutive finished frames (1 / throughput).
+    """
+    from .glasses_renderer import GlassesRenderer
+    from .parallel_inference import ParallelInference
+
+    renderer = GlassesRenderer()
+    # Mirrored frames stay alive until rendered: one buffer per ring slot plus one
+    pool = BufferPool(depth=slots + 1)
+    timings = {"render": [], "total": [], "interval": []}
+    if not source.open():
+        raise RuntimeError("Could not open frame source.")
+
+    parallel = None
+    frames = {}
+    submitted = {}
+    last_done = None
+
+    def finish(results):
+        nonlocal last_done
+        for frame_id, _, (_, face_data) in results:
+            done = time.perf_counter()
+            t0 = time.perf_counter()
+            renderer.render(frames.pop(frame_id), face_data, "Rectangle", "Black")
+            timings["render"].append(time.perf_counter() - t0)
+            timings["total"].append(done - submitted.pop(frame_id))
+            if last_done is not None:
+                timings["interval"].append(done - last_done)
+            last_done = done
+
+    try:
+        count = 0
+        while count < max_frames:
+            ret, frame = source.read()
+            if not ret:
+                break
+            frame = FramePacket(frame, mirror=True, pool=pool).bgr
+            if parallel is None:
+                parallel = ParallelInference(frame.shape, slots=slots, backend=backend)
+                parallel.process(frame)  # warm-up: graph start-up is not measured
+
+            frame_id = parallel.submit(frame)
+            while frame_id is None:
+                finish(parallel.collect(timeout=5.0))
+                frame_id = parallel.submit(frame)
+            frames[frame_id] = frame
+            submitted[frame_id] = time.perf_counter()
+            count += 1
+
+            if not pipelined:
+                while frame_id in frames:
+                    finish(parallel.collect(timeout=5.0))
+            else:
+                finish(parallel.collect())
+
+        while parallel is not None and frames:
+            finish(parallel.collect(timeout=5.0))
+    finally:
+        source.release()
+        if parallel is not None:
+            parallel.close()
+    return timings
+
+
+def run_keyframe(source, max_frames, keyframe_rate=12, backend="solutions"):
+    """
+    Compare keyframe inference (with extrapolation) against full-rate inference.
+
+    Both detector pairs see the same frames with replay timestamps
+    (frame index / fps), so the error is measured on identical input.
+
+    Args:
+        source: Unopened FrameSource (a recorded clip)
+        max_frames: Maximum number of frames to process
+        keyframe_rate: Keyframes per second for the keyframe detectors
+        backend: MediaPipe landmark backend
+
+    Returns:
+        Dict of stage name -> list of per-frame durations in seconds, plus
+        an "errors" dict with per-frame cursor / eye-centre errors in pixels
+    """
+    from .face_detection import FaceDetector
+    from .hand_gesture import HandGestureDetector
+
+    full_hand = HandGestureDetector(draw_landmarks=False, backend=backend)
+    full_face = FaceDetector(backend=backend)
+    full_face.detection_interval = 0
+    key_hand = HandGestureDetector(draw_landmarks=False, backend=backend, keyframe_rate=keyframe_rate)
+    key_face = FaceDetector(backend=backend, keyframe_rate=keyframe_rate)
+
+    pool = BufferPool()
+    timings = {"full": [], "keyframe": []}
+    errors = {"cursor": [], "eye_center": [], "eyes_distance": [], "hand_presence": 0, "gesture": 0}
+    if not source.open():
+        raise RuntimeError("Could not open frame source.")
+    try:
+        while len(timings["full"]) < max_frames:
+            ret, frame = source.read()
+            if not ret:
+                break
+            timestamp = len(timings["full"]) / (source.fps or 30)
+            packet = FramePacket(frame, mirror=True, pool=pool, timestamp=timestamp)
+            packet.rgb  # konversi dibagi kedua jalur, jadi tidak ikut diukur
+
+            t0 = time.perf_counter()
+            _, full_gesture, full_cursor = full_hand.process_frame(packet)
+            _, full_data = full_face.detect_face(packet)
+            t1 = time.perf_counter()
+            _, key_gesture, key_cursor = key_hand.process_frame(packet)
+            _, key_data = key_face.detect_face(packet)
+            t2 = time.perf_counter()
+            timings["full"].append(t1 - t0)
+            timings["keyframe"].append(t2 - t1)
+
+            if (full_cursor is None) != (key_cursor is None):
+                errors["hand_presence"] += 1
+            elif full_cursor is not None:
+                errors["cursor"].append(float(np.hypot(full_cursor[0] - key_cursor[0], full_cursor[1] - key_cursor[1])))
+            if full_gesture != key_gesture:
+                errors["gesture"] += 1
+            if full_data and key_data:
+                (fx, fy), (kx, ky) = full_data["dimensions"]["eye_center"], key_data["dimensions"]["eye_center"]
+                errors["eye_center"].append(float(np.hypot(fx - kx, fy - ky)))
+                errors["eyes_distance"].append(abs(full_data["dimensions"]["eyes_distance"]
+                                                   - key_data["dimensions"]["eyes_distance"]))
+    finally:
+        source.release()
+        for detector in (full_hand, full_face, key_hand, key_face):
+            detector.release()
+
+    frames = len(timings["full"])
+    print(f"keyframes  hand {key_hand.keyframes}/{frames}   face {key_face.keyframes}/{frames}")
+    for name in ("cursor", "eye_center", "eyes_distance"):
+        print(_error_summary(name, errors[name]))
+    print(f"{'mismatch':<10} hand presence {errors['hand_presence']}   gesture {errors['gesture']}   (frames)")
+    timings["errors"] = errors
+    return timings
+
+
+def record_trajectories(source, max_frames, backend="solutions"):
+    """
+    Raw (unfiltered) cursor and glasses anchors of every frame of a clip.
+
+    Args:
+        source: Unopened FrameSource (a recorded clip)
+        max_frames: Maximum number of frames to process
+        backend: MediaPipe landmark backend
+
+    Returns:
+        Dict with "times" (N,), "cursor" (N, 2) and "face" (N, 4, 2) arrays;
+        rows without a detection are NaN
+    """
+    from .face_detection import FaceDetector
+    from .hand_gesture import HandGestureDetector
+
+    hand = HandGestureDetector(draw_landmarks=False, backend=backend, cursor_filter=False)
+    face = FaceDetector(backend=backend, anchor_filter=False)
+    face.detection_interval = 0
+    pool = BufferPool()
+    times, cursor, anchors = [], [], []
+    if not source.open():
+        raise RuntimeError("Could not open frame source.")
+    try:
+        while len(times) < max_frames:
+            ret, frame = source.read()
+            if not ret:
+                break
+            timestamp = len(times) / (source.fps or 30)
+            packet = FramePacket(frame, mirror=True, pool=pool, timestamp=timestamp)
+            _, _, position = hand.process_frame(packet)
+            _, face_data = face.detect_face(packet)
+            times.append(timestamp)
+            cursor.append((np.nan, np.nan) if position is None else hand.points[8, :2] * (packet.width, packet.height))
+            anchors.append(np.full((4, 2), np.nan) if face_data is None else face._anchors)
+    finally:
+        source.release()
+        hand.release()
+        face.release()
+    return {"times": np.array(times), "cursor": np.array(cursor, np.float64), "face": np.array(anchors, np.float64)}
+
+
+class _LegacyEma:
+    """The fixed cursor EMA (factor 0.5) that OneEuroFilter replaced, for comparison."""
+
+    def __init__(self, factor=0.5):
+        self.factor = factor
+        self.value = None
+
+    def reset(self):
+        self.value = None
+
+    def __call__(self, timestamp, value, horizon=0.0):
+        value = np.asarray(value, np.float64)
+        self.value = value if self.value is None else self.factor * value + (1 - self.factor) * self.value
+        return self.value
+
+
+def run_filter(trajectories, latency_ms=60.0):
+    """
+    Offline jitter/lag report of the cursor and face anchor filters.
+
+    Args:
+        trajectories: Output of ``record_trajectories`` (or the same arrays
+                      loaded from a saved .npz)
+        latency_ms: Capture-to-display latency the prediction should hide
+
+    Returns:
+        Dict of (signal, variant) -> evaluate_filter result
+    """
+    from .filters import FILTER_PRESETS, create_filter, evaluate_filter
+
+    results = {}
+    print(f"{'signal':<8} {'filter':<16} {'jitter':>9} {'lag':>9}   samples")
+    for signal in ("cursor", "face"):
+        values = trajectories[signal]
+        samples = [None if np.isnan(v).any() else v for v in values]
+        prediction = FILTER_PRESETS[signal]["prediction"]
+        variants = [("raw", None, 0.0)]
+        if signal == "cursor":
+            variants.append(("ema 0.5 (old)", _LegacyEma, 0.0))
+        variants += [("one-euro", lambda: create_filter(signal)[0], 0.0),
+                     (f"+predict {prediction:.0%}", lambda: create_filter(signal)[0],
+                      latency_ms / 1000 * prediction)]
+        for name, make_filter, horizon in variants:
+            result = evaluate_filter(trajectories["times"], samples, make_filter, horizon)
+            results[signal, name] = result
+            print(f"{signal:<8} {name:<16} {result['jitter_px']:6.2f} px {result['lag_ms']:6.1f} ms   {result['samples']}")
+    return results
+
+
+def _error_summary(name, samples):
+    """Format pixel errors as a one-line report."""
+    if not samples:
+        return f"{name:<14} no samples"
+    ordered = sorted(samples)
+    mean = sum(ordered) / len(ordered)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"{name:<14} mean {mean:6.2f} px   p95 {p95:6.2f} px   max {ordered[-1]:6.2f} px"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the virtual try-on pipeline.")
+    parser.add_argument("--source", default="synthetic",
+                        help="camera index, video file, image folder or 'synthetic'")
+    parser.add_argument("--frames", type=int, default=300, help="number of frames to process")
+    parser.add_argument("--realtime", action="store_true",
+                        help="pace replay at its frame rate instead of as fast as possible")
+    parser.add_argument("--mode", choices=("sequential", "parallel", "pipelined", "keyframe", "filter", "all"),
+                        default="sequential",
+                        help="inference path to benchmark (keyframe: error report against full rate, "
+                             "filter: cursor/face filter jitter and lag)")
+    parser.add_argument("--backend", choices=("solutions", "tasks"), default="solutions",
+                        help="MediaPipe landmark backend")
+    parser.add_argument("--roi", action="store_true",
+                        help="track the hand and run inference on a small crop (sequential mode)")
+    parser.add_argument("--quality-budget", type=float, default=None, metavar="MS",
+                        help="adapt detector quality to this hand + face budget (sequential mode)")
+    parser.add_argument("--motion-gate", action="store_true",
+                        help="skip inference on static frames and reuse landmarks (sequential mode)")
+    parser.add_argument("--keyframe-rate", type=float, default=12,
+                        help="keyframes per second for --mode keyframe")
+    parser.add_argument("--latency", type=float, default=60, metavar="MS",
+                        help="capture-to-display latency to predict over (--mode filter)")
+    parser.add_argument("--save-trajectory", default=None, metavar="NPZ",
+                        help="store the raw cursor/face trajectories of --mode filter")
+    parser.add_argument("--trajectory", default=None, metavar="NPZ",
+                        help="evaluate the filters on saved trajectories instead of running the models")
+    args = parser.parse_args(argv)
+
+    if args.mode == "filter":
+        if args.trajectory:
+            with np.load(args.trajectory) as data:
+                trajectories = {name: data[name] for name in ("times", "cursor", "face")}
+        else:
+            trajectories = record_trajectories(create_source(args.source, realtime=False), args.frames,
+                                               backend=args.backend)
+            if args.save_trajectory:
+                np.savez_compressed(args.save_trajectory, **trajectories)
+        run_filter(trajectories, args.latency)
+        return
+
+    modes = ("sequential", "parallel", "pipelined") if args.mode == "all" else (args.mode,)
+    print(f"Source: {args.source}")
+    for mode in modes:
+        source = create_source(args.source, realtime=args.realtime)
+        print(f"\n[{mode}]")
+        if mode == "sequential":
+            timings = run_sequential(source, args.frames, backend=args.backend, roi_tracking=args.roi,
+                                     quality_budget_ms=args.quality_budget, motion_gate=args.motion_gate)
+        elif mode == "keyframe":
+            timings = run_keyframe(source, args.frames, args.keyframe_rate, backend=args.backend)
+            del timings["errors"]
+            if sum(timings["full"]) > 0:
+                print(f"{'cpu':<10} {sum(timings['keyframe']) / sum(timings['full']):7.0%} of full-rate inference time")
+        else:
+            timings = run_parallel(source, args.frames, pipelined=(mode == "pipelined"), backend=args.backend)
+
+        for name, samples in timings.items():
+            print(_summary(name, samples))
+        steps = timings.get("interval") or timings.get("total", [])
+        wall = sum(steps)
+        frames_done = len(steps)
+        if wall > 0:
+            print(f"{'throughput':<10} {frames_done / wall:7.1f} fps")
+
+
+if __name__ == "__main__":
+    main()
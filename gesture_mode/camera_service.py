@@ -0,0 +1,232 @@
+"""
+Camera Service Module
+Owns the camera device and shares the latest frame with every kiosk screen.
+"""
+import threading
+import time
+
+import cv2
+
+from .frame_source import CameraSource
+
+
+class CameraService:
+    """
+    Reads the camera on a background thread into a single latest-frame slot.
+
+    Screens subscribe when they are shown and unsubscribe when hidden. The
+    device stays open while anyone is subscribed (and for a short grace
+    period afterwards), so switching screens never reopens the camera and
+    the Tk thread never blocks on ``cap.read()``.
+    """
+
+    def __init__(self, source_factory=None,
+                 stall_timeout=2.0, reconnect_delay=1.0, max_reconnect_delay=30.0, idle_release=30.0):
+        """
+        Initialize the camera service.
+
+        Args:
+            source_factory: Callable returning a new, unopened FrameSource.
+                            Defaults to the kiosk camera (index 1, then 0,
+                            via DirectShow)
+            stall_timeout: Seconds without a frame before the device is reopened
+            reconnect_delay: Seconds to wait between reconnect attempts
+            max_reconnect_delay: Upper bound for the delay, which doubles after
+                                 every failed attempt to open the device
+            idle_release: Seconds without subscribers before the device is released
+        """
+        if source_factory is None:
+            source_factory = lambda: CameraSource(indices=(1, 0), api_preference=cv2.CAP_DSHOW)
+        self.source_factory = source_factory
+        self.stall_timeout = stall_timeout
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.idle_release = idle_release
+
+        # Latest-frame slot (dilindungi oleh lock)
+        self._lock = threading.Lock()
+        self._frame = None
+        self._frame_id = 0
+        self._timestamp = 0.0
+
+        self._wakeup = threading.Condition(self._lock)
+        self._new_frame = threading.Condition(self._lock)
+        self._subscribers = set()
+        self._last_unsubscribe = 0.0
+        self._generation = 0
+        self._supervisor = None
+        self._running = False
+
+        # Status for the UI
+        self.connected = False
+        self.reconnects = 0
+        self.open_failures = 0
+        self._failed_opens = 0  # Berturut-turut, untuk backoff
+        self.source = None
+
+    # ------------------------------------------------------------------
+    # Subscription
+    # ------------------------------------------------------------------
+    def subscribe(self, subscriber):
+        """Register a consumer and make sure the capture thread is running."""
+        with self._lock:
+            self._subscribers.add(subscriber)
+            self._wakeup.notify_all()
+        self.start()
+
+    def unsubscribe(self, subscriber):
+        """Remove a consumer. The device is kept open for ``idle_release`` seconds."""
+        with self._lock:
+            self._subscribers.discard(subscriber)
+            if not self._subscribers:
+                self._last_unsubscribe = time.monotonic()
+
+    def start(self):
+        """Start the supervisor thread if it is not running yet."""
+        if self._running:
+            return
+        self._running = True
+        self._supervisor = threading.Thread(target=self._supervise, daemon=True)
+        self._supervisor.start()
+
+    def stop(self):
+        """Stop capturing and release the device."""
+        with self._lock:
+            self._running = False
+            self._generation += 1
+            self._wakeup.notify_all()
+        if self._supervisor is not None:
+            self._supervisor.join(timeout=self.stall_timeout)
+            self._supervisor = None
+        self.connected = False
+
+    # ------------------------------------------------------------------
+    # Frame access (dipanggil dari thread Tk)
+    # ------------------------------------------------------------------
+    def read_latest(self, since_id=0):
+        """
+        Return the newest frame if it is newer than ``since_id``.
+
+        Args:
+            since_id: Frame id the caller has already consumed
+
+        Returns:
+            Tuple (frame_id, timestamp, frame) or None if nothing new.
+            ``timestamp`` is ``time.monotonic()`` at capture. The frame must
+            be treated as read-only because other screens share it.
+        """
+        with self._lock:
+            if self._frame is None or self._frame_id <= since_id:
+                return None
+            return self._frame_id, self._timestamp, self._frame
+
+    def wait_for_frame(self, since_id=0, timeout=None):
+        """
+        Block until a frame newer than ``since_id`` is available.
+
+        Meant for worker threads; the Tk thread should use ``read_latest``.
+
+        Args:
+            since_id: Frame id the caller has already consumed
+            timeout: Maximum seconds to wait (None = forever)
+
+        Returns:
+            Tuple (frame_id, timestamp, frame) or None on timeout
+        """
+        with self._lock:
+            self._new_frame.wait_for(lambda: self._frame is not None and self._frame_id > since_id,
+                                     timeout=timeout)
+            if self._frame is None or self._frame_id <= since_id:
+                return None
+            return self._frame_id, self._timestamp, self._frame
+
+    # ------------------------------------------------------------------
+    # Device handling (background threads)
+    # ------------------------------------------------------------------
+    def _wants_device(self):
+        """True while someone is subscribed or the idle grace period is running."""
+        if self._subscribers:
+            return True
+        return time.monotonic() - self._last_unsubscribe < self.idle_release
+
+    def _supervise(self):
+        """Keep one reader thread alive and replace it when the device stalls."""
+        reader = None
+        retired = None  # Reader lama yang belum tentu sudah melepas device
+        while True:
+            with self._lock:
+                if not self._running:
+                    break
+                if not self._wants_device():
+                    # Tidak ada yang menonton: lepaskan kamera dan tunggu subscriber
+                    self._generation += 1
+                    self.connected = False
+                    if reader is not None:
+                        retired, reader = reader, None
+                    self._wakeup.wait(timeout=1.0)
+                    continue
+                last_timestamp = self._timestamp
+                generation = self._generation
+
+            if reader is None or not reader.is_alive():
+                if reader is not None:
+                    self.reconnects += 1
+                    # Device gagal dibuka berulang kali: jeda digandakan sampai max_reconnect_delay
+                    time.sleep(min(self.reconnect_delay * 2 ** min(self._failed_opens, 10), self.max_reconnect_delay))
+                if retired is not None:
+                    # Satu handle per device (V4L2 menolak handle kedua): tunggu reader lama
+                    # melepas source-nya sendiri. Jika read() masih tertahan, reader ditinggal;
+                    # open yang gagal diulang dengan backoff sampai handle lama lepas
+                    retired.join(timeout=self.stall_timeout)
+                    if retired.is_alive():
+                        print("⚠️ Reader kamera lama tidak merespons, device dibuka ulang tanpa menunggu.")
+                    retired = None
+                reader = threading.Thread(target=self._read_loop,
+                                          args=(generation,), daemon=True)
+                reader.start()
+                reader_started = time.monotonic()
+            elif self.connected and time.monotonic() - max(last_timestamp, reader_started) > self.stall_timeout:
+                # Frame macet (misalnya kabel dicabut): reader lama diberi sinyal lewat
+                # generation dan melepas source-nya sendiri; release dari thread ini saat
+                # read() tertahan tidak aman di native code (DSHOW/MSMF)
+                print("⚠️ Kamera macet, mencoba menyambung ulang...")
+                with self._lock:
+                    self._generation += 1
+                    self.connected = False
+                self.reconnects += 1
+                retired, reader = reader, None
+                continue
+
+            time.sleep(0.1)
+
+    def _read_loop(self, generation):
+        """Read frames until the source fails or this reader is superseded."""
+        # Setiap reader memakai objek source sendiri dan hanya reader itu yang
+        # membuka, membaca dan melepasnya
+        source = self.source_factory()
+        if not source.open():
+            source.release()
+            self.open_failures += 1
+            self._failed_opens += 1
+            print(f"⚠️ Kamera gagal dibuka (percobaan ke-{self._failed_opens}).")
+            return
+        self._failed_opens = 0
+        self.source = source
+        self.connected = True
+        try:
+            while self._generation == generation:
+                ret, frame = source.read()
+                if not ret:
+                    print("⚠️ Gagal membaca frame dari kamera.")
+                    break
+                with self._lock:
+                    if self._generation != generation:
+                        break
+                    self._frame = frame
+                    self._frame_id += 1
+                    self._timestamp = source.timestamp
+                    self._new_frame.notify_all()
+        finally:
+            source.release()
+            if self._generation == generation:
+                self.connected = False
@@ -0,0 +1,114 @@
+"""
+Canvas Scene Module
+Retained-mode overlay layer for Tk canvases.
+"""
+
+
+class CanvasScene:
+    """
+    Keeps one canvas item per key and only touches items whose state changed.
+
+    Screens describe their overlay every tick with ``item()`` (or one of the
+    shape helpers). The first call for a key creates the canvas item; later
+    calls compare the new coordinates and options against the cached ones
+    and issue ``coords``/``itemconfig`` only for the differences. After
+    ``freeze()`` no new keys can be added, so the number of canvas items
+    owned by the scene stays constant for the rest of the session.
+    """
+
+    def __init__(self, canvas):
+        """
+        Initialize the scene.
+
+        Args:
+            canvas: The tk.Canvas to draw on
+        """
+        self.canvas = canvas
+        self.items = {}
+        self._coords = {}
+        self._options = {}
+        self.frozen = False
+
+        # Jumlah item yang benar-benar diubah pada tick terakhir
+        self.touched = 0
+
+    def begin_frame(self):
+        """Reset the per-tick change counter."""
+        self.touched = 0
+
+    def freeze(self):
+        """Forbid creating new items; the item count is fixed from now on."""
+        self.frozen = True
+
+    def item(self, key, kind, coords, **options):
+        """
+        Create or update the item stored under ``key``.
+
+        Args:
+            key: Stable name of the item within this scene
+            kind: Canvas item type ("rectangle", "oval", "text", "line",
+                  "polygon" or "image")
+            coords: Flat sequence of coordinates
+            **options: Item options (fill, outline, text, image, state, ...)
+
+        Returns:
+            The canvas item id
+        """
+        coords = tuple(coords)
+        options.setdefault("state", "normal")
+
+        item_id = self.items.get(key)
+        if item_id is None:
+            if self.frozen:
+                raise RuntimeError(f"Scene is frozen; cannot create new item '{key}'")
+            item_id = getattr(self.canvas, f"create_{kind}")(*coords, **options)
+            self.items[key] = item_id
+            self._coords[key] = coords
+            self._options[key] = dict(options)
+            self.touched += 1
+            return item_id
+
+        changed = False
+        if coords != self._coords[key]:
+            self.canvas.coords(item_id, *coords)
+            self._coords[key] = coords
+            changed = True
+
+        cached = self._options[key]
+        diff = {name: value for name, value in options.items() if cached.get(name) != value}
+        if diff:
+            self.canvas.itemconfig(item_id, **diff)
+            cached.update(diff)
+            changed = True
+
+        if changed:
+            self.touched += 1
+        return item_id
+
+    def hide(self, key):
+        """Hide an existing item without deleting it."""
+        item_id = self.items.get(key)
+        if item_id is not None and self._options[key].get("state") != "hidden":
+            self.canvas.itemconfig(item_id, state="hidden")
+            self._options[key]["state"] = "hidden"
+            self.touched += 1
+
+    def rounded_rect(self, key, x1, y1, x2, y2, radius, **options):
+        """Create or update a smoothed polygon shaped like a rounded rectangle."""
+        points = [x1+radius, y1, x2-radius, y1, x2, y1, x2, y1+radius, x2, y2-radius, x2, y2,
+                  x2-radius, y2, x1+radius, y2, x1, y2, x1, y2-radius, x1, y1+radius, x1, y1]
+        options.setdefault("smooth", True)
+        return self.item(key, "polygon", points, **options)
+
+    def item_count(self):
+        """Number of canvas items owned by this scene."""
+        return len(self.items)
+
+    def clear(self):
+        """Delete every item owned by the scene and unfreeze it."""
+        for item_id in self.items.values():
+            self.canvas.delete(item_id)
+        self.items.clear()
+        self._coords.clear()
+        self._options.clear()
+        self.frozen = False
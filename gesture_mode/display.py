@@ -0,0 +1,209 @@
+"""
+Display Module
+Low-cost camera-to-canvas path: crop first, scale once, reuse one Tk image.
+"""
+import time
+from functools import lru_cache
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from .frame_packet import FramePacket
+from .remap import fused_remap
+
+# MediaPipe hand topology (21 landmarks), same as mp.solutions.hands.HAND_CONNECTIONS
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (17, 18), (18, 19), (19, 20),
+    (0, 17),
+)
+_BONES = np.array(HAND_CONNECTIONS)
+
+
+class DisplayGeometry:
+    """Cover-fit crop and scale from a source frame to a canvas."""
+
+    def __init__(self, src_w, src_h, dst_w, dst_h):
+        """
+        Compute the crop rectangle (in source pixels) and the scale factors.
+
+        Args:
+            src_w: Source frame width
+            src_h: Source frame height
+            dst_w: Canvas width
+            dst_h: Canvas height
+        """
+        self.src_size = (src_w, src_h)
+        self.dst_size = (dst_w, dst_h)
+
+        # Skala "cover": gambar memenuhi canvas, sisanya dipotong
+        scale = max(dst_w / src_w, dst_h / src_h)
+        crop_w = min(src_w, max(1, int(round(dst_w / scale))))
+        crop_h = min(src_h, max(1, int(round(dst_h / scale))))
+        self.x0 = (src_w - crop_w) // 2
+        self.y0 = (src_h - crop_h) // 2
+        self.x1 = self.x0 + crop_w
+        self.y1 = self.y0 + crop_h
+
+        self.scale_x = dst_w / crop_w
+        self.scale_y = dst_h / crop_h
+
+        # Interpolasi murah: AREA hanya jika mengecilkan lebih dari 2x
+        if max(self.scale_x, self.scale_y) < 0.5:
+            self.interpolation = cv2.INTER_AREA
+        else:
+            self.interpolation = cv2.INTER_LINEAR
+
+    def map_point(self, point):
+        """
+        Map a point from source pixels to canvas pixels.
+
+        Args:
+            point: (x, y) in source frame coordinates, or None
+
+        Returns:
+            (x, y) in canvas coordinates, or None
+        """
+        if point is None:
+            return None
+        x, y = point
+        return ((x - self.x0) * self.scale_x, (y - self.y0) * self.scale_y)
+
+    def map_points(self, points):
+        """Map an (N, 2) array of source-frame points to canvas pixels."""
+        points = np.asarray(points, np.float64).reshape(-1, 2)
+        return (points - (self.x0, self.y0)) * (self.scale_x, self.scale_y)
+
+
+@lru_cache(maxsize=16)
+def cover_geometry(src_w, src_h, dst_w, dst_h):
+    """Return the cached DisplayGeometry for a (source size, canvas size) pair."""
+    return DisplayGeometry(src_w, src_h, dst_w, dst_h)
+
+
+class CameraDisplay:
+    """
+    Converts BGR camera frames into a persistent Tk image for one canvas.
+
+    The crop is taken as a view of the source frame, resized straight into a
+    preallocated buffer, converted to RGB into a second preallocated buffer,
+    and pasted into the same ``PhotoImage`` every frame.
+
+    With ``mirror`` or a ``calibration`` the crop and resize are replaced by a
+    single FusedRemap pass over the raw (unmirrored) frame that also mirrors
+    and undistorts; ``map_point`` then maps through the same transform.
+    """
+
+    def __init__(self, width, height, calibration=None, mirror=False):
+        """
+        Initialize the display path.
+
+        Args:
+            width: Canvas width in pixels
+            height: Canvas height in pixels
+            calibration: CameraCalibration for lens undistortion (optional)
+            mirror: Show the raw frame mirrored (done inside the remap)
+        """
+        self.width = width
+        self.height = height
+        self.calibration = calibration
+        self.mirror = mirror
+        self.use_remap = mirror or calibration is not None
+        self.geometry = None
+        self.photo = None
+
+        # Buffer dipakai ulang setiap frame
+        self._resized = np.empty((height, width, 3), np.uint8)
+        self._rgb = np.empty((height, width, 3), np.uint8)
+
+        # Per-frame cost (milliseconds)
+        self.last_cost_ms = 0.0
+        self.avg_cost_ms = 0.0
+
+    def prepare(self, frame):
+        """
+        Crop, scale and colour-convert a BGR frame into the RGB buffer.
+
+        Args:
+            frame: FramePacket or BGR frame from the camera. In remap mode
+                   a packet's raw frame is used (the remap mirrors itself).
+
+        Returns:
+            The RGB buffer (height x width x 3). It is overwritten next frame.
+        """
+        if isinstance(frame, FramePacket):
+            frame = frame.raw if self.use_remap else frame.bgr
+        src_h, src_w = frame.shape[:2]
+
+        if self.use_remap:
+            # Satu pass: undistort + mirror + crop + scale
+            self.geometry = fused_remap(src_w, src_h, self.width, self.height, self.calibration, self.mirror)
+            self.geometry.apply(frame, dst=self._resized)
+            cv2.cvtColor(self._resized, cv2.COLOR_BGR2RGB, dst=self._rgb)
+            return self._rgb
+
+        geometry = cover_geometry(src_w, src_h, self.width, self.height)
+        self.geometry = geometry
+
+        crop = frame[geometry.y0:geometry.y1, geometry.x0:geometry.x1]
+        cv2.resize(crop, (self.width, self.height), dst=self._resized,
+                   interpolation=geometry.interpolation)
+        cv2.cvtColor(self._resized, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        return self._rgb
+
+    def draw_hand(self, rgb, landmarks):
+        """
+        Draw a hand skeleton onto the prepared RGB buffer.
+
+        Args:
+            rgb: Buffer returned by ``prepare``
+            landmarks: (21, 3) normalized landmark array (or MediaPipe hand
+                       landmarks), relative to the source frame
+        """
+        if not isinstance(landmarks, np.ndarray):
+            landmarks = np.array([(lm.x, lm.y, lm.z) for lm in landmarks.landmark], np.float32)
+        src_w, src_h = self.geometry.src_size
+        canvas = self.geometry.map_points(landmarks[:, :2] * (src_w, src_h)).astype(np.int32)
+
+        # Semua tulang dalam satu panggilan polylines
+        cv2.polylines(rgb, list(canvas[_BONES]), False, (255, 255, 255), 2)
+        for point in canvas.tolist():
+            cv2.circle(rgb, tuple(point), 3, (255, 0, 0), -1)
+
+    def update(self, frame, hand_landmarks=None):
+        """
+        Push a BGR frame into the persistent Tk image.
+
+        Args:
+            frame: FramePacket or BGR frame from the camera
+            hand_landmarks: Optional (21, 3) landmark array (or MediaPipe
+                            landmarks) to draw on top
+
+        Returns:
+            The ``ImageTk.PhotoImage`` (the same object every call)
+        """
+        from PIL import ImageTk  # butuh Tk; diimpor di sini agar modul bisa dipakai headless
+
+        start = time.perf_counter()
+        rgb = self.prepare(frame)
+        if hand_landmarks is not None:
+            self.draw_hand(rgb, hand_landmarks)
+        image = Image.frombuffer("RGB", (self.width, self.height), rgb, "raw", "RGB", 0, 1)
+        if self.photo is None:
+            self.photo = ImageTk.PhotoImage(image)
+        else:
+            self.photo.paste(image)
+
+        self.last_cost_ms = (time.perf_counter() - start) * 1000
+        self.avg_cost_ms = 0.9 * self.avg_cost_ms + 0.1 * self.last_cost_ms if self.avg_cost_ms else self.last_cost_ms
+        return self.photo
+
+    def map_point(self, point):
+        """Map a source-frame point to canvas coordinates using the last geometry."""
+        if self.geometry is None:
+            return None
+        return self.geometry.map_point(point)
@@ -0,0 +1,66 @@
+"""
+Dwell Module
+Hover-and-hold button logic, independent of the UI toolkit and of the wall clock.
+"""
+import time
+
+# Detik hover default sebelum tombol terpicu
+DWELL_TIME = 1.5
+
+
+class DwellButton:
+    """
+    A button that fires after the cursor has hovered over it for ``duration`` seconds.
+
+    The caller does the hit test and passes the result to ``update`` every
+    frame. Time comes from ``clock`` (default ``time.monotonic``); a replay
+    injects a ManualClock so recorded sessions can be run faster than real
+    time. Once fired the button stays triggered until ``reset``.
+    """
+
+    def __init__(self, duration=DWELL_TIME, clock=time.monotonic):
+        """
+        Args:
+            duration: Seconds of continuous hovering that trigger the button
+            clock: Callable returning the current time in seconds
+        """
+        self.duration = duration
+        self.clock = clock
+        self.reset()
+
+    def reset(self):
+        """Back to idle (not hovered, not triggered)."""
+        self.started = None
+        self.triggered = False
+        self.fired = False
+
+    @property
+    def active(self):
+        """True while the cursor is hovering and the button has not fired yet."""
+        return self.started is not None and not self.triggered
+
+    def update(self, hovering):
+        """
+        Advance one frame.
+
+        Args:
+            hovering: True if the cursor is on the button (with the right gesture)
+
+        Returns:
+            Progress from 0 to 1 (1 once triggered). ``fired`` is True only
+            on the frame the button triggers.
+        """
+        self.fired = False
+        if self.triggered:
+            return 1.0
+        if not hovering:
+            self.started = None
+            return 0.0
+        now = self.clock()
+        if self.started is None:
+            self.started = now
+        progress = min((now - self.started) / self.duration, 1.0)
+        if progress >= 1.0:
+            self.triggered = True
+            self.fired = True
+        return progress
@@ -2,72 +2,241 @@
 Face Detection Module
 Detects face landmarks for placing glasses.
 """
-import cv2
 import mediapipe as mp
 import numpy as np
 import time
+from .frame_packet import as_packet
+from .landmark_backend import create_face_backend
+from .keyframe import KeyframeClock, LandmarkExtrapolator
+from .face_tracker import FaceKeypointTracker
+from .motion_gate import MotionGate, points_roi
+from .tracks import ActiveUserSelector, TrackManager, landmark_box
+from .filters import create_filter
+
+# Landmark Face Mesh yang dipakai untuk menempatkan kacamata
+ANCHORS = {
+    "left_eye": 33,
+    "right_eye": 263,
+    "nose_tip": 4,
+    "nose_bridge": 168,
+}
+
+# Dahi, dagu, dan kedua pipi: kotak wajah untuk tracking multi-user
+_BOX_LANDMARKS = (10, 152, 234, 454)
 
 class FaceDetector:
     """Detects facial landmarks using MediaPipe Face Mesh."""
     
-    def __init__(self):
-        """Initialize the face detector."""
+    def __init__(self, backend="solutions", keyframe_rate=None, tracking=False, refine_landmarks=True,
+                 inference_scale=1.0, motion_gate=False, max_faces=1, active_policy="largest",
+                 anchor_filter=True, latency=None):
+        """
+        Initialize the face detector.
+
+        Args:
+            backend: "solutions" (blocking FaceMesh) or "tasks" (asynchronous
+                     FaceLandmarker, see landmark_backend)
+            keyframe_rate: Run the model this many times per second and
+                           extrapolate the glasses anchors in between
+                           (None = return the cached result in between)
+            tracking: Follow the glasses anchors with optical flow and re-run
+                      Face Mesh only on a timer, high flow residual or track
+                      loss (see FaceKeypointTracker). Replaces keyframe_rate.
+            refine_landmarks: Run the iris refinement model (solutions backend)
+            inference_scale: Downscale factor for the frame given to the model
+            motion_gate: Skip Face Mesh and reuse the last result while
+                         nothing moves around the face (see MotionGate)
+            max_faces: Faces to detect; above 1 every face gets a stable
+                       track ID and the glasses follow only the active user
+            active_policy: How the active face is chosen (see tracks.POLICIES)
+            anchor_filter: Smooth the glasses anchors with a One-Euro filter
+                           (FILTER_PRESETS["face"]) so the glasses don't shimmer
+            latency: LatencyEstimator of the capture-to-display latency; the
+                     anchors are predicted part of it ahead
+        """
+        if tracking and keyframe_rate:
+            raise ValueError("Use either keyframe_rate or tracking, not both.")
         # Initialize MediaPipe Face Mesh
         self.mp_face_mesh = mp.solutions.face_mesh
         self.mp_drawing = mp.solutions.drawing_utils
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
-            static_image_mode=False,
-            max_num_faces=1,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5,
-            refine_landmarks=True
-        )
+        self.backend_name = backend
+        self.refine_landmarks = refine_landmarks
+        self.inference_scale = inference_scale
+        self.max_faces = max_faces
+        self.backend = self._create_backend()
         
         # For performance optimization
-        self.last_detection_time = 0
+        self.last_detection_time = None
         self.detection_interval = 0.03  # seconds (30 fps)
         
+        # Keyframe mode: anchor mata/hidung diekstrapolasi di antara deteksi
+        self.extrapolator = LandmarkExtrapolator() if keyframe_rate else None
+        self.keyframe_clock = KeyframeClock(keyframe_rate) if keyframe_rate else None
+        self.frames = 0
+        self.keyframes = 0
+        
+        # Optical-flow tracking anchor di antara run Face Mesh
+        self.tracker = FaceKeypointTracker() if tracking else None
+        
+        # Motion gate: Face Mesh dilewati selama area wajah tidak berubah
+        self.motion_gate = MotionGate() if motion_gate else None
+        self.motion_reused = False  # True jika frame terakhir dilewati motion gate (model tidak jalan)
+        self._anchors = None
+        
+        # Multi-user: track ID per wajah; active_box (dinormalisasi) bisa dipakai
+        # HandGestureDetector.active_face_box untuk memilih tangan milik wajah ini
+        self.face_tracks = TrackManager() if max_faces > 1 else None
+        self.user_selector = ActiveUserSelector(active_policy) if max_faces > 1 else None
+        self.active_track_id = None
+        self.active_box = None
+        
+        # Anchor kacamata di-filter sebelum face_data dibuat (_anchors tetap mentah)
+        self.anchor_filter, self.anchor_prediction = create_filter("face") if anchor_filter else (None, 0.0)
+        self.latency = latency
+        
         # Store previous results for stability
         self.prev_landmarks = None
         self.prev_face_data = None
         
-    def detect_face(self, frame):
+    def _create_backend(self):
+        return create_face_backend(
+            self.backend_name,
+            max_num_faces=self.max_faces,
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5,
+            refine_landmarks=self.refine_landmarks
+        )
+
+    def apply_quality(self, level):
+        """
+        Switch to a QualityLevel (see quality.QualityGovernor).
+
+        Toggling iris refinement rebuilds the (blocking) solutions graph. In
+        tracking mode the level's keyframe rate is ignored: optical flow
+        already covers the frames between Face Mesh runs.
+
+        Args:
+            level: QualityLevel to use from the next frame on
+        """
+        self.inference_scale = level.inference_scale
+        if level.refine_landmarks != self.refine_landmarks and not self.backend.asynchronous:
+            self.refine_landmarks = level.refine_landmarks
+            self.backend.close()
+            self.backend = self._create_backend()
+        if self.tracker is not None:
+            return
+        if level.keyframe_rate is None:
+            self.keyframe_clock = self.extrapolator = None
+        elif self.keyframe_clock is None or self.keyframe_clock.interval != 1.0 / level.keyframe_rate:
+            self.keyframe_clock = KeyframeClock(level.keyframe_rate)
+            self.extrapolator = LandmarkExtrapolator()
+
+    def detect_face(self, frame, timestamp=None):
         """
         Detect face landmarks in a frame.
         
         Args:
-            frame: BGR frame from the camera
+            frame: FramePacket or BGR frame from the camera
+            timestamp: Capture time in seconds (default: the packet's
+                       timestamp, else ``time.monotonic()``)
             
         Returns:
             A tuple containing (landmarks, face_data)
         """
+        # RGB view for MediaPipe (shared with the hand detector when given a packet)
+        packet = as_packet(frame)
+        h, w = packet.height, packet.width
+        if timestamp is None:
+            timestamp = packet.timestamp
+        current_time = time.monotonic() if timestamp is None else timestamp
+        self.frames += 1
+        self.motion_reused = False
+        
+        # Tracking mode: anchor diikuti dengan optical flow selama track masih bagus
+        if self.tracker is not None and self.tracker.active:
+            anchors = self.tracker.track(packet.bgr, current_time)
+            if anchors is not None:
+                self._anchors = anchors
+                self.prev_face_data = self._publish(anchors, current_time)
+                return self.prev_landmarks, self.prev_face_data
+        
+        # Keyframe mode: di antara keyframe, anchor diekstrapolasi
+        if self.keyframe_clock is not None and not self.keyframe_clock.due(current_time):
+            anchors = self.extrapolator.predict(current_time)
+            if anchors is not None and self.prev_face_data is not None:
+                return self.prev_landmarks, self._publish(anchors, current_time)
+            return self.prev_landmarks, self.prev_face_data
+        
         # Check if enough time has passed for new detection
-        current_time = time.time()
-        if current_time - self.last_detection_time < self.detection_interval:
+        if (self.keyframe_clock is None and self.tracker is None and self.last_detection_time is not None
+                and current_time - self.last_detection_time < self.detection_interval):
             return self.prev_landmarks, self.prev_face_data
             
         self.last_detection_time = current_time
         
-        # Convert BGR to RGB for MediaPipe
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, _ = frame.shape
+        previous = None
+        if self.motion_gate is not None:
+            # Anchor hanya mata/hidung: padding lebar agar seluruh kepala ikut diawasi
+            roi = points_roi(self._anchors / (w, h), padding=1.0) if self._anchors is not None else None
+            if not self.motion_gate.check(packet, roi, current_time):
+                self.motion_reused = True
+                if self.extrapolator is not None and self._anchors is not None:
+                    self.extrapolator.update(current_time, self._anchors)
+                return self.prev_landmarks, self.prev_face_data
+            if self.motion_gate.auditing and self.prev_face_data is not None:
+                previous = self.prev_face_data["dimensions"]["eye_center"]
+        audit = self.motion_gate is not None and self.motion_gate.auditing
+        self.keyframes += 1
         
         # Process the frame with MediaPipe
-        results = self.face_mesh.process(rgb_frame)
+        multi_face_landmarks = self.backend.detect(packet.scaled_rgb(self.inference_scale), current_time * 1000)
         
-        if not results.multi_face_landmarks:
+        landmarks = multi_face_landmarks[0] if multi_face_landmarks else None
+        if self.face_tracks is not None:
+            landmarks = self._select_active(multi_face_landmarks or [], current_time)
+        
+        if landmarks is None:
+            if audit and previous is not None:
+                self.motion_gate.record_audit(None)
+            # Wajah hilang: cache lama tidak boleh muncul lagi di frame berikutnya
+            self.clear()
             return None, None
             
-        # Get the first detected face
-        landmarks = results.multi_face_landmarks[0]
         self.prev_landmarks = landmarks
         
         # Convert landmarks to pixel coordinates
-        face_data = self._extract_face_data(landmarks, w, h)
+        anchors = self._anchors = self._anchor_points(landmarks, w, h)
+        if self.extrapolator is not None:
+            self.extrapolator.update(current_time, anchors)
+        if self.tracker is not None:
+            self.tracker.start(packet.bgr, anchors, current_time)
+        face_data = self._publish(anchors, current_time)
+        if audit:
+            # Seberapa jauh hasil reuse dari hasil Face Mesh yang baru
+            if previous is None:
+                self.motion_gate.record_audit(None)
+            else:
+                eye_center = face_data["dimensions"]["eye_center"]
+                self.motion_gate.record_audit(np.hypot(eye_center[0] - previous[0], eye_center[1] - previous[1]))
         self.prev_face_data = face_data
         
         return landmarks, face_data
     
+    def _select_active(self, multi_face_landmarks, timestamp):
+        """Track every face and return the active user's landmarks (or None)."""
+        boxes = [landmark_box(face, _BOX_LANDMARKS) for face in multi_face_landmarks]
+        tracks = self.face_tracks.update(boxes, timestamp)
+        active = self.user_selector.select(tracks, timestamp)
+        if active is None:
+            return None
+        if active.track_id != self.active_track_id:
+            # Wajah lain menjadi user aktif: kecepatan ekstrapolasi lama tidak berlaku
+            self.active_track_id = active.track_id
+            if self.extrapolator is not None:
+                self.extrapolator.reset()
+        self.active_box = active.box
+        return multi_face_landmarks[tracks.index(active)]
+    
     def _extract_face_data(self, landmarks, img_width, img_height):
         """
         Extract useful face data from landmarks.
@@ -80,20 +249,24 @@ class FaceDetector:
         Returns:
             Dictionary containing face dimensions and key points
         """
-        # Convert normalized coordinates to pixel coordinates
-        points = {}
-        
-        # Eyes
-        points["left_eye"] = (int(landmarks.landmark[33].x * img_width),
-                             int(landmarks.landmark[33].y * img_height))
-        points["right_eye"] = (int(landmarks.landmark[263].x * img_width),
-                              int(landmarks.landmark[263].y * img_height))
-        
-        # Nose
-        points["nose_tip"] = (int(landmarks.landmark[4].x * img_width),
-                             int(landmarks.landmark[4].y * img_height))
-        points["nose_bridge"] = (int(landmarks.landmark[168].x * img_width),
-                                int(landmarks.landmark[168].y * img_height))
+        return self._face_data_from_anchors(self._anchor_points(landmarks, img_width, img_height))
+    
+    def _anchor_points(self, landmarks, img_width, img_height):
+        """Pixel positions (float) of the ANCHORS landmarks as a (4, 2) array."""
+        return np.array([(landmarks.landmark[index].x * img_width, landmarks.landmark[index].y * img_height)
+                         for index in ANCHORS.values()])
+    
+    def _publish(self, anchors, timestamp):
+        """face_data for this frame's anchors, after the anchor filter."""
+        if self.anchor_filter is not None:
+            horizon = self.latency.horizon * self.anchor_prediction if self.latency is not None else 0.0
+            anchors = self.anchor_filter(timestamp, anchors, horizon)
+        return self._face_data_from_anchors(anchors)
+    
+    def _face_data_from_anchors(self, anchors):
+        """Build the face_data dictionary from a (4, 2) anchor array."""
+        # Convert to integer pixel coordinates
+        points = {name: (int(x), int(y)) for name, (x, y) in zip(ANCHORS, anchors.tolist())}
         
         # Calculate face dimensions
         dimensions = {}
@@ -106,6 +279,24 @@ class FaceDetector:
             "dimensions": dimensions
         }
         
+    @property
+    def anchors(self):
+        """Unfiltered (4, 2) glasses anchors in pixels of the last face, or None."""
+        return self._anchors
+
+    def clear(self):
+        """Forget the cached face, the extrapolation and the optical-flow track."""
+        self.prev_landmarks = None
+        self.prev_face_data = None
+        self._anchors = None
+        self.active_box = None
+        if self.anchor_filter is not None:
+            self.anchor_filter.reset()
+        if self.extrapolator is not None:
+            self.extrapolator.reset()
+        if self.tracker is not None:
+            self.tracker.reset()
+        
     def release(self):
         """Release resources."""
-        pass
+        self.backend.close()
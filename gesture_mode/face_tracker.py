@@ -0,0 +1,149 @@
+"""
+Face Tracker Module
+Follows the glasses anchor points between Face Mesh runs with pyramidal
+Lucas-Kanade optical flow on a small grayscale region around the face.
+"""
+import cv2
+import numpy as np
+
+
+class FaceKeypointTracker:
+    """
+    Propagates a few face key points from frame to frame.
+
+    After ``start`` (called with points from a full Face Mesh run) each
+    ``track`` call crops the same region from the previous and the current
+    frame, converts it to grayscale at ``roi_size`` pixels wide and runs
+    ``cv2.calcOpticalFlowPyrLK`` forwards and backwards. ``track`` returns
+    None, meaning "run Face Mesh again", when the refresh timer expires, when
+    the forward-backward residual is too high or when a point is lost.
+    """
+
+    def __init__(self, refresh_interval=0.5, max_residual=2.0, roi_size=192, margin=1.2):
+        """
+        Initialize the tracker.
+
+        Args:
+            refresh_interval: Seconds after which Face Mesh is re-run anyway
+            max_residual: Largest mean forward-backward error (full-frame
+                          pixels) that still counts as a good track
+            roi_size: Width and height of the grayscale region given to LK
+            margin: Padding around the points, as a multiple of their spread
+        """
+        self.refresh_interval = refresh_interval
+        self.max_residual = max_residual
+        self.roi_size = roi_size
+        self.margin = margin
+        self.lk_params = dict(
+            winSize=(15, 15),
+            maxLevel=2,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03),
+        )
+
+        self._prev_roi = np.empty((roi_size, roi_size), np.uint8)
+        self._next_roi = np.empty((roi_size, roi_size), np.uint8)
+        self._small = np.empty((roi_size, roi_size, 3), np.uint8)
+        self.reset()
+
+        # Statistik
+        self.tracked = 0
+        self.refreshes = {"timer": 0, "residual": 0, "lost": 0}
+        self.last_residual = 0.0
+
+    def reset(self):
+        """Drop the track (the next frame needs Face Mesh)."""
+        self.points = None
+        self.rect = None
+        self.started_at = None
+
+    @property
+    def active(self):
+        return self.points is not None
+
+    def start(self, frame, points, timestamp):
+        """
+        Begin tracking from points found by Face Mesh on ``frame``.
+
+        Args:
+            frame: BGR frame the points belong to
+            points: (N, 2) full-frame pixel coordinates
+            timestamp: Frame time in seconds
+        """
+        self.points = np.asarray(points, np.float32).reshape(-1, 2)
+        self.started_at = timestamp
+        self.rect = self._rect_around(self.points, frame.shape)
+        self._crop_gray(frame, self.rect, self._prev_roi)
+
+    def track(self, frame, timestamp):
+        """
+        Move the points onto ``frame``.
+
+        Args:
+            frame: Current BGR frame
+            timestamp: Frame time in seconds
+
+        Returns:
+            (N, 2) full-frame pixel coordinates, or None if Face Mesh must run
+        """
+        if self.points is None:
+            return None
+        if timestamp - self.started_at >= self.refresh_interval:
+            return self._lose("timer")
+
+        x0, y0, side = self.rect
+        scale = self.roi_size / side
+        self._crop_gray(frame, self.rect, self._next_roi)
+
+        prev_pts = ((self.points - (x0, y0)) * scale).astype(np.float32).reshape(-1, 1, 2)
+        next_pts, status, _ = cv2.calcOpticalFlowPyrLK(self._prev_roi, self._next_roi, prev_pts, None, **self.lk_params)
+        if next_pts is None or not status.all():
+            return self._lose("lost")
+        back_pts, back_status, _ = cv2.calcOpticalFlowPyrLK(self._next_roi, self._prev_roi, next_pts, None, **self.lk_params)
+        if back_pts is None or not back_status.all():
+            return self._lose("lost")
+
+        # Residual maju-mundur dalam piksel frame penuh
+        residual = float(np.linalg.norm(back_pts - prev_pts, axis=-1).mean()) / scale
+        self.last_residual = residual
+        if residual > self.max_residual:
+            return self._lose("residual")
+
+        points = next_pts.reshape(-1, 2) / scale + (x0, y0)
+        frame_h, frame_w = frame.shape[:2]
+        if (points < 0).any() or (points[:, 0] >= frame_w).any() or (points[:, 1] >= frame_h).any():
+            return self._lose("lost")
+
+        # Region baru mengikuti titik; crop frame ini menjadi referensi frame berikutnya
+        self.points = points.astype(np.float32)
+        self.rect = self._rect_around(self.points, frame.shape)
+        self._crop_gray(frame, self.rect, self._prev_roi)
+        self.tracked += 1
+        return self.points.copy()
+
+    def _lose(self, reason):
+        self.refreshes[reason] += 1
+        self.reset()
+        return None
+
+    def _rect_around(self, points, shape):
+        """Square (x0, y0, side) around the points, kept inside the frame."""
+        frame_h, frame_w = shape[:2]
+        center = (points.min(axis=0) + points.max(axis=0)) / 2
+        spread = float((points.max(axis=0) - points.min(axis=0)).max())
+        side = int(min(max(spread * (1 + 2 * self.margin), 32), frame_w, frame_h))
+        x0 = int(min(max(center[0] - side / 2, 0), frame_w - side))
+        y0 = int(min(max(center[1] - side / 2, 0), frame_h - side))
+        return (x0, y0, side)
+
+    def _crop_gray(self, frame, rect, out):
+        """Crop ``rect`` from a BGR frame into ``out`` as roi_size x roi_size grayscale."""
+        x0, y0, side = rect
+        # Kecilkan dulu, baru grayscale: konversi warna hanya pada roi_size^2 piksel
+        cv2.resize(frame[y0:y0 + side, x0:x0 + side], (self.roi_size, self.roi_size), dst=self._small,
+                   interpolation=cv2.INTER_AREA if side > self.roi_size else cv2.INTER_LINEAR)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=out)
+
+    def report(self):
+        """One-line summary of the tracker statistics."""
+        refreshes = " ".join(f"{name} {count}" for name, count in self.refreshes.items())
+        return f"tracked {self.tracked} | refresh {refreshes} | residual {self.last_residual:.2f} px"
@@ -0,0 +1,247 @@
+"""
+Filters Module
+Adaptive One-Euro smoothing with short-horizon prediction for the cursor and
+the face anchors, plus an offline jitter/lag evaluation.
+"""
+import time
+
+import numpy as np
+
+# Parameter per sinyal (satuan piksel kamera). min_cutoff: Hz saat diam (kecil =
+# lebih halus), beta: kenaikan cutoff per px/s (besar = lag lebih kecil saat cepat),
+# prediction: bagian dari latency capture->display yang ditebak ke depan.
+FILTER_PRESETS = {
+    "cursor": {"min_cutoff": 0.8, "beta": 0.02, "d_cutoff": 2.0, "prediction": 0.5},
+    "face": {"min_cutoff": 0.5, "beta": 0.01, "d_cutoff": 2.0, "prediction": 0.5},
+}
+
+
+def _alpha(dt, cutoff):
+    # Faktor EMA untuk low-pass orde satu dengan frekuensi cutoff (Hz) pada langkah dt
+    return 1.0 / (1.0 + 1.0 / (2.0 * np.pi * cutoff * dt))
+
+
+class OneEuroFilter:
+    """
+    One-Euro filter over an array of points (any shape, last axis = x, y).
+
+    A low-pass filter whose cutoff rises with the filtered speed: at rest
+    the cutoff is ``min_cutoff`` and jitter is suppressed, on fast moves it
+    grows by ``beta`` per pixel/second so the lag stays small. Every point
+    gets its own cutoff from its own speed. The filtered velocity also
+    feeds an optional constant-velocity prediction ``horizon`` seconds
+    ahead, which hides part of the pipeline latency.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=0.0, d_cutoff=1.0, predict_speed=150.0, max_gap=0.5):
+        """
+        Initialize the filter.
+
+        Args:
+            min_cutoff: Cutoff frequency at rest (Hz)
+            beta: Cutoff increase per unit/second of speed
+            d_cutoff: Cutoff frequency of the velocity estimate (Hz)
+            predict_speed: Speed (units/second) around which prediction
+                           switches on; slower points are barely predicted
+            max_gap: Samples further apart than this (seconds) restart the
+                     filter instead of being blended
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.predict_speed = predict_speed
+        self.max_gap = max_gap
+        self.reset()
+
+    def reset(self):
+        """Forget the signal (the next sample is passed through)."""
+        self.time = None
+        self.value = None
+        self.velocity = None
+
+    def __call__(self, timestamp, value, horizon=0.0):
+        """
+        Filter one sample.
+
+        Args:
+            timestamp: Sample time in seconds
+            value: Array of points (shape must stay the same between calls)
+            horizon: Seconds to predict ahead along the filtered velocity
+
+        Returns:
+            Filtered (and predicted) array, a new float64 array
+        """
+        value = np.asarray(value, np.float64)
+        dt = None if self.time is None else timestamp - self.time
+        if self.value is None or self.value.shape != value.shape or dt > self.max_gap:
+            self.time = timestamp
+            self.value = value.copy()
+            self.velocity = np.zeros_like(value)
+            return value.copy()
+        if dt <= 0:
+            return self.predict(horizon)
+
+        # Kecepatan dari sampel baru terhadap nilai terfilter, di-low-pass dengan d_cutoff
+        self.velocity += _alpha(dt, self.d_cutoff) * ((value - self.value) / dt - self.velocity)
+        speed = np.abs(self.velocity) if value.ndim == 0 else np.linalg.norm(self.velocity, axis=-1, keepdims=True)
+        self.value += _alpha(dt, self.min_cutoff + self.beta * speed) * (value - self.value)
+        self.time = timestamp
+        return self.predict(horizon)
+
+    def predict(self, horizon=0.0):
+        """
+        Filtered value moved ``horizon`` seconds along the filtered velocity (a new array).
+
+        The prediction fades in with speed (full above about
+        ``predict_speed``), so velocity noise does not shake a resting point.
+        """
+        if self.value is None:
+            return None
+        if horizon <= 0:
+            return self.value.copy()
+        speed2 = (self.velocity * self.velocity if self.value.ndim == 0
+                  else np.sum(self.velocity * self.velocity, axis=-1, keepdims=True))
+        weight = speed2 / (speed2 + self.predict_speed * self.predict_speed)
+        return self.value + self.velocity * (horizon * weight)
+
+
+def create_filter(signal, **overrides):
+    """
+    Build a OneEuroFilter with the FILTER_PRESETS parameters of a signal.
+
+    Args:
+        signal: Key of FILTER_PRESETS ("cursor" or "face")
+        **overrides: Parameters to change
+
+    Returns:
+        Tuple (filter, prediction) where ``prediction`` is the fraction of
+        the measured latency to predict ahead
+    """
+    params = dict(FILTER_PRESETS[signal], **overrides)
+    prediction = params.pop("prediction")
+    return OneEuroFilter(**params), prediction
+
+
+class LatencyEstimator:
+    """
+    Running estimate of the capture-to-display latency of results.
+
+    The display side calls ``displayed`` when a result is first shown; the
+    filtering side reads ``horizon`` to predict that far ahead. The
+    estimate is an EMA, capped at ``max_horizon`` so a stall cannot make
+    the prediction overshoot.
+    """
+
+    def __init__(self, smoothing=0.1, max_horizon=0.1):
+        """
+        Args:
+            smoothing: EMA weight of a new measurement
+            max_horizon: Largest horizon handed out (seconds)
+        """
+        self.smoothing = smoothing
+        self.max_horizon = max_horizon
+        self.latency = None
+        self._last_id = None
+
+    def displayed(self, result_id, capture_time, now=None):
+        """
+        Record that a result is on screen.
+
+        Args:
+            result_id: Identifier of the result (e.g. frame id); repeats of
+                       the last one are ignored
+            capture_time: Capture timestamp of the result's frame (seconds,
+                          ``time.monotonic`` clock)
+            now: Display time (default: ``time.monotonic()``)
+        """
+        if result_id == self._last_id or capture_time is None:
+            return
+        self._last_id = result_id
+        self.observe((time.monotonic() if now is None else now) - capture_time)
+
+    def observe(self, latency):
+        """Add one latency measurement in seconds."""
+        if latency < 0:
+            return
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.smoothing * (latency - self.latency)
+
+    @property
+    def horizon(self):
+        """Latency to predict ahead (seconds), 0 until measured."""
+        return 0.0 if self.latency is None else min(self.latency, self.max_horizon)
+
+
+def _centered_mean(values, radius):
+    """Zero-phase moving average along axis 0 (edges use the available samples)."""
+    kernel = np.ones(2 * radius + 1)
+    counts = np.convolve(np.ones(len(values)), kernel, mode="same")
+    return np.stack([np.convolve(values[:, i], kernel, mode="same") for i in range(values.shape[1])], 1) / counts[:, None]
+
+
+def evaluate_filter(times, values, make_filter, horizon=0.0, radius=3, rest_speed=30.0):
+    """
+    Jitter and lag of a filter on a recorded trajectory.
+
+    Needs no ground truth. The reference is a zero-phase (centered)
+    moving average of the raw signal. Jitter is the RMS of what the
+    output adds on top of its own centered average while the reference is
+    at rest: frame-to-frame shake in pixels. Lag is the time shift, in milliseconds, that best lines the
+    output's velocity up with the reference velocity (sub-frame by
+    parabolic interpolation; positive = late, negative = ahead).
+
+    Args:
+        times: N sample times in seconds
+        values: Sequence of N point arrays, or None where nothing was detected
+        make_filter: Callable returning a fresh filter ``f(t, value, horizon)``
+                     with ``reset()``, or None to evaluate the raw signal
+        horizon: Prediction horizon passed to the filter
+        radius: Half width of the centered reference window in samples
+        rest_speed: Reference speed (units/second per point) below which
+                    a sample counts as at rest for the jitter
+
+    Returns:
+        Dict with "jitter_px", "lag_ms" and "samples"
+    """
+    filt = make_filter() if make_filter is not None else None
+    raw, out, stamps = [], [], []
+    for t, value in zip(times, values):
+        if value is None:
+            # Deteksi hilang: filter mulai dari awal, seperti di detektor
+            if filt is not None:
+                filt.reset()
+            continue
+        raw.append(np.asarray(value, np.float64).reshape(-1))
+        out.append(raw[-1] if filt is None else np.asarray(filt(t, value, horizon), np.float64).reshape(-1))
+        stamps.append(t)
+    if len(out) < 4 * radius + 3:
+        return {"jitter_px": 0.0, "lag_ms": 0.0, "samples": len(out)}
+    raw, out = np.array(raw), np.array(out)
+    inner = slice(radius, len(out) - radius)
+    points = out.shape[1] // 2 or 1
+    dt = float(np.median(np.diff(stamps)))
+
+    # Jitter diukur saat diam (kecepatan referensi rendah); gerakan asli bukan jitter
+    reference = _centered_mean(raw, radius)
+    speed = np.linalg.norm(np.gradient(reference, axis=0), axis=1) / (dt * points)
+    shake = (out - _centered_mean(out, radius))[inner][speed[inner] < rest_speed]
+    jitter = float(np.sqrt(np.sum(shake * shake) / (len(shake) * points))) if len(shake) else 0.0
+
+    # Lag: pergeseran (dalam sampel) dengan korelasi kecepatan terbesar
+    reference_v = np.diff(reference, axis=0)[inner]
+    out_v = np.diff(out, axis=0)[inner]
+    shifts = np.arange(-6, 11)
+    scores = []
+    for shift in shifts:
+        a = reference_v[max(0, -shift):len(reference_v) - max(0, shift)]
+        b = out_v[max(0, shift):len(out_v) - max(0, -shift)]
+        scores.append(float(np.sum(a * b)) / max(len(a), 1))
+    best = int(np.argmax(scores))
+    offset = 0.0
+    if 0 < best < len(scores) - 1:
+        left, mid, right = scores[best - 1], scores[best], scores[best + 1]
+        denominator = left - 2 * mid + right
+        offset = 0.5 * (left - right) / denominator if denominator else 0.0
+    return {"jitter_px": jitter, "lag_ms": (shifts[best] + offset) * dt * 1000, "samples": len(out)}
@@ -0,0 +1,165 @@
+"""
+Frame Packet Module
+One camera frame plus its derived images (mirrored, RGB, downscaled, gray),
+each computed at most once and written into reusable buffers.
+"""
+import cv2
+import numpy as np
+
+
+class BufferPool:
+    """
+    Reusable output buffers, keyed by name, shape and dtype.
+
+    Each key owns a small ring of ``depth`` buffers, so the buffers of the
+    previous ``depth - 1`` packets stay valid while a new packet is filled.
+    A pool is not thread-safe: give every thread its own pool.
+    """
+
+    def __init__(self, depth=2):
+        """
+        Initialize an empty pool.
+
+        Args:
+            depth: Number of buffers per key (= packets that may be alive at once)
+        """
+        self.depth = depth
+        self._rings = {}
+        self.allocations = 0
+
+    def take(self, name, shape, dtype=np.uint8):
+        """
+        Return the next buffer for ``name`` with the given shape and dtype.
+
+        The buffer is allocated on first use and then recycled; its contents
+        are whatever the packet ``depth`` takes ago left in it.
+        """
+        key = (name, tuple(shape), np.dtype(dtype))
+        ring = self._rings.get(key)
+        if ring is None:
+            ring = self._rings[key] = [[None] * self.depth, 0]
+        buffers, index = ring
+        ring[1] = (index + 1) % self.depth
+        if buffers[index] is None:
+            buffers[index] = np.empty(shape, dtype)
+            self.allocations += 1
+        return buffers[index]
+
+
+class FramePacket:
+    """
+    A BGR camera frame with lazily computed, memoized views.
+
+    ``bgr`` is the frame everything downstream works on: the mirrored frame
+    when ``mirror`` is set, otherwise the raw frame itself (so drawing on it
+    draws on the caller's array, as before). ``rgb``, ``small`` and ``gray``
+    are derived from ``bgr`` on first access and cached for the packet's
+    lifetime. With a ``BufferPool`` none of them allocate in steady state.
+    """
+
+    def __init__(self, frame, mirror=False, pool=None, timestamp=None, frame_id=None, small_width=320):
+        """
+        Wrap a frame.
+
+        Args:
+            frame: BGR frame (height x width x 3, uint8)
+            mirror: Flip horizontally (the kiosk shows a mirror image)
+            pool: BufferPool supplying output buffers (None = allocate)
+            timestamp: Capture time in seconds
+            frame_id: Id assigned by the CameraService
+            small_width: Width of the ``small`` view; height keeps the aspect ratio
+        """
+        self.raw = frame
+        self.mirror = mirror
+        self.pool = pool
+        self.timestamp = timestamp
+        self.frame_id = frame_id
+        self.height, self.width = frame.shape[:2]
+        self.small_width = min(small_width, self.width)
+        self._cache = {}
+
+    @property
+    def shape(self):
+        return self.raw.shape
+
+    def _buffer(self, name, shape):
+        if self.pool is None:
+            return np.empty(shape, np.uint8)
+        return self.pool.take(name, shape)
+
+    @property
+    def mirrored(self):
+        """Horizontally flipped frame (BGR)."""
+        image = self._cache.get("mirrored")
+        if image is None:
+            image = cv2.flip(self.raw, 1, dst=self._buffer("mirrored", self.raw.shape))
+            self._cache["mirrored"] = image
+        return image
+
+    @property
+    def bgr(self):
+        """The working frame: ``mirrored`` if ``mirror`` is set, else ``raw``."""
+        return self.mirrored if self.mirror else self.raw
+
+    @property
+    def rgb(self):
+        """``bgr`` converted to RGB (what MediaPipe expects)."""
+        image = self._cache.get("rgb")
+        if image is None:
+            bgr = self.bgr
+            image = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=self._buffer("rgb", bgr.shape))
+            self._cache["rgb"] = image
+        return image
+
+    @property
+    def small(self):
+        """``bgr`` downscaled to ``small_width`` pixels wide."""
+        image = self._cache.get("small")
+        if image is None:
+            small_h = max(1, round(self.height * self.small_width / self.width))
+            image = self._buffer("small", (small_h, self.small_width, 3))
+            cv2.resize(self.bgr, (self.small_width, small_h), dst=image, interpolation=cv2.INTER_AREA)
+            self._cache["small"] = image
+        return image
+
+    def scaled_rgb(self, scale):
+        """
+        ``rgb`` resized by ``scale`` (the model input at reduced quality).
+
+        Returns ``rgb`` itself for a scale of 1 or more. Landmarks found in
+        the scaled image are normalized, so they apply to ``bgr`` unchanged.
+        """
+        if scale >= 1:
+            return self.rgb
+        key = ("scaled_rgb", scale)
+        image = self._cache.get(key)
+        if image is None:
+            scaled_w = max(1, round(self.width * scale))
+            scaled_h = max(1, round(self.height * scale))
+            image = self._buffer(f"rgb@{scale:g}", (scaled_h, scaled_w, 3))
+            cv2.resize(self.rgb, (scaled_w, scaled_h), dst=image, interpolation=cv2.INTER_AREA)
+            self._cache[key] = image
+        return image
+
+    @property
+    def gray(self):
+        """``bgr`` as a single-channel grayscale image."""
+        image = self._cache.get("gray")
+        if image is None:
+            image = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY, dst=self._buffer("gray", (self.height, self.width)))
+            self._cache["gray"] = image
+        return image
+
+    def invalidate(self):
+        """Forget derived views after ``bgr`` was drawn on (``mirrored`` is kept)."""
+        mirrored = self._cache.get("mirrored")
+        self._cache.clear()
+        if mirrored is not None:
+            self._cache["mirrored"] = mirrored
+
+
+def as_packet(frame):
+    """Return ``frame`` if it is already a FramePacket, else wrap the array."""
+    if isinstance(frame, FramePacket):
+        return frame
+    return FramePacket(frame)
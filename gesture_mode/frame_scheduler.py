@@ -0,0 +1,139 @@
+"""
+Frame Scheduler Module
+Deadline-driven replacement for a fixed ``after(33, ...)`` camera loop.
+"""
+import time
+
+
+class FrameScheduler:
+    """
+    Runs a Tk tick callback against a per-frame deadline.
+
+    Each tick is timed. The next tick is armed for the remainder of the
+    frame interval (not a fixed delay on top of the tick cost), missed
+    deadlines are skipped rather than queued up, and frames that are
+    dropped or arrive too old are counted.
+    """
+
+    def __init__(self, widget, tick, target_fps=30, max_frame_age=0.25):
+        """
+        Initialize the scheduler.
+
+        Args:
+            widget: Tk widget used for ``after``/``after_cancel``
+            tick: Callable run once per frame
+            target_fps: Target frame rate (frame deadline = 1 / target_fps)
+            max_frame_age: Frames captured longer ago than this (seconds) are stale
+        """
+        self.widget = widget
+        self.tick = tick
+        self.max_frame_age = max_frame_age
+        self.set_target_fps(target_fps)
+
+        self.running = False
+        self._after_id = None
+        self._deadline = 0.0
+        self.last_frame_id = 0
+
+        self.reset_stats()
+
+    def set_target_fps(self, target_fps):
+        """Change the frame deadline."""
+        self.target_fps = target_fps
+        self.frame_interval = 1.0 / target_fps
+
+    def reset_stats(self):
+        """Clear all counters."""
+        self.ticks = 0
+        self.late_ticks = 0
+        self.dropped_frames = 0
+        self.stale_frames = 0
+        self.last_tick_ms = 0.0
+        self.avg_tick_ms = 0.0
+        self.fps = 0.0
+        self._last_tick_start = None
+
+    def start(self):
+        """
+        Start ticking immediately.
+
+        Counters are per show: frames captured while the scheduler was
+        stopped (e.g. the screen was hidden) are not counted as dropped.
+        """
+        if self.running:
+            return
+        self.last_frame_id = 0
+        self.reset_stats()
+        self.running = True
+        self._deadline = time.monotonic()
+        self._after_id = self.widget.after(0, self._run)
+
+    def stop(self):
+        """Stop ticking and cancel the pending callback."""
+        self.running = False
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def poll(self, camera):
+        """
+        Fetch the newest frame from a capture service and account for it.
+
+        Frames that were overwritten before this tick saw them are counted
+        as dropped. A frame captured longer than ``max_frame_age`` ago is
+        counted as stale and skipped.
+
+        Args:
+            camera: Object with ``read_latest(since_id)`` (e.g. CameraService)
+
+        Returns:
+            Tuple (frame_id, timestamp, frame), or None if there is no fresh frame
+        """
+        latest = camera.read_latest(self.last_frame_id)
+        if latest is None:
+            return None
+
+        frame_id, timestamp, _ = latest
+        if self.last_frame_id and frame_id > self.last_frame_id + 1:
+            self.dropped_frames += frame_id - self.last_frame_id - 1
+        self.last_frame_id = frame_id
+
+        if time.monotonic() - timestamp > self.max_frame_age:
+            self.stale_frames += 1
+            return None
+        return latest
+
+    def _run(self):
+        """Run one tick and arm the next one for the remaining frame time."""
+        self._after_id = None
+        if not self.running:
+            return
+
+        start = time.monotonic()
+        if self._last_tick_start is not None:
+            period = start - self._last_tick_start
+            if period > 0:
+                self.fps = 0.9 * self.fps + 0.1 / period if self.fps else 1.0 / period
+        self._last_tick_start = start
+
+        try:
+            self.tick()
+        finally:
+            end = time.monotonic()
+            self.ticks += 1
+            self.last_tick_ms = (end - start) * 1000
+            self.avg_tick_ms = 0.9 * self.avg_tick_ms + 0.1 * self.last_tick_ms if self.avg_tick_ms else self.last_tick_ms
+
+            self._deadline += self.frame_interval
+            if end > self._deadline:
+                # Deadline terlewat: jangan menumpuk tick, mulai lagi dari sekarang
+                self.late_ticks += 1
+                self._deadline = end
+            if self.running:
+                delay_ms = max(1, int((self._deadline - end) * 1000))
+                self._after_id = self.widget.after(delay_ms, self._run)
+
+    def report(self):
+        """One-line summary of the scheduler statistics."""
+        return (f"fps {self.fps:.1f} | tick {self.avg_tick_ms:.1f} ms | late {self.late_ticks}/{self.ticks} "
+                f"| dropped {self.dropped_frames} | stale {self.stale_frames}")
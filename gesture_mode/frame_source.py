@@ -0,0 +1,315 @@
+"""
+Frame Source Module
+Pluggable frame sources: live camera, video file, image sequence and synthetic.
+"""
+import os
+import time
+
+import cv2
+import numpy as np
+
+
+class FrameSource:
+    """
+    Base class for frame sources.
+
+    Mirrors the small part of the ``cv2.VideoCapture`` interface the
+    application uses (``isOpened``, ``read``, ``release``) so a source can be
+    passed anywhere a capture object was used before.
+    """
+
+    def __init__(self, fps=30, realtime=True):
+        """
+        Initialize the source.
+
+        Args:
+            fps: Nominal frame rate, used for pacing replayed sources
+            realtime: If True replay sources sleep to match ``fps``;
+                      if False they return frames as fast as possible
+        """
+        self.fps = fps
+        self.realtime = realtime
+        self.frame_index = 0
+        self.timestamp = None  # time.monotonic() saat frame terakhir ditangkap
+        self._start_time = None
+
+    def open(self):
+        """Open the source. Returns True on success."""
+        raise NotImplementedError("Subclasses must implement open()")
+
+    def isOpened(self):
+        """Return True if the source can deliver frames."""
+        raise NotImplementedError("Subclasses must implement isOpened()")
+
+    def _read_frame(self):
+        """Return (ret, frame) for the next frame without pacing."""
+        raise NotImplementedError("Subclasses must implement _read_frame()")
+
+    def read(self):
+        """
+        Read the next frame and record its capture time in ``timestamp``.
+
+        Returns:
+            A tuple (ret, frame) like ``cv2.VideoCapture.read``
+        """
+        self._pace()
+        ret, frame = self._read_frame()
+        if ret:
+            self.frame_index += 1
+            self.timestamp = self._capture_time()
+        return ret, frame
+
+    def _capture_time(self):
+        """Capture time (``time.monotonic()`` clock) of the frame just read."""
+        return time.monotonic()
+
+    def release(self):
+        """Release resources held by the source."""
+        pass
+
+    def _pace(self):
+        """Sleep until the next frame is due when running in real time."""
+        if not self.realtime or not self.fps:
+            return
+        now = time.monotonic()
+        if self._start_time is None:
+            self._start_time = now
+            return
+        due = self._start_time + self.frame_index / self.fps
+        if due > now:
+            time.sleep(due - now)
+
+
+class CameraSource(FrameSource):
+    """Live camera source. The device itself paces the frames."""
+
+    def __init__(self, indices=(0,), api_preference=cv2.CAP_ANY,
+                 width=1280, height=720, fps=30):
+        """
+        Initialize the camera source.
+
+        Args:
+            indices: Camera indices to try, in order of preference
+            api_preference: OpenCV capture backend (e.g. ``cv2.CAP_DSHOW``)
+            width: Requested frame width
+            height: Requested frame height
+            fps: Requested frame rate
+        """
+        super().__init__(fps=fps, realtime=False)
+        self.indices = tuple(indices)
+        self.api_preference = api_preference
+        self.width = width
+        self.height = height
+        self.cap = None
+        self.device_index = None
+
+    def open(self):
+        for index in self.indices:
+            cap = cv2.VideoCapture(index, self.api_preference)
+            if cap is None or not cap.isOpened():
+                print(f"⚠️ Kamera index {index} gagal dibuka.")
+                continue
+
+            # FOURCC harus diset sebelum resolusi agar DirectShow memakai MJPG
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+            cap.set(cv2.CAP_PROP_FPS, self.fps)
+            # Buffer driver minimal supaya frame yang dibaca selalu yang terbaru
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+            self.cap = cap
+            self.device_index = index
+            print(f"✅ Kamera index {index} dibuka.")
+            return True
+        return False
+
+    def isOpened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def _read_frame(self):
+        if self.cap is None:
+            return False, None
+        return self.cap.read()
+
+    def _capture_time(self):
+        now = time.monotonic()
+        cap = self.cap
+        if cap is not None and cap.getBackendName() == "V4L2":
+            # V4L2 memberi timestamp buffer driver (ms, clock monotonic): tidak ikut
+            # menghitung waktu frame menunggu di buffer. Dipakai hanya jika masuk akal
+            captured = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            if 0.0 <= now - captured < 1.0:
+                return captured
+        return now
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class VideoFileSource(FrameSource):
+    """Replays a recorded video file."""
+
+    def __init__(self, path, realtime=True, loop=False, fps=None):
+        """
+        Initialize the video file source.
+
+        Args:
+            path: Path to the video file
+            realtime: Pace frames at the file's frame rate
+            loop: Restart from the beginning at the end of the file
+            fps: Override the frame rate stored in the file
+        """
+        super().__init__(fps=fps, realtime=realtime)
+        self.path = path
+        self.loop = loop
+        self.cap = None
+
+    def open(self):
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            return False
+        if not self.fps:
+            self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30
+        return True
+
+    def isOpened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def _read_frame(self):
+        if self.cap is None:
+            return False, None
+        ret, frame = self.cap.read()
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        return ret, frame
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class ImageSequenceSource(FrameSource):
+    """Replays a directory of images in file name order."""
+
+    EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+    def __init__(self, directory, fps=30, realtime=True, loop=False):
+        """
+        Initialize the image sequence source.
+
+        Args:
+            directory: Directory containing the frames
+            fps: Replay frame rate
+            realtime: Pace frames at ``fps``
+            loop: Restart from the first image after the last one
+        """
+        super().__init__(fps=fps, realtime=realtime)
+        self.directory = directory
+        self.loop = loop
+        self.files = []
+        self._position = 0
+
+    def open(self):
+        if not os.path.isdir(self.directory):
+            return False
+        self.files = sorted(
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.lower().endswith(self.EXTENSIONS)
+        )
+        self._position = 0
+        return bool(self.files)
+
+    def isOpened(self):
+        return bool(self.files)
+
+    def _read_frame(self):
+        if self._position >= len(self.files):
+            if not self.loop or not self.files:
+                return False, None
+            self._position = 0
+        frame = cv2.imread(self.files[self._position], cv2.IMREAD_COLOR)
+        self._position += 1
+        return frame is not None, frame
+
+    def release(self):
+        self.files = []
+
+
+class SyntheticSource(FrameSource):
+    """Generates a moving test pattern, useful on machines without a webcam."""
+
+    def __init__(self, width=1280, height=720, fps=30, realtime=True, num_frames=None):
+        """
+        Initialize the synthetic source.
+
+        Args:
+            width: Frame width
+            height: Frame height
+            fps: Frame rate
+            realtime: Pace frames at ``fps``
+            num_frames: Stop after this many frames (None = endless)
+        """
+        super().__init__(fps=fps, realtime=realtime)
+        self.width = width
+        self.height = height
+        self.num_frames = num_frames
+        self._background = None
+
+    def open(self):
+        # Gradien statis dibuat sekali, lingkaran bergerak digambar per frame
+        ramp_x = np.linspace(0, 255, self.width, dtype=np.uint8)
+        ramp_y = np.linspace(0, 255, self.height, dtype=np.uint8)
+        self._background = np.empty((self.height, self.width, 3), np.uint8)
+        self._background[:, :, 0] = ramp_x[None, :]
+        self._background[:, :, 1] = ramp_y[:, None]
+        self._background[:, :, 2] = 96
+        return True
+
+    def isOpened(self):
+        return self._background is not None
+
+    def _read_frame(self):
+        if self._background is None:
+            return False, None
+        if self.num_frames is not None and self.frame_index >= self.num_frames:
+            return False, None
+        frame = self._background.copy()
+        t = self.frame_index / (self.fps or 30)
+        cx = int(self.width * (0.5 + 0.35 * np.sin(t)))
+        cy = int(self.height * (0.5 + 0.25 * np.cos(1.3 * t)))
+        cv2.circle(frame, (cx, cy), self.height // 10, (255, 255, 255), -1)
+        return True, frame
+
+    def release(self):
+        self._background = None
+
+
+def create_source(spec, realtime=True, loop=False, **kwargs):
+    """
+    Build a frame source from a short description.
+
+    Args:
+        spec: Camera index (int or digit string), ``"synthetic"``,
+              a directory of images or a video file path
+        realtime: Pace replay sources in real time
+        loop: Loop replay sources
+        **kwargs: Extra arguments for the chosen source class
+
+    Returns:
+        An unopened FrameSource
+    """
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return CameraSource(indices=(int(spec),), **kwargs)
+    if spec == "synthetic":
+        return SyntheticSource(realtime=realtime, **kwargs)
+    if os.path.isdir(spec):
+        return ImageSequenceSource(spec, realtime=realtime, loop=loop, **kwargs)
+    if os.path.isfile(spec):
+        return VideoFileSource(spec, realtime=realtime, loop=loop, **kwargs)
+    raise ValueError(f"Unknown frame source: {spec}")
@@ -0,0 +1,506 @@
+"""
+Gesture Classifier Module
+Learned static-gesture classifier on normalized hand landmark vectors, a
+drop-in replacement for the finger-state rules in hand_gesture.
+
+Usage:
+    python -m gesture_mode.gesture_classifier record --source pointing.mp4 --label pointing --out sesi/pointing_1.npz
+    python -m gesture_mode.gesture_classifier train sesi/*.npz --kind mlp --out gesture_model.npz
+    python -m gesture_mode.gesture_classifier report sesi_uji/*.npz --model gesture_model.npz
+
+A recorded session is an .npz file with ``points`` ((N, 21, 3) normalized
+landmarks), ``labels`` (N gesture names) and ``aspect`` (frame width /
+height).
+"""
+import argparse
+import time
+
+import numpy as np
+
+# Jenis model yang didukung
+KINDS = ("mlp", "knn")
+
+# Pergelangan, pangkal telunjuk, pangkal jari tengah, pangkal kelingking
+_WRIST, _INDEX_MCP, _MIDDLE_MCP, _PINKY_MCP = 0, 5, 9, 17
+
+
+def normalize_landmarks(points, aspect=1.0):
+    """
+    Pose-only feature vector(s) of hand landmarks.
+
+    The hand is moved to the wrist, rotated so that the palm (wrist to
+    middle finger base) points up, scaled to a palm size of 1 and, for a
+    left hand (thumb on the other side), mirrored. What remains is the
+    finger pose, independent of position, tilt, distance and handedness.
+
+    Args:
+        points: (21, 3) or (N, 21, 3) normalized landmarks
+        aspect: Frame width / height (landmark x is relative to the width)
+
+    Returns:
+        (63,) or (N, 63) float32 vector(s)
+    """
+    points = np.asarray(points, np.float32)
+    if points.ndim == 2:
+        return _normalize_one(points, aspect)
+    q = points - points[..., _WRIST:_WRIST + 1, :]
+    # x dan z relatif terhadap lebar frame, y terhadap tinggi: samakan satuannya
+    q = q * np.array([aspect, 1.0, aspect], np.float32)
+
+    palm = q[..., _MIDDLE_MCP, :2]
+    size = np.maximum(np.hypot(palm[..., 0], palm[..., 1]), 1e-6)
+    ux, uy = palm[..., 0] / size, palm[..., 1] / size
+
+    # Rotasi yang membawa arah telapak ke (0, -1) = ke atas di koordinat gambar
+    x, y = q[..., 0], q[..., 1]
+    rx = -uy[..., None] * x + ux[..., None] * y
+    ry = -ux[..., None] * x - uy[..., None] * y
+
+    # Tangan kiri dicerminkan: pangkal telunjuk selalu di kiri pangkal kelingking
+    flip = np.where(rx[..., _INDEX_MCP] > rx[..., _PINKY_MCP], -1.0, 1.0).astype(np.float32)
+    rx = rx * flip[..., None]
+
+    features = np.stack([rx, ry, q[..., 2]], axis=-1) / size[..., None, None]
+    return features.reshape(features.shape[:-2] + (63,))
+
+
+def _normalize_one(points, aspect):
+    """``normalize_landmarks`` for a single hand: one 3x3 transform instead of many small array ops."""
+    q = points - points[_WRIST]
+    px, py = float(q[_MIDDLE_MCP, 0]) * aspect, float(q[_MIDDLE_MCP, 1])
+    size = max((px * px + py * py) ** 0.5, 1e-6)
+    ux, uy = px / size, py / size
+    # Skala aspect, rotasi dan skala telapak digabung jadi satu matriks
+    transform = np.array([[-uy * aspect, ux, 0.0],
+                          [-ux * aspect, -uy, 0.0],
+                          [0.0, 0.0, aspect]], np.float32) / size
+    features = q @ transform.T
+    if features[_INDEX_MCP, 0] > features[_PINKY_MCP, 0]:
+        features[:, 0] *= -1.0
+    return features.reshape(63)
+
+
+class GestureClassifier:
+    """
+    Base class: maps landmarks to one of ``classes`` (gesture names).
+
+    Subclasses implement ``fit`` and ``_scores``; ``classify`` is the
+    drop-in counterpart of ``GESTURES[classify_gestures(points)]``.
+    """
+
+    kind = None
+
+    def __init__(self, classes=()):
+        self.classes = tuple(classes)
+
+    def fit(self, features, labels):
+        """
+        Train on normalized feature vectors.
+
+        Args:
+            features: (N, 63) vectors from ``normalize_landmarks``
+            labels: N gesture names
+        """
+        raise NotImplementedError
+
+    def _scores(self, features):
+        """Scores for (63,) or (N, 63) features, (len(classes),) or (N, len(classes)) (higher is better)."""
+        raise NotImplementedError
+
+    def predict(self, points, aspect=1.0):
+        """
+        Class index (into ``classes``) for one or many hands.
+
+        Args:
+            points: (21, 3) or (N, 21, 3) normalized landmarks
+            aspect: Frame width / height
+
+        Returns:
+            An int for one hand, or an (N,) int array
+        """
+        features = normalize_landmarks(points, aspect)
+        if features.ndim == 1:
+            return int(self._scores(features).argmax())
+        return self._scores(features).argmax(axis=1)
+
+    def classify(self, points, aspect=1.0):
+        """Gesture name for one (21, 3) landmark array (a list of names for (N, 21, 3))."""
+        codes = self.predict(points, aspect)
+        if isinstance(codes, int):
+            return self.classes[codes]
+        return [self.classes[code] for code in codes]
+
+    def _label_codes(self, labels):
+        self.classes = tuple(sorted(set(labels)))
+        lookup = {name: i for i, name in enumerate(self.classes)}
+        return np.array([lookup[name] for name in labels], np.int64)
+
+    def save(self, path):
+        """Write the model to an .npz file (load it with ``load_classifier``)."""
+        np.savez(path, kind=self.kind, classes=np.array(self.classes), **self._arrays())
+
+    def _arrays(self):
+        raise NotImplementedError
+
+
+class KnnGestureClassifier(GestureClassifier):
+    """
+    k-nearest-neighbour vote over stored training vectors.
+
+    At most ``max_prototypes`` vectors are kept (an even subsample), so a
+    prediction is one (P, 63) matrix-vector product.
+    """
+
+    kind = "knn"
+
+    def __init__(self, k=5, max_prototypes=1500, classes=()):
+        """
+        Args:
+            k: Neighbours that vote
+            max_prototypes: Largest number of stored training vectors
+            classes: Gesture names (set by ``fit``)
+        """
+        super().__init__(classes)
+        self.k = k
+        self.max_prototypes = max_prototypes
+        self.prototypes = np.zeros((0, 63), np.float32)
+        self.prototype_labels = np.zeros(0, np.int64)
+        self._norms = np.zeros(0, np.float32)
+
+    def fit(self, features, labels):
+        codes = self._label_codes(labels)
+        features = np.asarray(features, np.float32)
+        if len(features) > self.max_prototypes:
+            keep = np.linspace(0, len(features) - 1, self.max_prototypes).astype(np.int64)
+            features, codes = features[keep], codes[keep]
+        self._set(features, codes)
+        return self
+
+    def _set(self, prototypes, labels):
+        self.prototypes = np.ascontiguousarray(prototypes, np.float32)
+        self.prototype_labels = np.asarray(labels, np.int64)
+        self._norms = (self.prototypes * self.prototypes).sum(axis=1)
+
+    def _scores(self, features):
+        # |p - f|^2 = |p|^2 - 2 p.f (+ |f|^2, sama untuk semua prototipe)
+        distance = self._norms - 2.0 * (features @ self.prototypes.T)
+        k = min(self.k, distance.shape[-1])
+        nearest = self.prototype_labels[np.argpartition(distance, k - 1, axis=-1)[..., :k]]
+        if features.ndim == 1:
+            return np.bincount(nearest, minlength=len(self.classes))
+        votes = np.zeros((len(features), len(self.classes)), np.float32)
+        np.add.at(votes, (np.arange(len(features))[:, None], nearest), 1.0)
+        return votes
+
+    def _arrays(self):
+        return {"k": self.k, "prototypes": self.prototypes, "prototype_labels": self.prototype_labels}
+
+
+class MlpGestureClassifier(GestureClassifier):
+    """
+    One-hidden-layer perceptron (ReLU, softmax) trained with Adam in NumPy.
+
+    Prediction is two small matrix products, a few microseconds on top of
+    the normalization.
+    """
+
+    kind = "mlp"
+
+    def __init__(self, hidden=32, epochs=400, learning_rate=0.01, weight_decay=1e-4, seed=0, classes=()):
+        """
+        Args:
+            hidden: Hidden layer size
+            epochs: Full-batch training steps
+            learning_rate: Adam step size
+            weight_decay: L2 penalty on the weights
+            seed: Seed for the weight initialization
+            classes: Gesture names (set by ``fit``)
+        """
+        super().__init__(classes)
+        self.hidden = hidden
+        self.epochs = epochs
+        self.learning_rate = learning_rate
+        self.weight_decay = weight_decay
+        self.seed = seed
+        self.w1 = self.b1 = self.w2 = self.b2 = None
+
+    def fit(self, features, labels):
+        codes = self._label_codes(labels)
+        x = np.asarray(features, np.float32)
+        n, classes = len(x), len(self.classes)
+        target = np.zeros((n, classes), np.float32)
+        target[np.arange(n), codes] = 1.0
+        # Kelas jarang diberi bobot lebih besar (rekaman per gestur jarang seimbang)
+        weight = (n / (classes * np.maximum(target.sum(axis=0), 1)))[codes][:, None].astype(np.float32)
+
+        rng = np.random.default_rng(self.seed)
+        params = [rng.normal(0, np.sqrt(2.0 / 63), (63, self.hidden)).astype(np.float32),
+                  np.zeros(self.hidden, np.float32),
+                  rng.normal(0, np.sqrt(1.0 / self.hidden), (self.hidden, classes)).astype(np.float32),
+                  np.zeros(classes, np.float32)]
+        moment1 = [np.zeros_like(p) for p in params]
+        moment2 = [np.zeros_like(p) for p in params]
+
+        for step in range(1, self.epochs + 1):
+            w1, b1, w2, b2 = params
+            hidden = np.maximum(x @ w1 + b1, 0)
+            probs = _softmax(hidden @ w2 + b2)
+            delta = (probs - target) * weight / n
+            grad_w2 = hidden.T @ delta + self.weight_decay * w2
+            delta_hidden = (delta @ w2.T) * (hidden > 0)
+            grad_w1 = x.T @ delta_hidden + self.weight_decay * w1
+            grads = [grad_w1, delta_hidden.sum(axis=0), grad_w2, delta.sum(axis=0)]
+            for p, g, m, v in zip(params, grads, moment1, moment2):
+                m *= 0.9
+                m += 0.1 * g
+                v *= 0.999
+                v += 0.001 * g * g
+                p -= self.learning_rate * (m / (1 - 0.9 ** step)) / (np.sqrt(v / (1 - 0.999 ** step)) + 1e-8)
+        self.w1, self.b1, self.w2, self.b2 = params
+        return self
+
+    def _scores(self, features):
+        return np.maximum(features @ self.w1 + self.b1, 0) @ self.w2 + self.b2
+
+    def predict_proba(self, points, aspect=1.0):
+        """Class probabilities, (len(classes),) or (N, len(classes))."""
+        features = normalize_landmarks(points, aspect)
+        return _softmax(self._scores(features))
+
+    def _arrays(self):
+        return {"w1": self.w1, "b1": self.b1, "w2": self.w2, "b2": self.b2}
+
+
+def _softmax(logits):
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+def create_classifier(kind="mlp", **kwargs):
+    """
+    Build an untrained classifier.
+
+    Args:
+        kind: One of KINDS
+        **kwargs: Arguments for the classifier class
+    """
+    if kind == "mlp":
+        return MlpGestureClassifier(**kwargs)
+    if kind == "knn":
+        return KnnGestureClassifier(**kwargs)
+    raise ValueError(f"Unknown gesture classifier {kind!r}, expected one of {KINDS}")
+
+
+def load_classifier(path):
+    """
+    Load a classifier written by ``GestureClassifier.save``.
+
+    Args:
+        path: .npz model file
+
+    Returns:
+        A trained GestureClassifier
+    """
+    with np.load(path) as data:
+        kind = str(data["kind"])
+        classes = [str(name) for name in data["classes"]]
+        if kind == "knn":
+            classifier = KnnGestureClassifier(k=int(data["k"]), classes=classes)
+            classifier._set(data["prototypes"], data["prototype_labels"])
+        elif kind == "mlp":
+            classifier = MlpGestureClassifier(hidden=data["w1"].shape[1], classes=classes)
+            classifier.w1, classifier.b1 = data["w1"], data["b1"]
+            classifier.w2, classifier.b2 = data["w2"], data["b2"]
+        else:
+            raise ValueError(f"Unknown gesture classifier {kind!r} in {path}")
+    return classifier
+
+
+def load_sessions(paths):
+    """
+    Load and concatenate recorded sessions.
+
+    Args:
+        paths: Session .npz files
+
+    Returns:
+        List of (path, points (N, 21, 3), labels (N,), aspect) per session
+    """
+    sessions = []
+    for path in paths:
+        with np.load(path) as data:
+            points = np.asarray(data["points"], np.float32).reshape(-1, 21, 3)
+            labels = np.asarray(data["labels"]).astype(str)
+            aspect = float(data["aspect"]) if "aspect" in data else 1.0
+        if len(points) != len(labels):
+            raise ValueError(f"{path}: {len(points)} frames but {len(labels)} labels")
+        sessions.append((path, points, labels, aspect))
+    return sessions
+
+
+def record_session(source, label, max_frames=None, backend="solutions"):
+    """
+    Run the hand model over a frame source and keep the landmarks of every frame with a hand.
+
+    Args:
+        source: Unopened FrameSource (e.g. a clip of one gesture)
+        label: Gesture name stored for every frame
+        max_frames: Stop after this many frames (None = whole source)
+        backend: MediaPipe landmark backend
+
+    Returns:
+        Tuple (points (N, 21, 3), labels (N,), aspect)
+    """
+    # Import di sini: train/report tidak butuh MediaPipe
+    from .frame_packet import BufferPool, FramePacket
+    from .hand_gesture import HandGestureDetector
+
+    detector = HandGestureDetector(draw_landmarks=False, backend=backend)
+    pool = BufferPool()
+    points, aspect, frames = [], 1.0, 0
+    if not source.open():
+        raise RuntimeError("Could not open frame source.")
+    try:
+        while max_frames is None or frames < max_frames:
+            ret, frame = source.read()
+            if not ret:
+                break
+            packet = FramePacket(frame, mirror=True, pool=pool, timestamp=frames / (source.fps or 30))
+            frames += 1
+            detector.process_frame(packet)
+            if detector.points is not None:
+                points.append(detector.points.copy())
+                aspect = packet.width / packet.height
+    finally:
+        source.release()
+        detector.release()
+    points = np.asarray(points, np.float32).reshape(-1, 21, 3)
+    return points, np.full(len(points), label), aspect
+
+
+def split_sessions(sessions, validation=0.2):
+    """
+    Split every session into a leading training part and a trailing validation part.
+
+    Consecutive frames are nearly identical, so a random split would put
+    copies of the validation frames into the training set.
+
+    Returns:
+        Tuple (train_sessions, validation_sessions) in ``load_sessions`` format
+    """
+    train, held_out = [], []
+    for path, points, labels, aspect in sessions:
+        cut = len(points) - int(round(len(points) * validation))
+        train.append((path, points[:cut], labels[:cut], aspect))
+        held_out.append((path, points[cut:], labels[cut:], aspect))
+    return train, held_out
+
+
+def session_features(sessions):
+    """
+    Feature vectors and labels of sessions, ready for ``GestureClassifier.fit``.
+
+    Returns:
+        Tuple (features (N, 63), labels (N,))
+    """
+    features = [normalize_landmarks(points, aspect) for _, points, _, aspect in sessions]
+    labels = [labels for _, _, labels, _ in sessions]
+    return np.concatenate(features), np.concatenate(labels)
+
+
+def _latency_us(function, frames, repeat=500):
+    """Median single-frame call time in microseconds."""
+    samples = []
+    for i in range(min(repeat, len(frames))):
+        t0 = time.perf_counter()
+        function(frames[i])
+        samples.append(time.perf_counter() - t0)
+    return float(np.median(samples)) * 1e6 if samples else 0.0
+
+
+def compare(sessions, classifier):
+    """
+    Side-by-side accuracy and latency of the rules and a classifier.
+
+    Args:
+        sessions: Output of ``load_sessions``
+        classifier: Trained GestureClassifier
+
+    Returns:
+        Report text (one line per metric)
+    """
+    from .hand_gesture import GESTURES, classify_gestures
+
+    labels = np.concatenate([s[2] for s in sessions])
+    rules = np.concatenate([np.asarray(GESTURES)[classify_gestures(s[1])] for s in sessions])
+    model = np.concatenate([np.asarray(classifier.classify(s[1], s[3]), dtype=str) for s in sessions])
+
+    lines = [f"{'':<12} {'rules':>8} {classifier.kind:>8}   frames",
+             f"{'accuracy':<12} {np.mean(rules == labels):8.1%} {np.mean(model == labels):8.1%}   {len(labels)}"]
+    for name in sorted(set(labels)):
+        mask = labels == name
+        lines.append(f"  {name:<10} {np.mean(rules[mask] == name):8.1%} {np.mean(model[mask] == name):8.1%}"
+                     f"   {int(mask.sum())}")
+
+    # Latency per panggilan satu tangan, seperti di process_frame
+    frames = [p for s in sessions for p in s[1][:100]]
+    aspect = sessions[0][3] if sessions else 1.0
+    rules_us = _latency_us(classify_gestures, frames)
+    model_us = _latency_us(lambda p: classifier.classify(p, aspect), frames)
+    lines.append(f"{'latency':<12} {rules_us:6.1f}us {model_us:6.1f}us   (median per hand)")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record, train and evaluate the learned gesture classifier.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="extract landmarks of one gesture from a clip or camera")
+    record.add_argument("--source", required=True, help="camera index, video file or image folder")
+    record.add_argument("--label", required=True, help="gesture name of every frame, e.g. pointing")
+    record.add_argument("--out", required=True, help="session .npz to write")
+    record.add_argument("--frames", type=int, default=None, help="maximum number of frames")
+    record.add_argument("--backend", choices=("solutions", "tasks"), default="solutions",
+                        help="MediaPipe landmark backend")
+
+    train = commands.add_parser("train", help="train a classifier on recorded sessions")
+    train.add_argument("sessions", nargs="+", help="session .npz files")
+    train.add_argument("--kind", choices=KINDS, default="mlp", help="classifier type")
+    train.add_argument("--out", default="gesture_model.npz", help="model file to write")
+    train.add_argument("--validation", type=float, default=0.2,
+                       help="trailing fraction of each session held out for the report (0 = none)")
+
+    report = commands.add_parser("report", help="compare the rules and a trained model on sessions")
+    report.add_argument("sessions", nargs="+", help="session .npz files (ideally not used for training)")
+    report.add_argument("--model", required=True, help="trained model .npz")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        from .frame_source import create_source
+        points, labels, aspect = record_session(create_source(args.source, realtime=False), args.label,
+                                                args.frames, args.backend)
+        np.savez_compressed(args.out, points=points, labels=labels, aspect=aspect)
+        print(f"{args.out}: {len(points)} frames with a hand, label {args.label!r}")
+
+    elif args.command == "train":
+        sessions = load_sessions(args.sessions)
+        train, held_out = split_sessions(sessions, args.validation)
+        classifier = create_classifier(args.kind)
+        t0 = time.perf_counter()
+        classifier.fit(*session_features(train))
+        print(f"trained {args.kind} on {sum(len(s[1]) for s in train)} frames in {time.perf_counter() - t0:.1f} s, "
+              f"classes {', '.join(classifier.classes)}")
+        if sum(len(s[1]) for s in held_out):
+            print(compare([s for s in held_out if len(s[1])], classifier))
+            # Model akhir memakai semua frame
+            classifier = create_classifier(args.kind).fit(*session_features(sessions))
+        classifier.save(args.out)
+        print(f"saved {args.out}")
+
+    else:
+        print(compare(load_sessions(args.sessions), load_classifier(args.model)))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,35 @@
 Glasses Renderer Module
 Renders virtual glasses on the face.
 """
+import glob
+import os
+
 import cv2
 import numpy as np
+from .frame_packet import FramePacket
+from .sprites import Sprite, SpriteCache, blend_sprite, load_image_sprite, premultiply, size_bucket
+
+# Piksel tambahan di sekeliling geometri kacamata (garis tebal 2 px + anti-aliasing)
+_ROI_MARGIN = 4
+
+# Transparansi kacamata (alpha sprite = cakupan garis x GLASSES_OPACITY)
+GLASSES_OPACITY = 0.8
+
+# Foto produk (PNG dengan alpha) di folder ini otomatis jadi style, nama = nama file
+GLASSES_ASSET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "glasses")
 
 class GlassesRenderer:
     """Renders virtual glasses on a face."""
     
-    def __init__(self):
-        """Initialize the glasses renderer."""
+    def __init__(self, asset_dir=GLASSES_ASSET_DIR, cache_bytes=32 * 1024 * 1024):
+        """
+        Initialize the glasses renderer.
+        
+        Args:
+            asset_dir: Folder of product images (*.png with alpha); each one
+                       becomes a style named after the file (see ``add_asset``)
+            cache_bytes: Memory cap of the sprite cache
+        """
         # Define available glasses styles
         self.styles = ["Rectangle", "Round", "Aviator"]
         
@@ -23,19 +44,63 @@ class GlassesRenderer:
             "White": (255, 255, 255)
         }
         
+        # Style vektor digambar sekali per (style, warna, bucket lebar) ke sprite,
+        # lalu setiap frame hanya di-blend
+        self._vector_styles = {
+            "Rectangle": self._draw_rectangle_glasses,
+            "Round": self._draw_round_glasses,
+            "Aviator": self._draw_aviator_glasses,
+        }
+        self.sprites = SpriteCache(cache_bytes)
+        self.assets = {}
+        
+        # Scratch buffer for the blend kernel, reused between frames (grows only)
+        self._blend_scratch = None
+        
+        if asset_dir and os.path.isdir(asset_dir):
+            for path in sorted(glob.glob(os.path.join(asset_dir, "*.png"))):
+                self.add_asset(os.path.splitext(os.path.basename(path))[0], path)
+        
+    def add_asset(self, name, image, width_scale=0.8, anchor=(0.5, 0.5)):
+        """
+        Add an image-based style (e.g. a product photo of the frame front).
+        
+        The image is premultiplied once here; per glasses size it is resized
+        once into the sprite cache, so rendering costs the same as a drawn style.
+        
+        Args:
+            name: Style name (appended to ``styles``)
+            image: Path to an image with alpha, or a straight BGRA uint8 array
+            width_scale: Image width as a fraction of the glasses width
+                         (1.5 x eye distance; the drawn frame fronts span 0.75)
+            anchor: Point of the image placed between the eyes, as fractions
+                    of its width and height
+        """
+        if isinstance(image, str):
+            image = load_image_sprite(image)
+        self.assets[name] = (premultiply(image), width_scale, anchor)
+        if name not in self.styles:
+            self.styles.append(name)
+        
     def render(self, frame, face_data, style, color):
         """
         Render glasses on the face.
         
+        The glasses come from the sprite cache (built on the first use of a
+        style, colour and size bucket) and are alpha-blended at the eye
+        center; only the sprite's rectangle of the frame is touched.
+        
         Args:
-            frame: BGR frame from the camera
+            frame: FramePacket or BGR frame from the camera (drawn in place)
             face_data: Dictionary with face dimensions and points
             style: Style of glasses to render
-            color: Color of glasses to render
+            color: Color of glasses to render (ignored by image styles)
             
         Returns:
             Frame with rendered glasses
         """
+        if isinstance(frame, FramePacket):
+            frame = frame.bgr
         if not face_data:
             return frame
             
@@ -43,37 +108,70 @@ class GlassesRenderer:
         points = face_data["points"]
         dimensions = face_data["dimensions"]
         
-        # Create a copy of the frame for overlay
-        overlay = frame.copy()
-        
         # Get the center point between the eyes and glasses width
         eye_center_x = dimensions["eye_center"][0]
         eye_center_y = dimensions["eye_center"][1]
         glasses_width = int(dimensions["eyes_distance"] * 1.5)
-        glasses_height = int(glasses_width * 0.35)
-        
-        # Get the color
-        bgr_color = self.colors.get(color, (0, 0, 0))  # Default to black
         
-        # Render glasses based on style
-        if style == "Rectangle":
-            self._draw_rectangle_glasses(overlay, eye_center_x, eye_center_y, 
-                                        glasses_width, glasses_height, bgr_color)
-        elif style == "Round":
-            self._draw_round_glasses(overlay, eye_center_x, eye_center_y, 
-                                    glasses_width, glasses_height, bgr_color)
-        elif style == "Aviator":
-            self._draw_aviator_glasses(overlay, eye_center_x, eye_center_y, 
-                                      glasses_width, glasses_height, bgr_color)
-        
-        # Blend the overlay with the original frame
-        alpha = 0.8  # Transparency factor
-        cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0, frame)
+        sprite = self.sprite(style, color, glasses_width)
+        if sprite is not None:
+            scratch = blend_sprite(frame, sprite, int(eye_center_x), int(eye_center_y), self._blend_scratch)
+            if scratch is not None:
+                self._blend_scratch = scratch
         
         return frame
+    
+    def sprite(self, style, color, glasses_width):
+        """
+        Cached sprite of a style at (about) a glasses width, or None for an unknown style.
+        
+        Widths are quantized with ``sprites.size_bucket``, so a face moving
+        slightly closer or further reuses the same sprite.
+        """
+        width = size_bucket(glasses_width)
+        if style in self.assets:
+            return self.sprites.get((style, None, width), lambda: self._asset_sprite(style, width))
+        if style not in self._vector_styles:
+            return None
+        bgr_color = self.colors.get(color, (0, 0, 0))  # Default to black
+        return self.sprites.get((style, bgr_color, width), lambda: self._vector_sprite(style, bgr_color, width))
+    
+    def _vector_sprite(self, style, bgr_color, glasses_width):
+        """Rasterize a drawn style once: anti-aliased strokes as alpha, anchored at the eye center."""
+        glasses_height = int(glasses_width * 0.35)
+        x0, y0, x1, y1 = self._glasses_bounds(0, 0, glasses_width, glasses_height)
+        mask = np.zeros((y1 - y0, x1 - x0), np.uint8)
+        self._vector_styles[style](mask, -x0, -y0, glasses_width, glasses_height, 255, cv2.LINE_AA)
+        return Sprite.from_mask(mask, bgr_color, (-x0, -y0), GLASSES_OPACITY)
+    
+    def _asset_sprite(self, name, glasses_width):
+        """Resize a premultiplied image style to a glasses width."""
+        pixels, width_scale, anchor = self.assets[name]
+        height, width = pixels.shape[:2]
+        new_width = max(1, int(round(glasses_width * width_scale)))
+        new_height = max(1, int(round(height * new_width / width)))
+        # Resize di ruang premultiplied: tepi transparan tidak memberi warna gelap/halo
+        interpolation = cv2.INTER_AREA if new_width < width else cv2.INTER_LINEAR
+        resized = cv2.resize(pixels, (new_width, new_height), interpolation=interpolation)
+        return Sprite(resized, (int(round(anchor[0] * new_width)), int(round(anchor[1] * new_height))))
+    
+    @staticmethod
+    def _glasses_bounds(eye_center_x, eye_center_y, glasses_width, glasses_height):
+        """
+        Box (x0, y0, x1, y1), end exclusive, containing every style's glasses.
+        
+        Horizontally the temples reach lens offset + lens half width +
+        temple length from the center; vertically the lenses reach half the
+        glasses height (or the round lens radius) up and the temples a
+        quarter of the width down.
+        """
+        half_w = glasses_width // 4 + glasses_width // 6 + glasses_width // 2 + _ROI_MARGIN
+        up = max(glasses_height // 2, glasses_width // 8) + _ROI_MARGIN
+        down = max(glasses_height // 2, glasses_width // 4, glasses_width // 8) + _ROI_MARGIN
+        return eye_center_x - half_w, eye_center_y - up, eye_center_x + half_w + 1, eye_center_y + down + 1
         
     def _draw_rectangle_glasses(self, frame, eye_center_x, eye_center_y, 
-                              glasses_width, glasses_height, color):
+                              glasses_width, glasses_height, color, line_type=cv2.LINE_8):
         """Draw rectangular glasses."""
         left_eye_x = eye_center_x - glasses_width // 4
         right_eye_x = eye_center_x + glasses_width // 4
@@ -82,19 +180,19 @@ class GlassesRenderer:
         cv2.rectangle(frame,
                      (left_eye_x - glasses_width // 8, eye_center_y - glasses_height // 2),
                      (left_eye_x + glasses_width // 8, eye_center_y + glasses_height // 2),
-                     color, 2)
+                     color, 2, line_type)
         
         # Draw right lens
         cv2.rectangle(frame,
                      (right_eye_x - glasses_width // 8, eye_center_y - glasses_height // 2),
                      (right_eye_x + glasses_width // 8, eye_center_y + glasses_height // 2),
-                     color, 2)
+                     color, 2, line_type)
         
         # Draw bridge
         cv2.line(frame,
                 (left_eye_x + glasses_width // 8, eye_center_y),
                 (right_eye_x - glasses_width // 8, eye_center_y),
-                color, 2)
+                color, 2, line_type)
         
         # Draw temples (arms)
         temple_length = glasses_width // 2
@@ -102,15 +200,15 @@ class GlassesRenderer:
         cv2.line(frame,
                 (left_eye_x - glasses_width // 8, eye_center_y),
                 (left_eye_x - glasses_width // 8 - temple_length, eye_center_y + temple_length // 2),
-                color, 2)
+                color, 2, line_type)
         
         cv2.line(frame,
                 (right_eye_x + glasses_width // 8, eye_center_y),
                 (right_eye_x + glasses_width // 8 + temple_length, eye_center_y + temple_length // 2),
-                color, 2)
+                color, 2, line_type)
     
     def _draw_round_glasses(self, frame, eye_center_x, eye_center_y, 
-                          glasses_width, glasses_height, color):
+                          glasses_width, glasses_height, color, line_type=cv2.LINE_8):
         """Draw round glasses."""
         left_eye_x = eye_center_x - glasses_width // 4
         right_eye_x = eye_center_x + glasses_width // 4
@@ -120,19 +218,19 @@ class GlassesRenderer:
         cv2.circle(frame,
                   (left_eye_x, eye_center_y),
                   lens_radius,
-                  color, 2)
+                  color, 2, line_type)
         
         # Draw right lens
         cv2.circle(frame,
                   (right_eye_x, eye_center_y),
                   lens_radius,
-                  color, 2)
+                  color, 2, line_type)
         
         # Draw bridge
         cv2.line(frame,
                 (left_eye_x + lens_radius, eye_center_y),
                 (right_eye_x - lens_radius, eye_center_y),
-                color, 2)
+                color, 2, line_type)
         
         # Draw temples (arms)
         temple_length = glasses_width // 2
@@ -140,15 +238,15 @@ class GlassesRenderer:
         cv2.line(frame,
                 (left_eye_x - lens_radius, eye_center_y),
                 (left_eye_x - lens_radius - temple_length, eye_center_y + temple_length // 2),
-                color, 2)
+                color, 2, line_type)
         
         cv2.line(frame,
                 (right_eye_x + lens_radius, eye_center_y),
                 (right_eye_x + lens_radius + temple_length, eye_center_y + temple_length // 2),
-                color, 2)
+                color, 2, line_type)
     
     def _draw_aviator_glasses(self, frame, eye_center_x, eye_center_y, 
-                            glasses_width, glasses_height, color):
+                            glasses_width, glasses_height, color, line_type=cv2.LINE_8):
         """Draw aviator glasses."""
         left_eye_x = eye_center_x - glasses_width // 4
         right_eye_x = eye_center_x + glasses_width // 4
@@ -161,7 +259,7 @@ class GlassesRenderer:
             [left_eye_x - glasses_width // 6, eye_center_y + glasses_height // 3]
         ], np.int32)
         left_lens_points = left_lens_points.reshape((-1, 1, 2))
-        cv2.polylines(frame, [left_lens_points], True, color, 2)
+        cv2.polylines(frame, [left_lens_points], True, color, 2, line_type)
         
         # Right lens (teardrop shape)
         right_lens_points = np.array([
@@ -171,13 +269,13 @@ class GlassesRenderer:
             [right_eye_x - glasses_width // 10, eye_center_y + glasses_height // 2]
         ], np.int32)
         right_lens_points = right_lens_points.reshape((-1, 1, 2))
-        cv2.polylines(frame, [right_lens_points], True, color, 2)
+        cv2.polylines(frame, [right_lens_points], True, color, 2, line_type)
         
         # Draw bridge
         cv2.line(frame,
                 (left_eye_x + glasses_width // 8, eye_center_y - glasses_height // 4),
                 (right_eye_x - glasses_width // 8, eye_center_y - glasses_height // 4),
-                color, 2)
+                color, 2, line_type)
         
         # Draw temples (arms)
         temple_length = glasses_width // 2
@@ -185,9 +283,9 @@ class GlassesRenderer:
         cv2.line(frame,
                 (left_eye_x - glasses_width // 8, eye_center_y - glasses_height // 4),
                 (left_eye_x - glasses_width // 8 - temple_length, eye_center_y + temple_length // 3),
-                color, 2)
+                color, 2, line_type)
         
         cv2.line(frame,
                 (right_eye_x + glasses_width // 8, eye_center_y - glasses_height // 4),
                 (right_eye_x + glasses_width // 8 + temple_length, eye_center_y + temple_length // 3),
-                color, 2)
+                color, 2, line_type)
@@ -2,143 +2,568 @@
 Hand Gesture Detection Module
 Detects hand gestures for UI interaction.
 """
-import cv2
-import mediapipe as mp
-import math
+import json
+import struct
+import time
+try:
+    import mediapipe as mp
+except ImportError:  # replay (backend=None) tidak butuh MediaPipe
+    mp = None
 import numpy as np
+from .frame_packet import as_packet
+from .landmark_backend import create_hand_backend
+from .roi_tracker import HandRoiTracker
+from .keyframe import KeyframeClock, LandmarkExtrapolator
+from .motion_gate import MotionGate, points_roi
+from .tracks import ActiveUserSelector, TrackManager, landmark_box
+from .swipe import SwipeRecognizer
+from .gesture_classifier import GestureClassifier, load_classifier
+from .filters import create_filter
+
+# Nama gestur, indeks = kode yang dihasilkan classify_gestures
+GESTURES = ("none", "pointing", "selecting")
+
+# Jempol terbuka jika jarak ujung jempol ke pangkal kelingking > THUMB_RATIO x ukuran telapak
+THUMB_RATIO = 0.9
+
+# Debounce: gestur baru harus stabil DEBOUNCE_TIME detik, minimal GESTURE_COOLDOWN
+# detik antar pergantian. Cooldown 0 = perilaku lama (cooldown_frames dulu tidak
+# pernah dipakai). Tuning: python -m gesture_mode.sweep
+DEBOUNCE_TIME = 0.06
+GESTURE_COOLDOWN = 0.0
+
+# Parameter yang boleh ada di file tuning (VTO_GESTURE_PARAMS / sweep --save)
+GESTURE_PARAMETERS = ("thumb_ratio", "debounce_time", "cooldown_time", "hover_duration",
+                      "cursor_min_cutoff", "cursor_beta")
+
+# Urutan jari di array finger state
+FINGERS = ("thumb", "index", "middle", "ring", "pinky")
+
+# Pergelangan, pangkal dan ujung jari: cukup untuk kotak tangan saat tracking multi-user
+_BOX_LANDMARKS = (0, 4, 5, 8, 12, 16, 17, 20)
+
+
+def landmarks_to_array(hand_landmarks, out=None):
+    """
+    Convert MediaPipe hand landmarks into a contiguous (21, 3) float32 array.
+
+    Args:
+        hand_landmarks: NormalizedLandmarkList with 21 landmarks
+        out: Optional (21, 3) float32 array to fill
+
+    Returns:
+        (21, 3) array of normalized x, y, z
+    """
+    if out is None:
+        out = np.empty((21, 3), np.float32)
+    # Per sumbu (tiga list pendek) lalu struct langsung ke buffer: tanpa konversi list -> NumPy
+    landmarks = hand_landmarks.landmark
+    xyz = np.empty((3, 21), np.float32)
+    _LANDMARK_STRUCT.pack_into(xyz, 0, *[lm.x for lm in landmarks], *[lm.y for lm in landmarks],
+                               *[lm.z for lm in landmarks])
+    out[:] = xyz.T
+    return out
+
+
+_LANDMARK_STRUCT = struct.Struct("63f")
+
+
+def _finger_rule(x, y, thumb_ratio):
+    """
+    The finger-state rule on coordinates indexed by landmark number.
+
+    Shared by ``finger_states`` ((21, N) arrays, a whole batch at once) and
+    the single-hand path of ``classify_gestures`` (lists of Python floats:
+    for one hand NumPy's per-call overhead costs more than the arithmetic).
+
+    Returns:
+        Five truth values (bools or (N,) bool arrays) in FINGERS order
+    """
+    # Jempol: terbuka jika jarak tip jempol (4) ke pangkal kelingking (17)
+    # lebih dari thumb_ratio x ukuran telapak (pergelangan 0 ke pangkal jari tengah 9).
+    # Dibandingkan dalam bentuk kuadrat, jadi tanpa sqrt
+    dx, dy = x[4] - x[17], y[4] - y[17]
+    px, py = x[0] - x[9], y[0] - y[9]
+    thumb = dx * dx + dy * dy > (px * px + py * py) * (thumb_ratio * thumb_ratio)
+
+    # Jari lain: lurus jika tip (8, 12, 16, 20) lebih tinggi (y lebih kecil) dari PIP (6, 10, 14, 18)
+    return thumb, y[8] < y[6], y[12] < y[10], y[16] < y[14], y[20] < y[18]
+
+
+def finger_states(points, thumb_ratio=THUMB_RATIO):
+    """
+    Extended (1) / flexed (0) state of each finger.
+
+    Args:
+        points: (21, 3) or (N, 21, 3) normalized landmarks
+        thumb_ratio: Thumb tip to pinky base distance, in palm sizes, above
+                     which the thumb counts as extended
+
+    Returns:
+        (5,) or (N, 5) bool array in FINGERS order
+    """
+    points = np.asarray(points, np.float64)
+    # (21,) atau (21, N): indeks pertama = nomor landmark
+    x = np.moveaxis(points[..., 0], -1, 0)
+    y = np.moveaxis(points[..., 1], -1, 0)
+    return np.stack(_finger_rule(x, y, thumb_ratio), axis=-1)
+
+
+def _gesture_table():
+    # Kode gestur untuk setiap kombinasi 5 bit status jari (bit i = FINGERS[i])
+    table = np.zeros(32, np.int8)
+    for mask in range(32):
+        thumb, index, middle, ring, pinky = ((mask >> i) & 1 for i in range(5))
+        if thumb and index and not middle and not ring and pinky:
+            table[mask] = GESTURES.index("selecting")   # Spider-man/Rock-on
+        elif index and not middle and not ring and not pinky:
+            table[mask] = GESTURES.index("pointing")    # hanya telunjuk lurus
+    return table
+
+
+_GESTURE_TABLE = _gesture_table()
+_FINGER_BITS = np.array([1, 2, 4, 8, 16])
+# Tabel yang sama dengan kunci tuple status jari (jalur satu tangan)
+_STATE_CODES = {tuple(bool(mask >> i & 1) for i in range(5)): int(code) for mask, code in enumerate(_GESTURE_TABLE)}
+
+
+def classify_gestures(points, thumb_ratio=THUMB_RATIO):
+    """
+    Raw gesture codes (indices into GESTURES) for one or many frames.
+
+    Args:
+        points: (21, 3) or (N, 21, 3) normalized landmarks, e.g. a whole
+                recorded session stacked into one array
+        thumb_ratio: Thumb threshold, see ``finger_states``
+
+    Returns:
+        An int for one frame, or an (N,) int array
+    """
+    if np.ndim(points) == 2:
+        x, y, _ = np.asarray(points).T.tolist()
+        return _STATE_CODES[_finger_rule(x, y, thumb_ratio)]
+    return _GESTURE_TABLE[finger_states(points, thumb_ratio) @ _FINGER_BITS]
+
+
+def classify_session(points):
+    """
+    Raw gesture names for a stack of recorded frames in one call.
+
+    Args:
+        points: (N, 21, 3) normalized landmarks
+
+    Returns:
+        List of N gesture names
+    """
+    return [GESTURES[code] for code in classify_gestures(np.asarray(points, np.float32).reshape(-1, 21, 3))]
+
 
 class HandGestureDetector:
     """Detects hand position and gestures."""
     
-    def __init__(self):
-        """Initialize the hand gesture detector."""
+    def __init__(self, draw_landmarks=True, backend="solutions", roi_tracking=False, keyframe_rate=None,
+                 model_complexity=1, inference_scale=1.0, motion_gate=False, max_hands=1,
+                 active_policy="largest", swipe=False, gesture_model=None, cursor_filter=True, latency=None,
+                 clock=time.monotonic):
+        """
+        Initialize the hand gesture detector.
+
+        Args:
+            draw_landmarks: Draw the hand skeleton onto the input frame
+            backend: "solutions" (blocking mp.solutions.hands) or "tasks"
+                     (asynchronous HandLandmarker, see landmark_backend);
+                     None = no model, landmarks come from ``process_points``
+                     (replays, see recording)
+            roi_tracking: Run inference on a small crop around the previous
+                          hand (see HandRoiTracker); solutions backend and
+                          ``max_hands=1`` only (a crop hides the other hands)
+            keyframe_rate: Run the model only this many times per second
+                           (e.g. 12) and extrapolate landmarks in between;
+                           None = every frame
+            model_complexity: mp.solutions.hands model, 0 (fast) or 1
+            inference_scale: Downscale factor for full-frame inference
+                             (ROI crops already have a fixed small size)
+            motion_gate: Skip the model and reuse the last landmarks while
+                         nothing moves around the hand (see MotionGate)
+            max_hands: Hands to detect; above 1 every hand gets a stable
+                       track ID and only the active user's hand drives the
+                       cursor and gestures. Costs more than 1 even with one
+                       person present: the solutions graph keeps running palm
+                       detection until it tracks ``max_hands`` hands
+            active_policy: How the active hand is chosen when
+                           ``active_face_box`` is not set (see tracks.POLICIES)
+            swipe: Recognize left/right swipes; the event of the last frame
+                   is in ``swipe_event`` (see SwipeRecognizer)
+            gesture_model: Trained GestureClassifier or path to its .npz
+                           file; replaces the finger-state rules
+                           (None = rules, see gesture_classifier)
+            cursor_filter: Smooth the cursor with a One-Euro filter
+                           (FILTER_PRESETS["cursor"]); False = raw fingertip
+            latency: LatencyEstimator of the capture-to-display latency; the
+                     cursor is predicted part of it ahead
+            clock: Time source for frames without a timestamp (a replay
+                   injects recording.ManualClock)
+        """
         # Initialize MediaPipe Hands
-        self.mp_hands = mp.solutions.hands
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.hands = self.mp_hands.Hands(
-            max_num_hands=1,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.5
-        )
+        self.mp_hands = mp.solutions.hands if mp is not None else None
+        self.mp_drawing = mp.solutions.drawing_utils if mp is not None else None
+        self.clock = clock
+        self.backend_name = backend
+        self.model_complexity = model_complexity
+        self.inference_scale = inference_scale
+        self.max_hands = max_hands
+        self.backend = self._create_backend()
+        self.draw_landmarks = draw_landmarks
         
-        # Movement smoothing parameters
-        self.smoothing_factor = 0.5
-        self.prev_position = None
+        # Landmark tangan terakhir sebagai array (21, 3), diisi ulang setiap frame
+        # (None jika frame terakhir tidak ada tangan)
+        self._points = np.zeros((21, 3), np.float32)
+        self.points = None
         
-        # Debouncing variables
+        # ROI tracking butuh hasil sinkron (crop harus cocok dengan frame hasilnya)
+        self.roi_tracker = None
+        if roi_tracking and self.backend is not None and self.backend.asynchronous:
+            print("⚠️ ROI tracking tidak didukung backend async, memakai full frame.")
+        elif roi_tracking and max_hands > 1:
+            # Crop hanya berisi tangan aktif: tangan user lain tidak pernah terlihat oleh tracker
+            print("⚠️ ROI tracking tidak bisa digabung dengan max_hands > 1, memakai full frame.")
+        elif roi_tracking and self.backend is not None:
+            self.roi_tracker = HandRoiTracker()
+        # Crop dan full frame memakai graph terpisah (ROI tracking graph tidak tercampur koordinatnya)
+        self.crop_backend = self._create_backend() if self.roi_tracker else None
+        
+        # Keyframe: model hanya dijalankan keyframe_rate kali per detik
+        self.keyframe_clock = KeyframeClock(keyframe_rate) if keyframe_rate else None
+        self.extrapolator = LandmarkExtrapolator()
+        self._keyframe_landmarks = None  # Proto terakhir yang dikembalikan; tidak pernah diubah lagi
+        self.frames = 0
+        self.keyframes = 0
+        
+        # Motion gate: frame statis memakai ulang landmark sebelumnya
+        self.motion_gate = MotionGate() if motion_gate else None
+        self.motion_reused = False  # True jika frame terakhir dilewati motion gate (model tidak jalan)
+        
+        # Multi-user: track ID per tangan, hanya tangan user aktif yang diproses penuh.
+        # active_face_box (kotak wajah aktif, dinormalisasi) diisi pemanggil jika ada.
+        self.hand_tracks = TrackManager() if max_hands > 1 else None
+        self.user_selector = ActiveUserSelector(active_policy) if max_hands > 1 else None
+        self.active_face_box = None
+        self.active_track_id = None
+        
+        # Swipe: lintasan tangan di ring buffer, event per frame di swipe_event
+        self.swipe = SwipeRecognizer() if swipe else None
+        self.swipe_event = None
+        
+        # Gestur statis: model hasil training (jika ada) menggantikan aturan status jari
+        if gesture_model is not None and not isinstance(gesture_model, GestureClassifier):
+            gesture_model = load_classifier(gesture_model)
+        self.gesture_model = gesture_model
+        self.thumb_ratio = THUMB_RATIO
+        self._aspect = 1.0
+        
+        # Cursor: One-Euro (halus saat diam, lag kecil saat cepat) + prediksi sebagian latency
+        self.cursor_filter, self.cursor_prediction = create_filter("cursor") if cursor_filter else (None, 0.0)
+        self.latency = latency
+        
+        # Debouncing variables (berbasis waktu, tidak bergantung FPS)
         self.last_gesture = "none"
-        self.gesture_cooldown = 0
-        self.cooldown_frames = 5 
+        self.candidate_since = None   # Kapan gestur baru pertama terlihat
+        self.debounce_time = DEBOUNCE_TIME     # Detik gestur baru harus stabil (dulu: 3 frame @30fps)
+        self.cooldown_time = GESTURE_COOLDOWN  # Detik minimal antar pergantian gestur (0 = tanpa jeda)
+        self.last_change_time = None
         
-    def get_finger_state(self, landmarks, joints):
+    def _create_backend(self):
+        if self.backend_name is None:
+            return None
+        return create_hand_backend(
+            self.backend_name,
+            max_num_hands=self.max_hands,
+            min_detection_confidence=0.7,
+            min_tracking_confidence=0.5,
+            model_complexity=self.model_complexity
+        )
+
+    def apply_quality(self, level):
         """
-        Determine if a finger is extended or not.
-        Returns: 1 if extended (lurus), 0 if flexed (tekuk)
+        Switch to a QualityLevel (see quality.QualityGovernor).
+
+        Changes the inference scale and keyframe rate immediately; a new
+        model complexity rebuilds the (blocking) solutions graph.
+
+        Args:
+            level: QualityLevel to use from the next frame on
         """
-        # --- LOGIKA JEMPOL (THUMB) ---
-        if joints == [1, 2, 3, 4]:  
-            # Cek jarak Tip Jempol (4) ke Base Kelingking (17)
-            # Jika jauh, berarti jempol terbuka
-            thumb_tip = landmarks[4]
-            pinky_mcp = landmarks[17]
-            
-            dist_thumb_pinky = math.hypot(thumb_tip.x - pinky_mcp.x, thumb_tip.y - pinky_mcp.y)
-            
-            # Normalisasi dengan ukuran telapak tangan
-            wrist = landmarks[0]
-            middle_mcp = landmarks[9]
-            palm_size = math.hypot(wrist.x - middle_mcp.x, wrist.y - middle_mcp.y)
-            
-            # Threshold: Jika jarak jempol-kelingking > 90% lebar telapak -> Open
-            return 1 if dist_thumb_pinky > (palm_size * 0.9) else 0
+        self.inference_scale = level.inference_scale
+        if (level.hand_complexity != self.model_complexity and self.backend is not None
+                and not self.backend.asynchronous):
+            self.model_complexity = level.hand_complexity
+            self.backend.close()
+            self.backend = self._create_backend()
+            if self.crop_backend is not None:
+                self.crop_backend.close()
+                self.crop_backend = self._create_backend()
+        if level.keyframe_rate is None:
+            self.keyframe_clock = None
+        elif self.keyframe_clock is None or self.keyframe_clock.interval != 1.0 / level.keyframe_rate:
+            self.keyframe_clock = KeyframeClock(level.keyframe_rate)
+        self.extrapolator.reset()
 
-        # --- LOGIKA JARI LAIN (TELUNJUK s/d KELINGKING) ---
-        else:
-            # Menggunakan posisi Y relative terhadap pip (sendi tengah)
-            tip_y = landmarks[joints[3]].y
-            pip_y = landmarks[joints[1]].y 
-            
-            # Jika Tip lebih tinggi (nilai y lebih kecil) dari PIP -> Lurus
-            return 1 if tip_y < pip_y else 0
+    def classify(self, points):
+        """
+        Raw (not debounced) gesture name for one (21, 3) landmark array.
+        """
+        if self.gesture_model is not None:
+            return self.gesture_model.classify(points, self._aspect)
+        return GESTURES[classify_gestures(points, self.thumb_ratio)]
 
-    def identify_gesture(self, finger_states):
+    def process_frame(self, frame, timestamp=None):
         """
-        Identify the gesture based on finger states.
+        Detect the hand, cursor position and debounced gesture in a frame.
+
+        Args:
+            frame: FramePacket or BGR frame (landmarks are drawn onto its
+                   working frame)
+            timestamp: Capture time in seconds (default: ``clock()``)
+
+        Returns:
+            A tuple (hand_landmarks, gesture, cursor_position)
         """
-        # Gestur Pointing: Hanya Telunjuk Lurus
-        is_pointing = (
-            finger_states['index'] == 1 and 
-            finger_states['middle'] == 0 and 
-            finger_states['ring'] == 0 and 
-            finger_states['pinky'] == 0
-        )
+        packet = as_packet(frame)
+        if timestamp is None:
+            timestamp = packet.timestamp
+        now = self.clock() if timestamp is None else timestamp
+        h, w = packet.height, packet.width
+        self.frames += 1
+        self.motion_reused = False
         
-        # Gestur Selecting (Spider-man/Rock-on): Jempol, Telunjuk, Kelingking Lurus
-        is_selecting = (
-            finger_states['thumb'] == 1 and
-            finger_states['index'] == 1 and
-            finger_states['middle'] == 0 and
-            finger_states['ring'] == 0 and
-            finger_states['pinky'] == 1
-        )
-
-        if is_selecting:
-            return 'selecting'
-        elif is_pointing:
-            return 'pointing' # <-- Nama gestur ini yang dicari oleh tombol
+        is_keyframe = self.keyframe_clock is None or self.keyframe_clock.due(now)
+        if is_keyframe:
+            hand_landmarks = self._detect(packet, now)
         else:
-            return 'none'
+            hand_landmarks = self._extrapolate(now)
         
-    def process_frame(self, frame):
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, _ = frame.shape
-        results = self.hands.process(rgb_frame)
+        if hand_landmarks is not None and self.draw_landmarks:
+            self.mp_drawing.draw_landmarks(packet.bgr, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
         
-        hand_landmarks = None
+        gesture, cursor_position = self._interpret(now, w, h)
+
+        if self.roi_tracker and is_keyframe:
+            self.roi_tracker.update(self.points, w, h)
+
+        return hand_landmarks, gesture, cursor_position
+
+    def process_points(self, points, frame_size, timestamp=None):
+        """
+        Cursor and debounced gesture for landmarks that were detected elsewhere.
+
+        Runs the same layers as ``process_frame`` after the model (cursor
+        filter, classification, debounce, swipe) without any frame or
+        MediaPipe, e.g. to replay a recording.
+
+        Args:
+            points: (21, 3) normalized hand landmarks, or None (no hand)
+            frame_size: (width, height) of the frame the landmarks came from
+            timestamp: Frame time in seconds (default: ``clock()``)
+
+        Returns:
+            A tuple (gesture, cursor_position)
+        """
+        now = self.clock() if timestamp is None else timestamp
+        self.frames += 1
+        if points is None:
+            self.points = None
+        else:
+            self._points[:] = points
+            self.points = self._points
+        return self._interpret(now, frame_size[0], frame_size[1])
+
+    def _interpret(self, now, w, h):
+        """Cursor, gesture and swipe from ``points`` (None = no hand in this frame)."""
         cursor_position = None
         gesture = "none"
+        self.swipe_event = None
+        self._aspect = w / h
         
-        if results.multi_hand_landmarks:
-            hand_landmarks = results.multi_hand_landmarks[0]
-            landmarks = hand_landmarks.landmark
-            
-            self.mp_drawing.draw_landmarks(frame, hand_landmarks, self.mp_hands.HAND_CONNECTIONS)
-            
-            # Cek status setiap jari
-            finger_states = {
-                'thumb': self.get_finger_state(landmarks, [1, 2, 3, 4]),
-                'index': self.get_finger_state(landmarks, [5, 6, 7, 8]),
-                'middle': self.get_finger_state(landmarks, [9, 10, 11, 12]),
-                'ring': self.get_finger_state(landmarks, [13, 14, 15, 16]),
-                'pinky': self.get_finger_state(landmarks, [17, 18, 19, 20])
-            }
-            
+        points = self.points
+        if points is not None:
             # Hitung posisi cursor (ujung telunjuk)
-            index_finger_tip = landmarks[8]
-            cursor_x = int(index_finger_tip.x * w)
-            cursor_y = int(index_finger_tip.y * h)
+            cursor = (points[8, 0] * w, points[8, 1] * h)
+            if self.cursor_filter is not None:
+                horizon = self.latency.horizon * self.cursor_prediction if self.latency is not None else 0.0
+                cursor = self.cursor_filter(now, cursor, horizon)
+            cursor_position = (int(cursor[0]), int(cursor[1]))
             
-            if self.prev_position:
-                cursor_x = int(self.smoothing_factor * cursor_x + (1 - self.smoothing_factor) * self.prev_position[0])
-                cursor_y = int(self.smoothing_factor * cursor_y + (1 - self.smoothing_factor) * self.prev_position[1])
-            
-            cursor_position = (cursor_x, cursor_y)
-            self.prev_position = cursor_position
-            
-            # Identifikasi Gestur
-            current_gesture = self.identify_gesture(finger_states)
+            # Identifikasi Gestur (status kelima jari sekaligus, atau model)
+            current_gesture = self.classify(points)
             
             # Debouncing logic
-            if current_gesture != self.last_gesture:
-                self.gesture_cooldown += 1
-                if self.gesture_cooldown > 2: 
-                    gesture = current_gesture
-                    self.last_gesture = current_gesture
-                    self.gesture_cooldown = 0
-                else:
-                    gesture = self.last_gesture
+            gesture = self.debounce(current_gesture, now)
+            
+            if self.swipe is not None:
+                self.swipe_event = self.swipe.update(now, points, w, h)
+        elif self.swipe is not None:
+            self.swipe.reset()
+        return gesture, cursor_position
+
+    def _detect(self, packet, now):
+        """Run the model (a keyframe); sets ``points`` and returns the landmarks or None."""
+        previous = None
+        if self.motion_gate is not None:
+            roi = points_roi(self.points) if self.points is not None else None
+            if not self.motion_gate.check(packet, roi, now):
+                self.motion_reused = True
+                return self._reuse(now)
+            if self.motion_gate.auditing and self.points is not None:
+                previous = self.points[8, :2] * (packet.width, packet.height)
+        self.keyframes += 1
+        # Backend "tasks" mengembalikan hasil terbaru yang sudah selesai (tidak menunggu)
+        if self.roi_tracker:
+            multi_hand_landmarks = self.roi_tracker.detect(self.backend, self.crop_backend, packet.rgb, now * 1000)
+        else:
+            multi_hand_landmarks = self.backend.detect(packet.scaled_rgb(self.inference_scale), now * 1000)
+        
+        audit = self.motion_gate is not None and self.motion_gate.auditing
+        hand_landmarks = multi_hand_landmarks[0] if multi_hand_landmarks else None
+        if self.hand_tracks is not None:
+            hand_landmarks = self._select_active(multi_hand_landmarks or [], now)
+        if hand_landmarks is None:
+            if audit and self.points is not None:
+                self.motion_gate.record_audit(None)
+            self.points = self._keyframe_landmarks = None
+            self.extrapolator.reset()
+            return None
+        
+        # Landmark -> array (21, 3) sekali, semua perhitungan berikutnya vektor
+        self._keyframe_landmarks = hand_landmarks
+        self.points = landmarks_to_array(hand_landmarks, self._points)
+        if audit:
+            # Seberapa jauh cursor hasil reuse dari hasil model yang baru
+            if previous is None:
+                self.motion_gate.record_audit(None)
             else:
-                self.gesture_cooldown = 0
-                gesture = self.last_gesture
+                cursor = self.points[8, :2] * (packet.width, packet.height)
+                self.motion_gate.record_audit(float(np.hypot(*(cursor - previous))))
+        if self.keyframe_clock is not None:
+            self.extrapolator.update(now, self.points)
+        return hand_landmarks
+
+    def _select_active(self, multi_hand_landmarks, now):
+        """Track every hand and return the active user's landmarks (or None)."""
+        boxes = [landmark_box(hand, _BOX_LANDMARKS) for hand in multi_hand_landmarks]
+        tracks = self.hand_tracks.update(boxes, now)
+        active = self.user_selector.select(tracks, now, near=self.active_face_box)
+        if active is None:
+            return None
+        if active.track_id != self.active_track_id:
+            # User lain mengambil alih: smoothing, debounce dan ekstrapolasi mulai dari awal
+            self.active_track_id = active.track_id
+            self.reset_user_state()
+        return multi_hand_landmarks[tracks.index(active)]
+
+    def reset_user_state(self):
+        """Forget per-user state (cursor smoothing, debounce, extrapolation, ROI)."""
+        if self.cursor_filter is not None:
+            self.cursor_filter.reset()
+        self.last_gesture = "none"
+        self.candidate_since = None
+        self.last_change_time = None
+        self.extrapolator.reset()
+        if self.roi_tracker:
+            self.roi_tracker.reset()
+        if self.swipe is not None:
+            self.swipe.reset()
+
+    def _reuse(self, now):
+        """Static frame: keep the previous landmarks (``points`` is unchanged)."""
+        if self.points is None:
+            return None
+        if self.keyframe_clock is not None:
+            # Tidak ada gerakan: kecepatan ekstrapolasi menjadi nol
+            self.extrapolator.update(now, self.points)
+        return self._keyframe_landmarks
+
+    def _extrapolate(self, now):
+        """Between keyframes: move the last keyframe's landmarks along their velocity."""
+        predicted = self.extrapolator.predict(now)
+        if predicted is None or self._keyframe_landmarks is None:
+            self.points = None
+            return None
+        self.points = self._points
+        self.points[:] = predicted
+        # Proto sebelumnya sudah dipublikasikan (InferenceResult.landmarks): isi salinan baru
+        # agar gambar skeleton tidak tertinggal tanpa mengubah hasil frame lama
+        landmarks = type(self._keyframe_landmarks)()
+        landmarks.CopyFrom(self._keyframe_landmarks)
+        for lm, (x, y, z) in zip(landmarks.landmark, self.points.tolist()):
+            lm.x, lm.y, lm.z = x, y, z
+        self._keyframe_landmarks = landmarks
+        return landmarks
+
+    def debounce(self, current_gesture, now):
+        """
+        Accept a new gesture only after it has been stable for ``debounce_time``.
+
+        Args:
+            current_gesture: Raw gesture from this frame
+            now: Current time in seconds
+
+        Returns:
+            The debounced gesture
+        """
+        if current_gesture == self.last_gesture:
+            self.candidate_since = None
+            return self.last_gesture
+
+        if self.candidate_since is None:
+            self.candidate_since = now
+
+        stable = now - self.candidate_since >= self.debounce_time
+        cooled = self.last_change_time is None or now - self.last_change_time >= self.cooldown_time
+        if stable and cooled:
+            self.last_gesture = current_gesture
+            self.last_change_time = now
+            self.candidate_since = None
+        return self.last_gesture
+
+    def release(self):
+        """Release the MediaPipe graph."""
+        if self.backend is not None:
+            self.backend.close()
+        if self.crop_backend is not None:
+            self.crop_backend.close()
+
+
+def apply_params(detector, params):
+    """
+    Apply tuned gesture parameters to a HandGestureDetector (unknown keys are ignored).
+
+    Args:
+        detector: HandGestureDetector
+        params: Dict of GESTURE_PARAMETERS names to values (e.g. a saved sweep result)
+    """
+    if "thumb_ratio" in params:
+        detector.thumb_ratio = params["thumb_ratio"]
+    if "debounce_time" in params:
+        detector.debounce_time = params["debounce_time"]
+    if "cooldown_time" in params:
+        detector.cooldown_time = params["cooldown_time"]
+    if detector.cursor_filter is not None:
+        detector.cursor_filter.min_cutoff = params.get("cursor_min_cutoff", detector.cursor_filter.min_cutoff)
+        detector.cursor_filter.beta = params.get("cursor_beta", detector.cursor_filter.beta)
+
+
+def load_params(path):
+    """
+    Parameters saved by ``sweep --save`` (a JSON object), or {} when ``path`` is empty.
 
-        return hand_landmarks, gesture, cursor_position
\ No newline at end of file
+    Raises:
+        ValueError: If the file holds names that are not in GESTURE_PARAMETERS
+    """
+    if not path:
+        return {}
+    with open(path) as f:
+        params = json.load(f)
+    unknown = set(params) - set(GESTURE_PARAMETERS)
+    if unknown:
+        raise ValueError(f"{path}: unknown gesture parameters {sorted(unknown)}")
+    return params
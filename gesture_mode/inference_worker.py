@@ -0,0 +1,260 @@
+"""
+Inference Worker Module
+Runs hand inference on a background thread and publishes the latest result.
+"""
+import threading
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+from .frame_packet import BufferPool, FramePacket
+
+
+# Result published by the worker. Coordinates are in the mirrored frame;
+# ``points`` is the (21, 3) normalized landmark array (None without a hand).
+InferenceResult = namedtuple(
+    "InferenceResult",
+    ["frame_id", "timestamp", "landmarks", "gesture", "cursor", "frame_size", "points"],
+)
+
+
+class ResultMailbox:
+    """Lock-protected slot holding only the most recent inference result."""
+
+    def __init__(self):
+        """Initialize an empty mailbox."""
+        self._lock = threading.Lock()
+        self._result = None
+
+    def post(self, result):
+        """Replace the stored result."""
+        with self._lock:
+            self._result = result
+
+    def read(self):
+        """Return the latest result (or None). Never blocks on inference."""
+        with self._lock:
+            return self._result
+
+    def clear(self):
+        """Drop the stored result."""
+        with self._lock:
+            self._result = None
+
+
+class InferenceWorker:
+    """
+    Consumes frames from a CameraService and runs a gesture detector on them.
+
+    The detector is created and used only on the worker thread, so building
+    the MediaPipe graph and running inference never block the Tk loop. The
+    Tk side only reads ``mailbox`` and paints.
+
+    At most one detector exists at a time across all workers: a newly
+    started thread builds its detector only after the previously started
+    worker thread (of any instance, e.g. the screen that was just hidden)
+    has released its own.
+    """
+
+    # Thread worker terakhir yang dijalankan (semua instance) dan batas tunggunya
+    _last_thread = None
+    _handoff_lock = threading.Lock()
+    handoff_timeout = 5.0
+
+    def __init__(self, camera, detector_factory, mirror=True, governor=None, presence=None, recorder=None):
+        """
+        Initialize the worker.
+
+        Args:
+            camera: CameraService providing frames
+            detector_factory: Callable returning an object with
+                              ``process_frame(frame, timestamp)``
+            mirror: Flip frames horizontally before inference (like the UI)
+            governor: Optional QualityGovernor fed with the inference times
+                      of frames the model ran on (not those the detector's
+                      motion gate skipped); its level is applied to the
+                      detector (``apply_quality``)
+            presence: Optional PresenceMonitor; while it is idle the detector
+                      is released and only a low-rate motion check runs
+            recorder: Optional recording.LandmarkRecorder; every result
+                      (landmarks, cursor, gesture, swipe) is appended to it
+        """
+        self.camera = camera
+        self.detector_factory = detector_factory
+        self.mirror = mirror
+        self.governor = governor
+        self.presence = presence
+        self.recorder = recorder
+        self.mailbox = ResultMailbox()
+        # Event diskrit (mis. swipe) tidak boleh tertimpa seperti hasil di mailbox
+        self.events = deque(maxlen=16)
+
+        self._thread = None
+        self._stop_event = None
+
+        # Statistik
+        self.frames_processed = 0
+        self.last_inference_ms = 0.0
+        self.last_wake_ms = None
+        self.detector = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive() and not self._stop_event.is_set()
+
+    def poll_events(self):
+        """Return and remove the discrete events (e.g. "swipe_left") posted since the last call."""
+        events = []
+        while self.events:
+            events.append(self.events.popleft())
+        return events
+
+    @property
+    def idle(self):
+        """True while the presence monitor has parked the detector."""
+        return self.presence is not None and self.presence.idle
+
+    def report(self):
+        """One-line summary of the worker (and ROI tracker) statistics."""
+        text = f"inference {self.last_inference_ms:.1f} ms | frames {self.frames_processed}"
+        tracker = getattr(self.detector, "roi_tracker", None)
+        if tracker is not None:
+            text += f" | {tracker.report()}"
+        gate = getattr(self.detector, "motion_gate", None)
+        if gate is not None:
+            text += f" | {gate.report()}"
+        if self.governor is not None:
+            text += f" | {self.governor.report()}"
+        if self.presence is not None:
+            text += f" | {self.presence.report()}"
+            if self.last_wake_ms is not None:
+                text += f" | wake {self.last_wake_ms:.0f} ms"
+        return text
+
+    def start(self):
+        """Start a fresh worker thread (a previous one is told to stop)."""
+        self.stop()
+        self.mailbox.clear()
+        self.events.clear()
+        self._stop_event = threading.Event()
+        with InferenceWorker._handoff_lock:
+            previous = InferenceWorker._last_thread
+            self._thread = InferenceWorker._last_thread = threading.Thread(
+                target=self._run, args=(self._stop_event, previous), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Ask the worker thread to stop.
+
+        Does not join: an inference call that is already running finishes on
+        its own, so hiding a screen never waits on the model. The next
+        worker thread waits for this one before building its detector.
+        """
+        if self._stop_event is not None:
+            self._stop_event.set()
+        self._thread = None
+
+    def _create_detector(self):
+        """Build the detector (on the worker thread) at the governor's current level."""
+        detector = self.detector = self.detector_factory()
+        if self.governor is not None and hasattr(detector, "apply_quality"):
+            # Detector baru mulai di level yang sudah dipelajari governor
+            detector.apply_quality(self.governor.level)
+        return detector
+
+    def _release_detector(self):
+        detector, self.detector = self.detector, None
+        if detector is not None and hasattr(detector, "release"):
+            detector.release()
+
+    def _run(self, stop_event, previous):
+        """Create the detector on this thread, run the loop, release the detector."""
+        if previous is not None and not self._wait_for(previous, stop_event):
+            return
+        pool = BufferPool()  # milik thread ini saja
+        if self.presence is not None:
+            self.presence.reset()
+        self._create_detector()
+        try:
+            self._loop(pool, stop_event)
+        finally:
+            self._release_detector()
+
+    def _wait_for(self, previous, stop_event):
+        """
+        Wait (on this worker thread) until the previous worker thread has exited.
+
+        Returns:
+            False if this worker was stopped while waiting
+        """
+        # Satu graph MediaPipe pada satu waktu: thread lama melepas detector-nya
+        # setelah process_frame yang sedang berjalan selesai. Tetap ditunggu walau
+        # thread ini sudah diminta berhenti, agar thread berikutnya (yang hanya
+        # menunggu thread ini) tidak mendahului thread lama
+        previous.join(timeout=self.handoff_timeout)
+        if previous.is_alive():
+            print("⚠️ Worker inferensi sebelumnya belum berhenti, detector baru tetap dibuat.")
+        return not stop_event.is_set()
+
+    def _loop(self, pool, stop_event):
+        """Worker loop: wait for a new frame, run inference, post the result."""
+        last_frame_id = 0
+        woke_at = None
+        while not stop_event.is_set():
+            if self.idle:
+                # Idle: model sudah dilepas, gerakan dicek beberapa kali per detik saja
+                stop_event.wait(self.presence.idle_interval)
+                latest = self.camera.read_latest(last_frame_id)
+            else:
+                latest = self.camera.wait_for_frame(last_frame_id, timeout=0.5)
+            if latest is None:
+                continue
+            frame_id, timestamp, frame = latest
+            last_frame_id = frame_id
+
+            # Tanpa mirror, salin ke buffer pool agar frame bersama tidak pernah diubah
+            if not self.mirror:
+                copy = pool.take("raw", frame.shape)
+                np.copyto(copy, frame)
+                frame = copy
+            packet = FramePacket(frame, mirror=self.mirror, pool=pool, timestamp=timestamp, frame_id=frame_id)
+
+            if self.idle:
+                if self.presence.motion(packet, timestamp):
+                    woke_at = timestamp
+                    self._create_detector()
+                continue
+
+            detector = self.detector
+            start = time.perf_counter()
+            landmarks, gesture, cursor = detector.process_frame(packet, timestamp)
+            self.last_inference_ms = (time.perf_counter() - start) * 1000
+            self.frames_processed += 1
+
+            if stop_event.is_set():
+                break
+            # Frame yang dilewati motion gate hanya butuh mikrodetik: user diam tidak boleh
+            # menarik rata-rata governor ke nol (naik kualitas palsu, lalu turun lagi saat bergerak)
+            if self.governor is not None and not getattr(detector, "motion_reused", False):
+                level = self.governor.observe(self.last_inference_ms, timestamp)
+                if level is not None and hasattr(detector, "apply_quality"):
+                    detector.apply_quality(level)
+            points = getattr(detector, "points", None)
+            self.mailbox.post(InferenceResult(frame_id, timestamp, landmarks, gesture, cursor,
+                                              (packet.width, packet.height),
+                                              None if points is None else points.copy()))
+            event = getattr(detector, "swipe_event", None)
+            if event is not None:
+                self.events.append(event)
+            if self.recorder is not None:
+                self.recorder.append(timestamp, (packet.width, packet.height), hand=points, cursor=cursor,
+                                     gesture=gesture, event=event)
+            if woke_at is not None:
+                # Gerakan terlihat -> hasil pertama dengan model yang baru dibangun
+                self.last_wake_ms = (time.monotonic() - woke_at) * 1000
+                woke_at = None
+            if self.presence is not None and self.presence.seen(points is not None, timestamp):
+                # Tidak ada orang selama idle_after detik: lepaskan graph MediaPipe
+                self._release_detector()
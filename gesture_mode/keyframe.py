@@ -0,0 +1,92 @@
+"""
+Keyframe Module
+Predicts landmark positions between keyframe detections.
+"""
+import numpy as np
+
+
+class LandmarkExtrapolator:
+    """
+    Constant-velocity prediction of a landmark array between keyframes.
+
+    The velocity comes from the last two keyframes. Predictions stop moving
+    after ``max_horizon`` seconds so a missed keyframe does not send the
+    overlay flying off along an old velocity.
+    """
+
+    def __init__(self, max_horizon=0.15, max_gap=0.5):
+        """
+        Initialize the extrapolator.
+
+        Args:
+            max_horizon: Longest time (seconds) to extrapolate past a keyframe
+            max_gap: Keyframes further apart than this (seconds) don't give a
+                     velocity (the hand/face was probably lost in between)
+        """
+        self.max_horizon = max_horizon
+        self.max_gap = max_gap
+        self.reset()
+
+    def reset(self):
+        """Forget all keyframes."""
+        self.time = None
+        self.points = None
+        self.velocity = None
+
+    def update(self, timestamp, points):
+        """
+        Record a keyframe.
+
+        Args:
+            timestamp: Keyframe time in seconds
+            points: Landmark array (any shape, float)
+        """
+        points = np.array(points, np.float64)
+        if self.points is not None and self.points.shape == points.shape and 0 < timestamp - self.time <= self.max_gap:
+            self.velocity = (points - self.points) / (timestamp - self.time)
+        else:
+            self.velocity = None
+        self.time = timestamp
+        self.points = points
+
+    def predict(self, timestamp):
+        """
+        Predicted landmarks at ``timestamp`` (a new array), or None without a keyframe.
+        """
+        if self.points is None:
+            return None
+        if self.velocity is None:
+            return self.points.copy()
+        dt = min(max(timestamp - self.time, 0.0), self.max_horizon)
+        return self.points + self.velocity * dt
+
+
+class KeyframeClock:
+    """
+    Decides which frames are keyframes for a target keyframe rate.
+
+    Keyframes are due on a fixed time grid rather than "interval since the
+    last one", so 12 Hz on a 30 fps stream averages 12 Hz instead of rounding
+    down to every third frame (10 Hz).
+    """
+
+    def __init__(self, rate, tolerance=0.002):
+        """
+        Args:
+            rate: Keyframes per second
+            tolerance: Seconds a frame may arrive early and still count
+        """
+        self.interval = 1.0 / rate
+        self.tolerance = tolerance
+        self.next_time = None
+
+    def due(self, timestamp):
+        """Return True (and advance the grid) if the frame at ``timestamp`` is a keyframe."""
+        if self.next_time is not None and timestamp < self.next_time - self.tolerance:
+            return False
+        if self.next_time is None or timestamp - self.next_time >= self.interval:
+            # Awal atau tertinggal jauh (mis. frame terlewat): mulai grid baru
+            self.next_time = timestamp + self.interval
+        else:
+            self.next_time += self.interval
+        return True
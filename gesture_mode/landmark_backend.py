@@ -0,0 +1,219 @@
+"""
+Landmark Backend Module
+Interchangeable MediaPipe backends behind HandGestureDetector and FaceDetector.
+
+"solutions" uses the legacy blocking ``mp.solutions`` graphs. "tasks" uses
+the MediaPipe Tasks landmarkers in LIVE_STREAM mode: frames are submitted
+with ``detect_async`` and results arrive on a callback, so the caller never
+waits for inference and the graph pipelines frames internally. Both return
+landmark lists with a ``.landmark`` field, like the legacy solutions do.
+"""
+import os
+import threading
+
+try:
+    import mediapipe as mp
+except ImportError:  # tanpa MediaPipe hanya replay (tanpa backend) yang bisa jalan
+    mp = None
+
+# Lokasi default model .task (unduh dari halaman model MediaPipe Tasks)
+MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "models")
+HAND_MODEL_PATH = os.path.join(MODEL_DIR, "hand_landmarker.task")
+FACE_MODEL_PATH = os.path.join(MODEL_DIR, "face_landmarker.task")
+
+BACKENDS = ("solutions", "tasks")
+
+
+class SolutionsHandBackend:
+    """Legacy ``mp.solutions.hands.Hands`` (blocking)."""
+
+    asynchronous = False
+
+    def __init__(self, max_num_hands=1, min_detection_confidence=0.7, min_tracking_confidence=0.5,
+                 model_complexity=1):
+        self.model_complexity = model_complexity
+        self.hands = mp.solutions.hands.Hands(
+            max_num_hands=max_num_hands,
+            model_complexity=model_complexity,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence
+        )
+
+    def detect(self, rgb, timestamp_ms):
+        """Return the hand landmark lists found in ``rgb`` (may be empty)."""
+        results = self.hands.process(rgb)
+        return results.multi_hand_landmarks or []
+
+    def close(self):
+        self.hands.close()
+
+
+class SolutionsFaceBackend:
+    """Legacy ``mp.solutions.face_mesh.FaceMesh`` (blocking)."""
+
+    asynchronous = False
+
+    def __init__(self, max_num_faces=1, min_detection_confidence=0.5, min_tracking_confidence=0.5,
+                 refine_landmarks=True):
+        self.refine_landmarks = refine_landmarks
+        self.face_mesh = mp.solutions.face_mesh.FaceMesh(
+            static_image_mode=False,
+            max_num_faces=max_num_faces,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            refine_landmarks=refine_landmarks
+        )
+
+    def detect(self, rgb, timestamp_ms):
+        """Return the face landmark lists found in ``rgb`` (may be empty)."""
+        results = self.face_mesh.process(rgb)
+        return results.multi_face_landmarks or []
+
+    def close(self):
+        self.face_mesh.close()
+
+
+def _to_landmark_list(landmarks):
+    """Convert Tasks landmarks into the NormalizedLandmarkList the solutions return."""
+    from mediapipe.framework.formats import landmark_pb2
+
+    landmark_list = landmark_pb2.NormalizedLandmarkList()
+    landmark_list.landmark.extend(
+        landmark_pb2.NormalizedLandmark(x=lm.x, y=lm.y, z=lm.z) for lm in landmarks
+    )
+    return landmark_list
+
+
+class _LiveStreamBackend:
+    """
+    Shared LIVE_STREAM plumbing: timestamped async submission, latest result.
+
+    ``detect`` submits the frame and immediately returns the most recent
+    result the callback has delivered, which usually belongs to an earlier
+    frame. Frames submitted while the graph is busy are dropped by MediaPipe.
+    """
+
+    asynchronous = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latest = []
+        self._last_timestamp_ms = -1
+        self.result_timestamp_ms = None
+        self.landmarker = None
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        landmark_lists = [_to_landmark_list(landmarks) for landmarks in self._extract(result)]
+        with self._lock:
+            self._latest = landmark_lists
+            self.result_timestamp_ms = timestamp_ms
+
+    def _extract(self, result):
+        raise NotImplementedError
+
+    def detect(self, rgb, timestamp_ms):
+        """Submit ``rgb`` asynchronously and return the latest finished landmark lists."""
+        # LIVE_STREAM menolak timestamp yang tidak naik
+        timestamp_ms = max(int(timestamp_ms), self._last_timestamp_ms + 1)
+        self._last_timestamp_ms = timestamp_ms
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
+        self.landmarker.detect_async(image, timestamp_ms)
+        with self._lock:
+            return self._latest
+
+    def close(self):
+        self.landmarker.close()
+
+
+class TasksHandBackend(_LiveStreamBackend):
+    """MediaPipe Tasks ``HandLandmarker`` in LIVE_STREAM mode."""
+
+    def __init__(self, model_path=HAND_MODEL_PATH, max_num_hands=1,
+                 min_detection_confidence=0.7, min_tracking_confidence=0.5, model_complexity=None):
+        # model_complexity diabaikan: bundle .task hanya berisi satu model
+        super().__init__()
+        from mediapipe.tasks import python as mp_tasks
+        from mediapipe.tasks.python import vision
+
+        options = vision.HandLandmarkerOptions(
+            base_options=mp_tasks.BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_hands=max_num_hands,
+            min_hand_detection_confidence=min_detection_confidence,
+            min_hand_presence_confidence=min_tracking_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            result_callback=self._on_result,
+        )
+        self.landmarker = vision.HandLandmarker.create_from_options(options)
+
+    def _extract(self, result):
+        return result.hand_landmarks
+
+
+class TasksFaceBackend(_LiveStreamBackend):
+    """MediaPipe Tasks ``FaceLandmarker`` in LIVE_STREAM mode."""
+
+    def __init__(self, model_path=FACE_MODEL_PATH, max_num_faces=1,
+                 min_detection_confidence=0.5, min_tracking_confidence=0.5, refine_landmarks=None):
+        # refine_landmarks diabaikan: FaceLandmarker selalu mengeluarkan 478 landmark
+        super().__init__()
+        from mediapipe.tasks import python as mp_tasks
+        from mediapipe.tasks.python import vision
+
+        options = vision.FaceLandmarkerOptions(
+            base_options=mp_tasks.BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_faces=max_num_faces,
+            min_face_detection_confidence=min_detection_confidence,
+            min_face_presence_confidence=min_tracking_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            result_callback=self._on_result,
+        )
+        self.landmarker = vision.FaceLandmarker.create_from_options(options)
+
+    def _extract(self, result):
+        return result.face_landmarks
+
+
+def _create(kind, backend, tasks_cls, solutions_cls, model_path, **kwargs):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown landmark backend {backend!r}, expected one of {BACKENDS}")
+    if mp is None:
+        raise ImportError(f"MediaPipe is not installed, no {kind} landmark backend available")
+    if backend == "tasks":
+        if os.path.exists(model_path):
+            try:
+                return tasks_cls(model_path=model_path, **kwargs)
+            except (ImportError, AttributeError, RuntimeError) as e:
+                print(f"⚠️ MediaPipe Tasks {kind} tidak bisa dipakai ({e}), kembali ke solutions.")
+        else:
+            print(f"⚠️ Model {model_path} tidak ditemukan, {kind} kembali ke solutions.")
+    return solutions_cls(**kwargs)
+
+
+def create_hand_backend(backend="solutions", model_path=HAND_MODEL_PATH, **kwargs):
+    """
+    Create a hand landmark backend.
+
+    Args:
+        backend: "solutions" or "tasks" (falls back to "solutions" when the
+                 Tasks API or the model file is not available)
+        model_path: ``hand_landmarker.task`` for the Tasks backend
+        **kwargs: max_num_hands, min_detection_confidence, min_tracking_confidence,
+                  model_complexity (0 or 1, solutions only)
+    """
+    return _create("hand", backend, TasksHandBackend, SolutionsHandBackend, model_path, **kwargs)
+
+
+def create_face_backend(backend="solutions", model_path=FACE_MODEL_PATH, **kwargs):
+    """
+    Create a face landmark backend.
+
+    Args:
+        backend: "solutions" or "tasks" (falls back to "solutions" when the
+                 Tasks API or the model file is not available)
+        model_path: ``face_landmarker.task`` for the Tasks backend
+        **kwargs: max_num_faces, min_detection_confidence, min_tracking_confidence,
+                  refine_landmarks (iris landmarks, solutions only)
+    """
+    return _create("face", backend, TasksFaceBackend, SolutionsFaceBackend, model_path, **kwargs)
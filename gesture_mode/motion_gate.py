@@ -0,0 +1,171 @@
+"""
+Motion Gate Module
+Skips landmark inference on frames where nothing moved inside the region of
+interest and lets the detector reuse its previous result.
+"""
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """
+    Cheap change detector in front of a landmark model.
+
+    ``check`` shrinks the frame to a ``width``-pixel wide, slightly blurred
+    grayscale thumbnail (about 0.1 ms; the blur keeps sensor noise below the
+    threshold) and compares it with the thumbnail of the frame the model last
+    ran on (not simply the previous frame, so slow drift still adds up).
+    Inside the region of interest it counts pixels whose absolute difference
+    exceeds ``pixel_threshold``; when fewer than ``min_changed`` of them
+    changed the model can be skipped. The model still runs when the
+    reference is older than ``max_age`` seconds, and every ``audit_every``-th
+    skip runs it anyway so the detector can report, through
+    ``record_audit``, how far the reused result was from a fresh one.
+    """
+
+    def __init__(self, pixel_threshold=8, min_changed=0.01, max_age=1.0, audit_every=30, width=160):
+        """
+        Initialize the gate.
+
+        Args:
+            pixel_threshold: Gray level difference that counts as a change
+            min_changed: Fraction of changed ROI pixels that counts as motion
+            max_age: Seconds after which the model runs regardless
+            audit_every: Run the model on every n-th skippable frame to
+                         measure the error of reusing (0 = never)
+            width: Thumbnail width in pixels
+        """
+        self.pixel_threshold = pixel_threshold
+        self.min_changed = min_changed
+        self.max_age = max_age
+        self.audit_every = audit_every
+        self.width = width
+
+        self._thumb = None
+        self._reference = None
+        self._current = None
+        self._reference_time = None
+        self._since_audit = 0
+        self.auditing = False
+        self.last_changed = 0.0
+
+        # Statistik
+        self.frames = 0
+        self.skips = 0
+        self.audits = 0
+        self.audit_errors = []
+        self.audit_mismatches = 0
+
+    def reset(self):
+        """Forget the reference frame (the next check runs the model)."""
+        self._reference = None
+        self._reference_time = None
+        self.auditing = False
+
+    def check(self, packet, roi, timestamp):
+        """
+        Decide whether the model has to run on this frame.
+
+        Args:
+            packet: FramePacket of the frame (``raw`` is sampled, so drawings
+                    on ``bgr`` don't count as motion)
+            roi: (x0, y0, x1, y1) normalized region to watch, or None for
+                 the whole frame (nothing tracked yet)
+            timestamp: Frame time in seconds
+
+        Returns:
+            True if the model must run (the frame becomes the new
+            reference), False if the previous result can be reused
+        """
+        self.frames += 1
+        width = min(self.width, packet.width)
+        height = max(1, round(packet.height * width / packet.width))
+        if self._current is None or self._current.shape != (height, width):
+            self._thumb = np.empty((height, width, 3), np.uint8)
+            self._current = np.empty((height, width), np.uint8)
+            self._reference = None
+        # INTER_LINEAR jauh lebih murah dari INTER_AREA; blur kecil meredam noise sensor
+        cv2.resize(packet.raw, (width, height), dst=self._thumb, interpolation=cv2.INTER_LINEAR)
+        if packet.mirror:
+            cv2.flip(self._thumb, 1, dst=self._thumb)
+        cv2.cvtColor(self._thumb, cv2.COLOR_BGR2GRAY, dst=self._current)
+        cv2.GaussianBlur(self._current, (3, 3), 0, dst=self._current)
+
+        self.auditing = False
+        if self._reference is None or timestamp - self._reference_time >= self.max_age:
+            return self._run(timestamp)
+
+        if roi is None:
+            y0, y1, x0, x1 = 0, height, 0, width
+        else:
+            x0 = max(int(roi[0] * width), 0)
+            y0 = max(int(roi[1] * height), 0)
+            x1 = min(int(np.ceil(roi[2] * width)), width)
+            y1 = min(int(np.ceil(roi[3] * height)), height)
+            if x1 <= x0 or y1 <= y0:
+                return self._run(timestamp)
+        diff = cv2.absdiff(self._current[y0:y1, x0:x1], self._reference[y0:y1, x0:x1])
+        self.last_changed = np.count_nonzero(diff > self.pixel_threshold) / diff.size
+        if self.last_changed >= self.min_changed:
+            return self._run(timestamp)
+
+        # Tidak ada gerakan: sesekali tetap jalankan model untuk mengukur error reuse
+        self._since_audit += 1
+        if self.audit_every and self._since_audit >= self.audit_every:
+            self._since_audit = 0
+            self.audits += 1
+            self.auditing = True
+            return self._run(timestamp)
+        self.skips += 1
+        return False
+
+    def _run(self, timestamp):
+        # Frame ini menjadi referensi (hasil model berikutnya berasal dari frame ini)
+        self._reference, self._current = self._current, self._reference
+        if self._current is None:
+            self._current = np.empty_like(self._reference)
+        self._reference_time = timestamp
+        return True
+
+    def record_audit(self, error_px):
+        """
+        Record how far the result that would have been reused was from the fresh one.
+
+        Args:
+            error_px: Distance in pixels, or None if one of the two results
+                      found nothing (a presence mismatch)
+        """
+        if error_px is None:
+            self.audit_mismatches += 1
+        else:
+            self.audit_errors.append(float(error_px))
+
+    @property
+    def skip_ratio(self):
+        """Fraction of checked frames on which the model was skipped."""
+        return self.skips / self.frames if self.frames else 0.0
+
+    def report(self):
+        """One-line summary of the gate statistics."""
+        text = f"gate skip {self.skip_ratio:.0%} ({self.skips}/{self.frames}) | audits {self.audits}"
+        if self.audit_errors:
+            errors = np.asarray(self.audit_errors)
+            text += f" | reuse error mean {errors.mean():.1f} px max {errors.max():.1f} px"
+        if self.audit_mismatches:
+            text += f" | presence mismatch {self.audit_mismatches}"
+        return text
+
+
+def points_roi(points, padding=0.25):
+    """
+    Normalized (x0, y0, x1, y1) box around points, padded by ``padding`` of its size.
+
+    Args:
+        points: (N, 2+) normalized coordinates
+        padding: Margin on each side as a fraction of the larger box side
+    """
+    points = np.asarray(points)
+    x0, y0 = points[:, :2].min(axis=0)
+    x1, y1 = points[:, :2].max(axis=0)
+    margin = max(x1 - x0, y1 - y0) * padding
+    return (x0 - margin, y0 - margin, x1 + margin, y1 + margin)
@@ -0,0 +1,286 @@
+"""
+Parallel Inference Module
+Runs the hand and face MediaPipe graphs in separate worker processes.
+
+Frames are written once into shared-memory ring slots; only the frame id,
+slot index and timestamp travel through the queues, so no image is pickled.
+"""
+import multiprocessing
+import queue
+from collections import deque
+from functools import partial
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .frame_packet import FramePacket
+
+
+class SharedFrameRing:
+    """A fixed number of equally sized frame slots in one shared-memory block."""
+
+    def __init__(self, frame_shape, slots=4, name=None):
+        """
+        Create (``name`` is None) or attach to (``name`` given) a ring.
+
+        Args:
+            frame_shape: Shape of one frame, e.g. (720, 1280, 3)
+            slots: Number of slots in the ring
+            name: Name of an existing shared-memory block to attach to
+        """
+        self.frame_shape = tuple(frame_shape)
+        self.slots = slots
+        slot_bytes = int(np.prod(self.frame_shape))
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=slot_bytes * slots)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self._frames = np.ndarray((slots,) + self.frame_shape, dtype=np.uint8, buffer=self.shm.buf)
+
+    def view(self, slot):
+        """Return the frame stored in ``slot`` (a view, not a copy)."""
+        return self._frames[slot]
+
+    def write(self, slot, frame):
+        """Copy a frame into ``slot``."""
+        np.copyto(self._frames[slot], frame)
+
+    def close(self):
+        """Detach from the block; the owner also unlinks it."""
+        self._frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _worker(kind, factory, ring_name, frame_shape, slots, requests, results):
+    """
+    Worker process loop: run one detector on frames from the shared ring.
+
+    Args:
+        kind: "hand" or "face"
+        factory: Callable creating the detector inside the worker
+        ring_name: Shared-memory block name
+        frame_shape: Shape of one frame
+        slots: Number of ring slots
+        requests: Queue of (frame_id, slot, timestamp), None to stop
+        results: Queue receiving (kind, frame_id, result)
+    """
+    ring = SharedFrameRing(frame_shape, slots, name=ring_name)
+    detector = factory()
+    try:
+        while True:
+            request = requests.get()
+            if request is None:
+                break
+            frame_id, slot, timestamp = request
+            frame = ring.view(slot)
+            try:
+                if kind == "hand":
+                    result = detector.process_frame(frame, timestamp)
+                else:
+                    result = detector.detect_face(frame)
+            except Exception as e:
+                results.put(("error", frame_id, f"{kind}: {e!r}"))
+                continue
+            results.put((kind, frame_id, result))
+    finally:
+        if hasattr(detector, "release"):
+            detector.release()
+        ring.close()
+
+
+def _hand_factory(backend="solutions"):
+    from .hand_gesture import HandGestureDetector
+    # Worker tidak boleh menggambar ke slot bersama
+    return HandGestureDetector(draw_landmarks=False, backend=backend)
+
+
+def _face_factory(backend="solutions"):
+    from .face_detection import FaceDetector
+    detector = FaceDetector(backend=backend)
+    detector.detection_interval = 0  # throttling sudah diatur oleh pemanggil
+    return detector
+
+
+class ParallelInference:
+    """
+    Hosts HandGestureDetector and FaceDetector in two worker processes.
+
+    ``submit`` writes a frame into a free ring slot and sends its id to both
+    workers; ``collect`` gathers results and returns frames whose hand and
+    face results have both arrived, matched by frame id. A slot is reused
+    only after both workers have answered for it.
+    """
+
+    def __init__(self, frame_shape, slots=4, hand_factory=None, face_factory=None, backend="solutions"):
+        """
+        Start the worker processes.
+
+        Args:
+            frame_shape: Shape of the frames that will be submitted
+            slots: Ring size (= maximum number of frames in flight)
+            hand_factory: Picklable callable creating the hand detector
+            face_factory: Picklable callable creating the face detector
+            backend: Landmark backend for the default factories
+                     ("solutions" or "tasks")
+        """
+        self.ring = SharedFrameRing(frame_shape, slots)
+        self._free_slots = deque(range(slots))
+        self._pending = {}
+        self._completed = {}
+        self._next_id = 0
+
+        context = multiprocessing.get_context("spawn")
+        self._results = context.Queue()
+        self._requests = {}
+        self._workers = []
+        factories = {
+            "hand": hand_factory or partial(_hand_factory, backend),
+            "face": face_factory or partial(_face_factory, backend),
+        }
+        for kind, factory in factories.items():
+            requests = context.Queue()
+            worker = context.Process(
+                target=_worker,
+                args=(kind, factory, self.ring.name, self.ring.frame_shape, slots, requests, self._results),
+                name=f"{kind}-inference",
+                daemon=True,
+            )
+            worker.start()
+            self._requests[kind] = requests
+            self._workers.append(worker)
+
+    @property
+    def in_flight(self):
+        """Number of submitted frames still waiting for results."""
+        return len(self._pending)
+
+    def submit(self, frame, timestamp=None):
+        """
+        Send a frame to both workers.
+
+        Args:
+            frame: FramePacket or BGR frame with the shape given at construction
+            timestamp: Capture time passed on to the hand detector
+
+        Returns:
+            The frame id, or None if every slot is busy
+        """
+        if isinstance(frame, FramePacket):
+            frame = frame.bgr
+        if frame.shape != self.ring.frame_shape:
+            raise ValueError(f"Frame shape {frame.shape} does not match ring {self.ring.frame_shape}")
+        if not self._free_slots:
+            return None
+
+        slot = self._free_slots.popleft()
+        self.ring.write(slot, frame)
+        self._next_id += 1
+        frame_id = self._next_id
+        self._pending[frame_id] = {"slot": slot}
+        for requests in self._requests.values():
+            requests.put((frame_id, slot, timestamp))
+        return frame_id
+
+    def collect(self, timeout=0.0):
+        """
+        Gather finished results.
+
+        Args:
+            timeout: Seconds to wait for the first result (0 = don't wait)
+
+        Returns:
+            List of (frame_id, hand_result, face_result) ordered by frame id
+
+        Raises:
+            RuntimeError: If a worker failed on a frame; that frame is
+                          dropped and its ring slot is freed once both
+                          workers are done with it
+        """
+        block = timeout > 0
+        while True:
+            try:
+                kind, frame_id, result = self._results.get(block=block, timeout=timeout if block else None)
+            except queue.Empty:
+                break
+            block = False
+
+            # Setiap worker mengirim tepat satu pesan per frame (hasil atau error);
+            # slot baru bebas setelah keduanya selesai membaca frame
+            entry = self._pending[frame_id]
+            entry["arrived"] = entry.get("arrived", 0) + 1
+            if kind == "error":
+                entry["error"] = result
+            else:
+                entry[kind] = result
+            if entry["arrived"] == len(self._requests):
+                del self._pending[frame_id]
+                self._free_slots.append(entry["slot"])
+                if "error" not in entry:
+                    self._completed[frame_id] = (entry["hand"], entry["face"])
+            if kind == "error":
+                # Frame gagal dibuang; hasil pasangannya yang datang belakangan diabaikan
+                raise RuntimeError(f"Inference worker failed on frame {frame_id}: {result}")
+
+        finished = [(frame_id,) + self._completed.pop(frame_id) for frame_id in sorted(self._completed)]
+        return finished
+
+    def process(self, frame, timestamp=None, timeout=5.0):
+        """
+        Run both detectors on one frame concurrently and wait for the results.
+
+        Returns:
+            A tuple (hand_result, face_result) as returned by
+            ``HandGestureDetector.process_frame`` and ``FaceDetector.detect_face``
+
+        Raises:
+            RuntimeError: If a worker process has exited (its frames would
+                          never complete)
+        """
+        frame_id = self.submit(frame, timestamp)
+        while frame_id is None:
+            # Semua slot masih dipakai frame sebelumnya; tunggu satu selesai
+            self._stash(self.collect(timeout=timeout))
+            self._check_workers()
+            frame_id = self.submit(frame, timestamp)
+
+        while True:
+            finished = self.collect(timeout=timeout)
+            for done_id, hand_result, face_result in finished:
+                if done_id == frame_id:
+                    self._stash([item for item in finished if item[0] != frame_id])
+                    return hand_result, face_result
+            self._stash(finished)
+            self._check_workers()
+
+    def _check_workers(self):
+        """Raise if any worker has exited, dropping the frames still in flight."""
+        dead = [worker for worker in self._workers if not worker.is_alive()]
+        if not dead:
+            return
+        # Satu worker mati (mis. segfault MediaPipe): frame yang sedang jalan tidak akan pernah
+        # lengkap, jadi dibuang dan slotnya dibebaskan
+        for entry in self._pending.values():
+            self._free_slots.append(entry["slot"])
+        self._pending.clear()
+        names = ", ".join(f"{worker.name} (exit code {worker.exitcode})" for worker in dead)
+        raise RuntimeError(f"Inference worker exited: {names}")
+
+    def _stash(self, finished):
+        """Keep results of other frames so a later collect() still returns them."""
+        for frame_id, hand_result, face_result in finished:
+            self._completed[frame_id] = (hand_result, face_result)
+
+    def close(self):
+        """Stop the workers and free the shared memory."""
+        for requests in self._requests.values():
+            requests.put(None)
+        for worker in self._workers:
+            worker.join(timeout=2.0)
+            if worker.is_alive():
+                worker.terminate()
+        self._workers = []
+        self.ring.close()
@@ -0,0 +1,102 @@
+"""
+Presence Module
+Idle state machine that lets the heavy landmark models sleep while nobody
+is in front of the kiosk.
+"""
+from .motion_gate import MotionGate
+
+
+class PresenceMonitor:
+    """
+    Tracks whether someone is at the kiosk.
+
+    While active the caller reports every inference result with ``seen``;
+    after ``idle_after`` seconds without a hand (or face) the monitor goes
+    idle. While idle the caller should release the models and only feed a
+    frame to ``motion`` every ``idle_interval`` seconds: a whole-frame
+    MotionGate on a tiny thumbnail, compared with the scene as it was when
+    the kiosk went idle. The first change wakes the monitor, so the wake-up
+    delay is at most ``idle_interval`` plus the time to rebuild the models.
+    """
+
+    def __init__(self, idle_after=20.0, idle_rate=5.0, pixel_threshold=10, min_changed=0.01, width=80):
+        """
+        Initialize the monitor (in the active state).
+
+        Args:
+            idle_after: Seconds without anybody before going idle
+            idle_rate: Motion checks per second while idle
+            pixel_threshold: Gray level difference that counts as a change
+            min_changed: Fraction of changed thumbnail pixels that wakes up
+            width: Thumbnail width in pixels
+        """
+        self.idle_after = idle_after
+        self.idle_interval = 1.0 / idle_rate
+        self.gate = MotionGate(pixel_threshold=pixel_threshold, min_changed=min_changed,
+                               max_age=float("inf"), audit_every=0, width=width)
+
+        self.reset()
+
+        # Statistik
+        self.sleeps = 0
+        self.wakes = 0
+        self.idle_seconds = 0.0
+
+    def reset(self):
+        """Back to the active state (e.g. when a screen starts using the monitor)."""
+        self.idle = False
+        self.last_seen = None
+        self.idle_since = None
+        self._primed = False
+
+    def seen(self, present, timestamp):
+        """
+        Active state: record one inference result.
+
+        Args:
+            present: True if a hand/face was found in the frame
+            timestamp: Frame time in seconds
+
+        Returns:
+            True if the monitor just went idle (release the models now)
+        """
+        if present or self.last_seen is None:
+            self.last_seen = timestamp
+            return False
+        if timestamp - self.last_seen < self.idle_after:
+            return False
+        self.idle = True
+        self.idle_since = timestamp
+        self.sleeps += 1
+        self.gate.reset()
+        self._primed = False
+        return True
+
+    def motion(self, packet, timestamp):
+        """
+        Idle state: check one frame for motion.
+
+        Args:
+            packet: FramePacket of the frame
+            timestamp: Frame time in seconds
+
+        Returns:
+            True if something moved (the monitor is active again)
+        """
+        moved = self.gate.check(packet, None, timestamp)
+        if not self._primed:
+            # Frame pertama saat idle hanya menjadi referensi adegan kosong
+            self._primed = True
+            return False
+        if not moved:
+            return False
+        self.idle = False
+        self.idle_seconds += timestamp - self.idle_since
+        self.last_seen = timestamp
+        self.wakes += 1
+        return True
+
+    def report(self):
+        """One-line summary of the idle statistics."""
+        state = "idle" if self.idle else "active"
+        return f"presence {state} | sleeps {self.sleeps} wakes {self.wakes} | idle {self.idle_seconds:.0f} s"
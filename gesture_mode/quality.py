@@ -0,0 +1,148 @@
+"""
+Quality Module
+Steps inference quality down when frames take too long and back up when
+there is headroom, so slower kiosk units keep their frame rate.
+"""
+import time
+from collections import namedtuple
+
+# Satu anak tangga kualitas. inference_scale: faktor ukuran frame untuk model;
+# hand_complexity: model_complexity mp.solutions.hands (0/1); refine_landmarks:
+# landmark iris Face Mesh; keyframe_rate: None = model di setiap frame.
+QualityLevel = namedtuple(
+    "QualityLevel",
+    ["name", "inference_scale", "hand_complexity", "refine_landmarks", "keyframe_rate"],
+)
+
+# Dari kualitas tertinggi ke termurah
+QUALITY_LEVELS = (
+    QualityLevel("high", 1.0, 1, True, None),
+    QualityLevel("balanced", 0.75, 1, True, None),
+    QualityLevel("fast", 0.75, 0, False, None),
+    QualityLevel("low", 0.5, 0, False, 15),
+    QualityLevel("minimal", 0.5, 0, False, 10),
+)
+
+
+class QualityGovernor:
+    """
+    Picks a QualityLevel from measured frame times.
+
+    Frame times are smoothed with an exponential average. The governor steps
+    one level down after the average has been over ``budget_ms`` for
+    ``downgrade_after`` seconds, and one level up after it has been under
+    ``headroom * budget_ms`` for ``upgrade_after`` seconds; in between
+    nothing changes. The first ``settle_frames`` frames after a change are
+    not measured (rebuilding a graph makes them slow). If a step up is undone
+    within ``probation`` seconds, the wait before the next step up doubles
+    (up to ``max_upgrade_after``), so a level that does not fit is not
+    retried every few seconds.
+    """
+
+    def __init__(self, budget_ms=33.0, levels=QUALITY_LEVELS, start=0, headroom=0.6, smoothing=0.1,
+                 downgrade_after=0.5, upgrade_after=3.0, max_upgrade_after=60.0, probation=10.0,
+                 settle_frames=5):
+        """
+        Initialize the governor.
+
+        Args:
+            budget_ms: Target frame time in milliseconds
+            levels: Quality ladder, best first
+            start: Index of the starting level
+            headroom: Fraction of the budget the average must stay under
+                      before stepping up
+            smoothing: Weight of a new sample in the average (0..1)
+            downgrade_after: Seconds over budget before stepping down
+            upgrade_after: Seconds under headroom before stepping up
+            max_upgrade_after: Upper bound for the backed-off upgrade wait
+            probation: A step down this soon after a step up backs off
+            settle_frames: Frames ignored after every level change
+        """
+        self.budget_ms = budget_ms
+        self.levels = tuple(levels)
+        self.headroom = headroom
+        self.smoothing = smoothing
+        self.downgrade_after = downgrade_after
+        self.base_upgrade_after = upgrade_after
+        self.max_upgrade_after = max_upgrade_after
+        self.probation = probation
+        self.settle_frames = settle_frames
+
+        self.index = min(max(start, 0), len(self.levels) - 1)
+        self.upgrade_after = upgrade_after
+        self.changes = 0
+        self._last_change = None     # (timestamp, +1 turun / -1 naik)
+        self._restart()
+
+    @property
+    def level(self):
+        """The current QualityLevel."""
+        return self.levels[self.index]
+
+    def _restart(self):
+        self.average_ms = None
+        self._settle = self.settle_frames
+        self._over_since = None
+        self._under_since = None
+
+    def observe(self, frame_ms, timestamp=None):
+        """
+        Record one frame time.
+
+        Args:
+            frame_ms: Time the frame took, in milliseconds
+            timestamp: Time of the frame in seconds (default: ``time.monotonic()``)
+
+        Returns:
+            The new QualityLevel if the level changed, else None
+        """
+        now = time.monotonic() if timestamp is None else timestamp
+        if self._settle > 0:
+            self._settle -= 1
+            return None
+        if self.average_ms is None:
+            self.average_ms = frame_ms
+        else:
+            self.average_ms += self.smoothing * (frame_ms - self.average_ms)
+
+        if self.average_ms > self.budget_ms:
+            self._under_since = None
+            if self._over_since is None:
+                self._over_since = now
+            if now - self._over_since >= self.downgrade_after and self.index < len(self.levels) - 1:
+                return self._step(+1, now)
+        elif self.average_ms < self.budget_ms * self.headroom:
+            self._over_since = None
+            if self._under_since is None:
+                self._under_since = now
+            if now - self._under_since >= self.upgrade_after and self.index > 0:
+                return self._step(-1, now)
+        else:
+            # Zona mati antara headroom dan budget: tidak ada perubahan
+            self._over_since = self._under_since = None
+        return None
+
+    def _step(self, direction, now):
+        if direction > 0 and self._last_change is not None:
+            changed_at, last_direction = self._last_change
+            if last_direction < 0 and now - changed_at < self.probation:
+                # Level yang baru dinaikkan tidak sanggup: tunggu lebih lama sebelum mencoba lagi
+                self.upgrade_after = min(self.upgrade_after * 2, self.max_upgrade_after)
+        self.index += direction
+        self.changes += 1
+        self._last_change = (now, direction)
+        self._restart()
+        return self.level
+
+    def reset(self, start=0):
+        """Go back to level ``start`` and forget the measurements and back-off."""
+        self.index = min(max(start, 0), len(self.levels) - 1)
+        self.upgrade_after = self.base_upgrade_after
+        self._last_change = None
+        self._restart()
+
+    def report(self):
+        """One-line summary of the governor state."""
+        average = f"{self.average_ms:.1f}" if self.average_ms is not None else "-"
+        return (f"quality {self.level.name} ({self.index + 1}/{len(self.levels)}) | avg {average} ms "
+                f"of {self.budget_ms:.0f} ms | changes {self.changes}")
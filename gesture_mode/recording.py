@@ -0,0 +1,426 @@
+"""
+Recording Module
+Compact append-only landmark recordings and a MediaPipe-free replay driver.
+
+Usage:
+    VTO_RECORD_DIR=rekaman python real_vto_kiosk.py
+    python -m gesture_mode.recording record --source klip.mp4 --out rekaman/klip
+    python -m gesture_mode.recording info rekaman/20250101_120000
+    python -m gesture_mode.recording label rekaman/20250101_120000 --gesture pointing --start 2.0 --end 6.5
+    python -m gesture_mode.recording replay rekaman/20250101_120000 --button 0.3 0.2 0.7 0.4
+
+A recording is a directory with ``meta.json`` and, per chunk of
+``chunk_frames`` frames, one ``.npy`` file per field
+(``chunk_000000.hand.npy`` ...). Chunks are written once and never
+changed, so a recording can be read (memory-mapped) while it grows and a
+crash loses at most the unfinished chunk. An optional ``labels.npy``
+holds the intended gesture of every frame (ground truth for sweep).
+"""
+import argparse
+import glob
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from .swipe import SWIPE_EVENTS
+
+# Field per frame: (dtype, bentuk per frame). NaN = tidak ada tangan/wajah/cursor
+FIELDS = {
+    "times": (np.float64, ()),
+    "size": (np.int16, (2,)),
+    "hand": (np.float32, (21, 3)),
+    "face": (np.float32, (4, 2)),
+    "cursor": (np.float32, (2,)),
+    "gesture": (np.int8, ()),
+    "event": (np.int8, ()),
+}
+
+LandmarkRecord = namedtuple("LandmarkRecord", ["timestamp", "size", "hand", "face", "cursor", "gesture", "event"])
+LandmarkRecord.__doc__ = """One recorded frame: hand (21, 3), face (4, 2) and cursor are None when absent; event is a swipe name or None."""
+
+
+class LandmarkRecorder:
+    """
+    Appends per-frame landmarks and outputs to a recording directory.
+
+    Frames are collected in preallocated chunk arrays; a full chunk is
+    written as one ``.npy`` file per field (about 0.5 ms for 512 frames).
+    ``append`` is thread-safe, so several inference workers may share a
+    recorder.
+    """
+
+    def __init__(self, directory, chunk_frames=512):
+        """
+        Create the recording directory.
+
+        Args:
+            directory: Output directory (created; must not hold a recording yet)
+            chunk_frames: Frames per chunk file
+        """
+        if os.path.exists(os.path.join(directory, "meta.json")):
+            raise FileExistsError(f"{directory} already contains a recording")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.chunk_frames = chunk_frames
+        self.gestures = ["none"]
+        self._buffers = {name: np.empty((chunk_frames,) + shape, dtype) for name, (dtype, shape) in FIELDS.items()}
+        self._count = 0
+        self._chunk = 0
+        self._lock = threading.Lock()
+        self.frames = 0
+        self.closed = False
+        self._write_meta()
+
+    def append(self, timestamp, size, hand=None, face=None, cursor=None, gesture="none", event=None):
+        """
+        Record one frame.
+
+        Args:
+            timestamp: Capture time in seconds
+            size: Frame (width, height) in pixels
+            hand: (21, 3) normalized hand landmarks or None
+            face: (4, 2) glasses anchors in pixels or None
+            cursor: Emitted (x, y) cursor or None
+            gesture: Emitted (debounced) gesture name
+            event: Emitted swipe event name or None
+        """
+        with self._lock:
+            if self.closed:
+                return
+            i = self._count
+            b = self._buffers
+            b["times"][i] = timestamp
+            b["size"][i] = size
+            b["hand"][i] = np.nan if hand is None else hand
+            b["face"][i] = np.nan if face is None else face
+            b["cursor"][i] = np.nan if cursor is None else cursor
+            if gesture not in self.gestures:
+                self.gestures.append(gesture)
+                self._write_meta()
+            b["gesture"][i] = self.gestures.index(gesture)
+            b["event"][i] = 0 if event is None else SWIPE_EVENTS.index(event) + 1
+            self._count += 1
+            self.frames += 1
+            if self._count == self.chunk_frames:
+                self._flush()
+
+    def close(self):
+        """Write the unfinished chunk; later appends are ignored."""
+        with self._lock:
+            if not self.closed:
+                self._flush()
+                self.closed = True
+
+    def _flush(self):
+        if not self._count:
+            return
+        prefix = os.path.join(self.directory, f"chunk_{self._chunk:06d}")
+        # "times" ditulis terakhir: chunk tanpa file times dianggap belum selesai
+        for name in sorted(FIELDS, key=lambda field: field == "times"):
+            _write_atomic(f"{prefix}.{name}.npy", self._buffers[name][:self._count])
+        self._chunk += 1
+        self._count = 0
+
+    def _write_meta(self):
+        meta = {"version": 1, "chunk_frames": self.chunk_frames, "gestures": self.gestures,
+                "events": list(SWIPE_EVENTS), "fields": list(FIELDS)}
+        path = os.path.join(self.directory, "meta.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(path + ".tmp", path)
+
+
+def _write_atomic(path, array):
+    with open(path + ".tmp", "wb") as f:
+        np.save(f, array)
+    os.replace(path + ".tmp", path)
+
+
+class LandmarkRecording:
+    """
+    Read-only view of a recording; chunks are memory-mapped, not loaded.
+
+    Iterating yields LandmarkRecord tuples in order.
+    """
+
+    def __init__(self, directory):
+        """
+        Args:
+            directory: Recording directory written by LandmarkRecorder
+        """
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        self.directory = directory
+        self.gestures = meta["gestures"]
+        self.events = meta["events"]
+        self.chunks = []
+        labels_path = os.path.join(directory, "labels.npy")
+        self.labels = np.load(labels_path) if os.path.exists(labels_path) else None
+        for times_path in sorted(glob.glob(os.path.join(directory, "chunk_*.times.npy"))):
+            prefix = times_path[:-len("times.npy")]
+            self.chunks.append({name: np.load(prefix + name + ".npy", mmap_mode="r") for name in FIELDS})
+
+    def __len__(self):
+        return sum(len(chunk["times"]) for chunk in self.chunks)
+
+    def field(self, name):
+        """One field of all frames as a single (copied) array."""
+        dtype, shape = FIELDS[name]
+        if not self.chunks:
+            return np.empty((0,) + shape, dtype)
+        return np.concatenate([chunk[name] for chunk in self.chunks])
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            # Satu chunk dibaca sekaligus (mmap -> RAM), lalu per frame tanpa overhead numpy
+            times = chunk["times"].tolist()
+            sizes = chunk["size"].tolist()
+            hands, faces, cursors = np.asarray(chunk["hand"]), np.asarray(chunk["face"]), np.asarray(chunk["cursor"])
+            has_hand = ~np.isnan(hands[:, 0, 0])
+            has_face = ~np.isnan(faces[:, 0, 0])
+            has_cursor = ~np.isnan(cursors[:, 0])
+            gestures = chunk["gesture"].tolist()
+            events = chunk["event"].tolist()
+            for i, timestamp in enumerate(times):
+                yield LandmarkRecord(timestamp, tuple(sizes[i]),
+                                     hands[i] if has_hand[i] else None,
+                                     faces[i] if has_face[i] else None,
+                                     tuple(cursors[i].tolist()) if has_cursor[i] else None,
+                                     self.gestures[gestures[i]],
+                                     self.events[events[i] - 1] if events[i] else None)
+
+
+def label_recording(directory, gesture, start=None, end=None):
+    """
+    Mark the intended gesture of a time range in a finished recording.
+
+    Frames outside every labelled range are "none". Call it once per
+    range; later calls overwrite earlier ones where they overlap.
+
+    Args:
+        directory: Recording directory
+        gesture: Gesture name the user was performing (e.g. "pointing")
+        start: Range start in seconds from the first frame (None = beginning)
+        end: Range end in seconds from the first frame (None = end)
+
+    Returns:
+        Number of frames labelled
+    """
+    recording = LandmarkRecording(directory)
+    times = recording.field("times")
+    labels = recording.labels
+    if labels is None or len(labels) != len(times):
+        labels = np.full(len(times), "none", dtype="<U16")
+    labels = labels.astype("<U16")
+    offset = times - times[0] if len(times) else times
+    mask = np.ones(len(times), bool)
+    if start is not None:
+        mask &= offset >= start
+    if end is not None:
+        mask &= offset <= end
+    labels[mask] = gesture
+    _write_atomic(os.path.join(directory, "labels.npy"), labels)
+    return int(mask.sum())
+
+
+class ManualClock:
+    """
+    Injectable clock for replays: returns the time it was last set to.
+
+    Pass it wherever a component takes ``clock`` (default ``time.monotonic``),
+    e.g. HandGestureDetector or DwellButton, so replayed frames carry their
+    recorded time instead of the wall clock.
+    """
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def set(self, timestamp):
+        self.now = timestamp
+
+
+def replay(recording, detector, clock=None, on_frame=None):
+    """
+    Feed a recording through a detector's gesture/debounce/cursor layers.
+
+    No MediaPipe is involved: the recorded landmarks go straight to
+    ``HandGestureDetector.process_points``, as fast as the layers allow.
+
+    Args:
+        recording: LandmarkRecording
+        detector: HandGestureDetector (e.g. built with ``backend=None``)
+        clock: ManualClock set to each frame's timestamp before processing
+        on_frame: Optional ``f(record, gesture, cursor, event)`` per frame
+                  (e.g. to drive a DwellButton)
+
+    Returns:
+        Dict with frames, seconds, fps, gesture_mismatches (against the
+        recorded gestures), events and the recorded duration
+    """
+    frames = mismatches = 0
+    events = {name: 0 for name in SWIPE_EVENTS}
+    first = last = None
+    start = time.perf_counter()
+    for record in recording:
+        if clock is not None:
+            clock.set(record.timestamp)
+        gesture, cursor = detector.process_points(record.hand, record.size, record.timestamp)
+        event = detector.swipe_event
+        if event is not None:
+            events[event] += 1
+        if gesture != record.gesture:
+            mismatches += 1
+        if on_frame is not None:
+            on_frame(record, gesture, cursor, event)
+        frames += 1
+        first = record.timestamp if first is None else first
+        last = record.timestamp
+    seconds = time.perf_counter() - start
+    return {"frames": frames, "seconds": seconds, "fps": frames / seconds if seconds > 0 else 0.0,
+            "gesture_mismatches": mismatches, "events": events,
+            "duration": 0.0 if first is None else last - first}
+
+
+def record_source(source, directory, max_frames=None, backend="solutions", label=None):
+    """
+    Run the hand and face models over a frame source into a new recording.
+
+    Args:
+        source: Unopened FrameSource (clip, image folder or camera)
+        directory: New recording directory
+        max_frames: Stop after this many frames (None = whole source)
+        backend: MediaPipe landmark backend
+        label: Gesture performed throughout the clip; labels every frame
+               (see ``label_recording``)
+
+    Returns:
+        Number of recorded frames
+    """
+    # Import di sini: info/replay tidak butuh MediaPipe
+    from .face_detection import FaceDetector
+    from .frame_packet import BufferPool, FramePacket
+    from .hand_gesture import HandGestureDetector
+
+    hand = HandGestureDetector(draw_landmarks=False, backend=backend, swipe=True)
+    face = FaceDetector(backend=backend)
+    recorder = LandmarkRecorder(directory)
+    pool = BufferPool()
+    if not source.open():
+        raise RuntimeError("Could not open frame source.")
+    try:
+        while max_frames is None or recorder.frames < max_frames:
+            ret, frame = source.read()
+            if not ret:
+                break
+            timestamp = recorder.frames / (source.fps or 30)
+            packet = FramePacket(frame, mirror=True, pool=pool, timestamp=timestamp)
+            _, gesture, cursor = hand.process_frame(packet)
+            face.detect_face(packet)
+            recorder.append(timestamp, (packet.width, packet.height), hand.points, face.anchors, cursor,
+                            gesture, hand.swipe_event)
+    finally:
+        source.release()
+        recorder.close()
+        hand.release()
+        face.release()
+    if label is not None and recorder.frames:
+        label_recording(directory, label)
+    return recorder.frames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record and replay hand/face landmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="run the models over a clip or camera into a recording")
+    record.add_argument("--source", required=True, help="camera index, video file or image folder")
+    record.add_argument("--out", required=True, help="new recording directory")
+    record.add_argument("--frames", type=int, default=None, help="maximum number of frames")
+    record.add_argument("--backend", choices=("solutions", "tasks"), default="solutions",
+                        help="MediaPipe landmark backend")
+    record.add_argument("--label", default=None, help="gesture performed throughout the clip")
+
+    label = commands.add_parser("label", help="mark the intended gesture of a time range")
+    label.add_argument("recording", help="recording directory")
+    label.add_argument("--gesture", required=True, help="gesture name, e.g. pointing or none")
+    label.add_argument("--start", type=float, default=None, help="seconds from the first frame")
+    label.add_argument("--end", type=float, default=None, help="seconds from the first frame")
+
+    info = commands.add_parser("info", help="summarize a recording")
+    info.add_argument("recording", help="recording directory")
+
+    play = commands.add_parser("replay", help="replay a recording through the gesture and dwell logic")
+    play.add_argument("recording", help="recording directory")
+    play.add_argument("--button", type=float, nargs=4, default=None, metavar=("X0", "Y0", "X1", "Y1"),
+                      help="dwell button box as fractions of the camera frame")
+    play.add_argument("--dwell", type=float, default=1.5, help="dwell time in seconds")
+    play.add_argument("--gesture-model", default=None, help="trained gesture classifier .npz")
+    play.add_argument("--params", default=None, help="gesture parameters JSON (see sweep --save)")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        from .frame_source import create_source
+        frames = record_source(create_source(args.source, realtime=False), args.out, args.frames, args.backend,
+                               args.label)
+        print(f"{args.out}: {frames} frames")
+        return
+    if args.command == "label":
+        frames = label_recording(args.recording, args.gesture, args.start, args.end)
+        print(f"{args.recording}: {frames} frames labelled {args.gesture}")
+        return
+
+    recording = LandmarkRecording(args.recording)
+    if args.command == "info":
+        times = recording.field("times")
+        hands = ~np.isnan(recording.field("hand")[:, 0, 0])
+        faces = ~np.isnan(recording.field("face")[:, 0, 0])
+        gestures = recording.field("gesture")
+        print(f"{args.recording}: {len(recording)} frames in {len(recording.chunks)} chunks, "
+              f"{times[-1] - times[0] if len(times) else 0:.1f} s")
+        print(f"hand {hands.mean() if len(hands) else 0:.0%}   face {faces.mean() if len(faces) else 0:.0%}")
+        for code, name in enumerate(recording.gestures):
+            print(f"  {name:<10} {int(np.sum(gestures == code))}")
+        if recording.labels is not None:
+            names, counts = np.unique(recording.labels, return_counts=True)
+            print("labels: " + "   ".join(f"{name} {count}" for name, count in zip(names, counts)))
+        return
+
+    from .dwell import DwellButton
+    from .hand_gesture import HandGestureDetector, apply_params, load_params
+
+    clock = ManualClock()
+    detector = HandGestureDetector(draw_landmarks=False, backend=None, swipe=True,
+                                   gesture_model=args.gesture_model, clock=clock)
+    params = load_params(args.params)
+    apply_params(detector, params)
+    button = DwellButton(params.get("hover_duration", args.dwell), clock=clock)
+    triggers = []
+
+    def on_frame(record, gesture, cursor, event):
+        if args.button is None:
+            return
+        x0, y0, x1, y1 = args.button
+        inside = cursor is not None and (x0 * record.size[0] < cursor[0] < x1 * record.size[0]
+                                         and y0 * record.size[1] < cursor[1] < y1 * record.size[1])
+        button.update(inside and gesture == "pointing")
+        if button.fired:
+            triggers.append(record.timestamp)
+            button.reset()
+
+    stats = replay(recording, detector, clock, on_frame)
+    print(f"replayed {stats['frames']} frames ({stats['duration']:.1f} s recorded) in {stats['seconds'] * 1000:.0f} ms "
+          f"= {stats['fps']:.0f} fps")
+    print(f"gesture mismatches vs recording: {stats['gesture_mismatches']}   swipes {stats['events']}")
+    if args.button is not None:
+        print(f"dwell triggers: {len(triggers)} at " + ", ".join(f"{t:.2f}s" for t in triggers))
+
+
+if __name__ == "__main__":
+    main()
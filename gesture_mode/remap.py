@@ -0,0 +1,232 @@
+"""
+Remap Module
+Folds mirroring, cover-crop, scaling and lens undistortion into one
+``cv2.remap`` lookup table, cached on disk, plus the matching point mapping.
+"""
+import hashlib
+import json
+import os
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+# Versi format tabel; naikkan jika cara membangun tabel berubah
+REMAP_VERSION = 1
+
+# Lokasi cache tabel remap (bisa diganti lewat VTO_REMAP_CACHE)
+DEFAULT_CACHE_DIR = os.environ.get(
+    "VTO_REMAP_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "vto_kiosk", "remap"))
+
+
+class CameraCalibration(namedtuple("CameraCalibration", ["camera_matrix", "dist_coeffs", "image_size"])):
+    """
+    Pinhole intrinsics and OpenCV distortion coefficients.
+
+    ``image_size`` is the (width, height) the calibration was made at; the
+    intrinsics are rescaled when the camera delivers another resolution.
+    """
+
+    __slots__ = ()
+
+    def for_size(self, width, height):
+        """Return the camera matrix scaled to a (width, height) frame."""
+        calib_w, calib_h = self.image_size
+        scale = np.array([[width / calib_w], [height / calib_h], [1.0]])
+        return np.asarray(self.camera_matrix, np.float64) * scale
+
+    def key(self):
+        """Stable digest of the calibration values (part of the cache key)."""
+        digest = hashlib.sha1()
+        digest.update(np.ascontiguousarray(self.camera_matrix, np.float64).tobytes())
+        digest.update(np.ascontiguousarray(self.dist_coeffs, np.float64).tobytes())
+        digest.update(repr(tuple(self.image_size)).encode())
+        return digest.hexdigest()
+
+
+def load_calibration(path):
+    """
+    Load a calibration from ``.npz`` (``camera_matrix``, ``dist_coeffs``,
+    ``image_size``) or ``.json`` with the same keys.
+
+    Returns:
+        A CameraCalibration
+    """
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    else:
+        with np.load(path) as archive:
+            data = {name: archive[name] for name in archive.files}
+    return CameraCalibration(
+        camera_matrix=np.asarray(data["camera_matrix"], np.float64).reshape(3, 3),
+        dist_coeffs=np.asarray(data["dist_coeffs"], np.float64).ravel(),
+        image_size=tuple(int(v) for v in np.asarray(data["image_size"]).ravel()[:2]),
+    )
+
+
+class FusedRemap:
+    """
+    One-pass source-to-canvas transform: undistort, mirror, cover-crop, scale.
+
+    The canvas shows ``crop(mirror(undistort(raw)))``. ``apply`` samples the
+    raw camera frame straight into the canvas-sized output with a single
+    ``cv2.remap``, so the full-resolution flip, resize and undistortion
+    images are never materialised. ``map_point`` sends a point from the frame
+    the detectors see (mirrored but still distorted, like FramePacket.bgr)
+    through the same transform analytically.
+    """
+
+    def __init__(self, src_w, src_h, dst_w, dst_h, calibration=None, mirror=True, cache_dir=DEFAULT_CACHE_DIR):
+        """
+        Build or load the lookup table.
+
+        Args:
+            src_w: Camera frame width
+            src_h: Camera frame height
+            dst_w: Canvas width
+            dst_h: Canvas height
+            calibration: CameraCalibration, or None for no undistortion
+            mirror: Mirror horizontally (the kiosk shows a mirror image)
+            cache_dir: Directory for cached tables (None = don't cache)
+        """
+        self.src_size = (src_w, src_h)
+        self.dst_size = (dst_w, dst_h)
+        self.calibration = calibration
+        self.mirror = mirror
+
+        if calibration is not None:
+            self.camera_matrix = calibration.for_size(src_w, src_h)
+            self.dist_coeffs = np.asarray(calibration.dist_coeffs, np.float64)
+        else:
+            self.camera_matrix = None
+            self.dist_coeffs = None
+
+        # Cover crop dihitung di ruang gambar yang sudah di-undistort (ukurannya sama dengan sumber)
+        scale = max(dst_w / src_w, dst_h / src_h)
+        crop_w = min(src_w, dst_w / scale)
+        crop_h = min(src_h, dst_h / scale)
+        self.x0 = (src_w - crop_w) / 2
+        self.y0 = (src_h - crop_h) / 2
+        self.scale_x = dst_w / crop_w
+        self.scale_y = dst_h / crop_h
+
+        self.cache_path = None
+        if cache_dir:
+            self.cache_path = os.path.join(cache_dir, f"remap_{self.key()}.npz")
+        self.map1, self.map2 = self._load() or self._build()
+
+    def key(self):
+        """Cache key: calibration, source size, target size and mirroring."""
+        calib = self.calibration.key() if self.calibration is not None else "none"
+        text = f"v{REMAP_VERSION}|{calib}|{self.src_size}|{self.dst_size}|{int(self.mirror)}"
+        return hashlib.sha1(text.encode()).hexdigest()[:20]
+
+    def _load(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with np.load(self.cache_path) as archive:
+                map1, map2 = archive["map1"], archive["map2"]
+        except (OSError, KeyError, ValueError):
+            return None
+        if map1.shape[:2] != (self.dst_size[1], self.dst_size[0]):
+            return None
+        return map1, map2
+
+    def _build(self):
+        dst_w, dst_h = self.dst_size
+        src_w = self.src_size[0]
+
+        # Pusat piksel canvas -> koordinat gambar hasil (mirror + undistort)
+        u = (np.arange(dst_w, dtype=np.float64) + 0.5) / self.scale_x + self.x0 - 0.5
+        v = (np.arange(dst_h, dtype=np.float64) + 0.5) / self.scale_y + self.y0 - 0.5
+        if self.mirror:
+            u = (src_w - 1) - u
+        xs, ys = np.meshgrid(u, v)
+
+        if self.camera_matrix is not None:
+            # Titik tak terdistorsi -> piksel mentah kamera (model distorsi OpenCV)
+            K = self.camera_matrix
+            normalized = np.stack([(xs - K[0, 2]) / K[0, 0], (ys - K[1, 2]) / K[1, 1], np.ones_like(xs)], axis=-1)
+            projected, _ = cv2.projectPoints(normalized.reshape(-1, 1, 3), np.zeros(3), np.zeros(3), K, self.dist_coeffs)
+            projected = projected.reshape(dst_h, dst_w, 2)
+            xs, ys = projected[..., 0], projected[..., 1]
+
+        # Tabel fixed-point: remap jauh lebih cepat dibanding dua peta float
+        map1, map2 = cv2.convertMaps(xs.astype(np.float32), ys.astype(np.float32), cv2.CV_16SC2)
+        if self.cache_path:
+            try:
+                os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+                tmp_path = self.cache_path + ".tmp.npz"
+                np.savez(tmp_path, map1=map1, map2=map2)
+                os.replace(tmp_path, self.cache_path)
+            except OSError:
+                pass  # cache hanya optimasi; tabel tetap dipakai dari memori
+        return map1, map2
+
+    def apply(self, frame, dst=None):
+        """
+        Transform a raw (unmirrored, distorted) frame into canvas pixels.
+
+        Args:
+            frame: Raw camera frame with the source size
+            dst: Optional canvas-sized output buffer
+
+        Returns:
+            The canvas-sized image
+        """
+        return cv2.remap(frame, self.map1, self.map2, cv2.INTER_LINEAR, dst=dst,
+                         borderMode=cv2.BORDER_CONSTANT)
+
+    def map_points(self, points):
+        """
+        Map an (N, 2) array of detector-frame points to canvas coordinates.
+
+        Args:
+            points: Points in the frame the detectors see (mirrored if
+                    ``mirror`` is set, not undistorted)
+
+        Returns:
+            (N, 2) float array of canvas coordinates
+        """
+        points = np.asarray(points, np.float64).reshape(-1, 2).copy()
+        src_w = self.src_size[0]
+        if self.camera_matrix is not None:
+            if self.mirror:
+                points[:, 0] = (src_w - 1) - points[:, 0]
+            points = cv2.undistortPoints(points.reshape(-1, 1, 2), self.camera_matrix, self.dist_coeffs,
+                                         P=self.camera_matrix).reshape(-1, 2)
+            if self.mirror:
+                points[:, 0] = (src_w - 1) - points[:, 0]
+        points[:, 0] = (points[:, 0] + 0.5 - self.x0) * self.scale_x - 0.5
+        points[:, 1] = (points[:, 1] + 0.5 - self.y0) * self.scale_y - 0.5
+        return points
+
+    def map_point(self, point):
+        """
+        Map one detector-frame point to canvas coordinates.
+
+        Args:
+            point: (x, y) or None
+
+        Returns:
+            (x, y) in canvas coordinates, or None
+        """
+        if point is None:
+            return None
+        x, y = self.map_points([point])[0]
+        return (float(x), float(y))
+
+
+def fused_remap(src_w, src_h, dst_w, dst_h, calibration=None, mirror=True):
+    """Return the FusedRemap for these parameters, shared within the process."""
+    key = (src_w, src_h, dst_w, dst_h, calibration.key() if calibration is not None else None, mirror)
+    remap = _remaps.get(key)
+    if remap is None:
+        remap = _remaps[key] = FusedRemap(src_w, src_h, dst_w, dst_h, calibration, mirror)
+    return remap
+
+
+# Tabel yang sudah dimuat, dipakai bersama oleh semua screen
+_remaps = {}
@@ -0,0 +1,182 @@
+"""
+ROI Tracker Module
+Runs hand inference on a small crop around the hand seen in the previous frame.
+"""
+import time
+
+import cv2
+import numpy as np
+
+
+class HandRoiTracker:
+    """
+    Predicts where the hand will be and crops only that region for inference.
+
+    The box around the previous frame's 21 landmarks is shifted by the hand's
+    velocity, padded, squared and resized to ``crop_size`` x ``crop_size``.
+    Landmarks found in the crop are written back in full-frame normalized
+    coordinates, so callers see the same result as a full-frame search. When
+    the crop finds no hand (or there is no previous box) the full frame is
+    searched instead. The caller feeds each frame's result back with
+    ``update``.
+
+    Crops and full frames must go to two separate graphs: a video-mode
+    graph carries its tracked hand region from one input to the next, and
+    after a switch between crop and full-frame coordinates that region is
+    wrong, costing a failed landmark pass plus a new palm detection.
+    MediaPipe resizes its input to a fixed model size anyway, so the gain
+    (if any) is the cheaper palm search on a small image, not fewer pixels
+    for the landmark model; compare ``roi_ms`` with ``full_ms``.
+    """
+
+    def __init__(self, crop_size=256, padding=0.4, velocity_gain=1.0, min_box=64):
+        """
+        Initialize the tracker.
+
+        Args:
+            crop_size: Side of the square image given to the model (pixels)
+            padding: Margin added on each side, as a fraction of the box size
+            velocity_gain: How far ahead (in frames) the box is moved along
+                           the hand's velocity
+            min_box: Smallest box side in frame pixels (very small boxes
+                     make the crop blurry and the model unstable)
+        """
+        self.crop_size = crop_size
+        self.padding = padding
+        self.velocity_gain = velocity_gain
+        self.min_box = min_box
+
+        self._box = None        # (cx, cy, side) hand box in full-frame pixels
+        self._velocity = (0.0, 0.0)
+        self._crop = np.empty((crop_size, crop_size, 3), np.uint8)
+        self.last_roi = None
+
+        # Statistik
+        self.frames = 0
+        self.roi_frames = 0
+        self.roi_hits = 0
+        self.fallbacks = 0
+        self.full_frames = 0
+        self.roi_ms = 0.0
+        self.full_ms = 0.0
+
+    def reset(self):
+        """Forget the tracked hand (next frame searches the full frame)."""
+        self._box = None
+        self._velocity = (0.0, 0.0)
+
+    def predict(self, frame_w, frame_h):
+        """
+        Return the square crop (x0, y0, x1, y1) for the next frame, or None.
+
+        None means full-frame search: nothing is tracked, or the padded box
+        would not fit inside the frame.
+        """
+        if self._box is None:
+            return None
+        cx, cy, side = self._box
+        vx, vy = self._velocity
+        cx += vx * self.velocity_gain
+        cy += vy * self.velocity_gain
+        side = max(side, self.min_box) * (1 + 2 * self.padding) + max(abs(vx), abs(vy)) * self.velocity_gain
+        side = int(round(side))
+        if side >= min(frame_w, frame_h):
+            return None
+
+        # Geser kotak agar tetap di dalam frame (tetap persegi, tanpa distorsi)
+        x0 = int(round(min(max(cx - side / 2, 0), frame_w - side)))
+        y0 = int(round(min(max(cy - side / 2, 0), frame_h - side)))
+        return (x0, y0, x0 + side, y0 + side)
+
+    def update(self, points, frame_w, frame_h):
+        """
+        Update the tracked box after a frame.
+
+        Args:
+            points: (21, 3) full-frame normalized landmarks, or None if the
+                    frame had no hand
+            frame_w: Frame width
+            frame_h: Frame height
+        """
+        if points is None:
+            self.reset()
+            return
+        x_min, y_min = points[:, :2].min(axis=0) * (frame_w, frame_h)
+        x_max, y_max = points[:, :2].max(axis=0) * (frame_w, frame_h)
+        cx = (x_min + x_max) / 2
+        cy = (y_min + y_max) / 2
+        side = max(x_max - x_min, y_max - y_min)
+        if self._box is not None:
+            self._velocity = (cx - self._box[0], cy - self._box[1])
+        self._box = (cx, cy, side)
+
+    def detect(self, backend, crop_backend, rgb, timestamp_ms):
+        """
+        Run ``crop_backend`` on the predicted crop, falling back to ``backend`` on the full frame.
+
+        Args:
+            backend: Synchronous landmark backend (``detect(rgb, timestamp_ms)``)
+                     used only for full frames
+            crop_backend: A second synchronous backend used only for crops
+            rgb: Full RGB frame
+            timestamp_ms: Frame timestamp in milliseconds
+
+        Returns:
+            Hand landmark lists in full-frame normalized coordinates
+        """
+        frame_h, frame_w = rgb.shape[:2]
+        self.frames += 1
+
+        roi = self.predict(frame_w, frame_h)
+        self.last_roi = roi
+        if roi is not None:
+            self.roi_frames += 1
+            x0, y0, x1, y1 = roi
+            start = time.perf_counter()
+            cv2.resize(rgb[y0:y1, x0:x1], (self.crop_size, self.crop_size), dst=self._crop,
+                       interpolation=cv2.INTER_AREA if x1 - x0 > self.crop_size else cv2.INTER_LINEAR)
+            multi_hand_landmarks = crop_backend.detect(self._crop, timestamp_ms)
+            self.roi_ms = self._average(self.roi_ms, time.perf_counter() - start)
+            if multi_hand_landmarks:
+                self.roi_hits += 1
+                for hand_landmarks in multi_hand_landmarks:
+                    self._to_full_frame(hand_landmarks, roi, frame_w, frame_h)
+                return multi_hand_landmarks
+            # Tangan keluar dari crop: cari ulang di seluruh frame
+            self.fallbacks += 1
+            self.last_roi = None
+
+        start = time.perf_counter()
+        multi_hand_landmarks = backend.detect(rgb, timestamp_ms)
+        self.full_ms = self._average(self.full_ms, time.perf_counter() - start)
+        self.full_frames += 1
+        return multi_hand_landmarks
+
+    @staticmethod
+    def _to_full_frame(hand_landmarks, roi, frame_w, frame_h):
+        x0, y0, x1, y1 = roi
+        side = x1 - x0
+        for lm in hand_landmarks.landmark:
+            lm.x = (x0 + lm.x * side) / frame_w
+            lm.y = (y0 + lm.y * side) / frame_h
+            lm.z = lm.z * side / frame_w  # z memakai skala yang sama dengan x
+
+    @staticmethod
+    def _average(current, seconds):
+        ms = seconds * 1000
+        return 0.9 * current + 0.1 * ms if current else ms
+
+    @property
+    def hit_rate(self):
+        """Fraction of ROI attempts that found the hand."""
+        return self.roi_hits / self.roi_frames if self.roi_frames else 0.0
+
+    @property
+    def full_rate(self):
+        """Fraction of frames that needed a full-frame pass."""
+        return self.full_frames / self.frames if self.frames else 0.0
+
+    def report(self):
+        """One-line summary of the tracker statistics."""
+        return (f"roi {self.roi_frames}/{self.frames} | hit {self.hit_rate:.0%} | fallback {self.fallbacks} "
+                f"| full frames {self.full_rate:.0%} | roi {self.roi_ms:.1f} ms vs full {self.full_ms:.1f} ms")
@@ -0,0 +1,447 @@
+"""
+Sweep Module
+Parallel parameter sweeps of the gesture thresholds over labelled recordings.
+
+Usage:
+    python -m gesture_mode.recording label rekaman/toko1 --gesture pointing --start 2.0 --end 6.5
+    python -m gesture_mode.sweep rekaman/* --grid thumb_ratio=0.8,0.9,1.0 debounce_time=0.03,0.06,0.1
+    python -m gesture_mode.sweep rekaman/* sesi/*.npz --random 300 --workers 8 --csv hasil.csv --save toko1.json
+    VTO_GESTURE_PARAMS=toko1.json python real_vto_kiosk.py
+
+Every configuration replays the whole corpus through the same layers the
+kiosk runs after the hand model (finger-state rules or a trained model,
+HandGestureDetector.debounce, DwellButton, the cursor One-Euro filter) with
+the recorded timestamps, so no MediaPipe or camera is needed. The corpus is
+loaded once per worker process and configurations are spread over a
+process pool.
+
+Corpus entries are recording directories with ``labels.npy`` (see
+recording.label_recording) or gesture_classifier session ``.npz`` files
+(one gesture per session, replayed at ``--fps``).
+"""
+import argparse
+import csv
+import glob
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from .dwell import DWELL_TIME, DwellButton
+from .filters import FILTER_PRESETS, OneEuroFilter, evaluate_filter
+from .gesture_classifier import load_classifier
+from .hand_gesture import (DEBOUNCE_TIME, GESTURE_COOLDOWN, GESTURES, THUMB_RATIO, HandGestureDetector,
+                           apply_params, classify_gestures)
+from .recording import LandmarkRecording, ManualClock
+
+# Parameter yang bisa di-sweep (nama = hand_gesture.GESTURE_PARAMETERS):
+# (default, batas bawah, batas atas untuk --random)
+PARAMETERS = {
+    "thumb_ratio": (THUMB_RATIO, 0.6, 1.2),
+    "debounce_time": (DEBOUNCE_TIME, 0.0, 0.2),
+    "cooldown_time": (GESTURE_COOLDOWN, 0.0, 0.5),
+    "hover_duration": (DWELL_TIME, 0.5, 2.5),
+    "cursor_min_cutoff": (FILTER_PRESETS["cursor"]["min_cutoff"], 0.2, 3.0),
+    "cursor_beta": (FILTER_PRESETS["cursor"]["beta"], 0.0, 0.1),
+}
+
+# Urutan kolom laporan / CSV
+METRICS = ("accuracy", "false_per_min", "time_to_trigger", "missed", "jitter_px", "lag_ms")
+
+
+def default_params():
+    """The parameter values the code currently ships with."""
+    return {name: default for name, (default, _, _) in PARAMETERS.items()}
+
+
+def load_clip(path, fps=30.0):
+    """
+    One corpus entry as a dict of arrays.
+
+    Args:
+        path: Labelled recording directory or gesture_classifier session .npz
+        fps: Frame rate assumed for sessions (they carry no timestamps)
+
+    Returns:
+        Dict with name, times (N,), points (N, 21, 3) (NaN rows = no hand),
+        has_hand (N,), size (N, 2) and labels (N,)
+
+    Raises:
+        ValueError: If a recording has no labels
+    """
+    if os.path.isdir(path):
+        recording = LandmarkRecording(path)
+        if recording.labels is None:
+            raise ValueError(f"{path} is not labelled (python -m gesture_mode.recording label ...)")
+        points = recording.field("hand")
+        times = recording.field("times")
+        size = recording.field("size").astype(np.float64)
+        labels = recording.labels.astype(str)
+    else:
+        with np.load(path) as data:
+            points = np.asarray(data["points"], np.float32).reshape(-1, 21, 3)
+            labels = np.asarray(data["labels"]).astype(str)
+            aspect = float(data["aspect"]) if "aspect" in data else 4 / 3
+        times = np.arange(len(points)) / fps
+        size = np.tile([aspect * 480.0, 480.0], (len(points), 1))
+    if len(labels) != len(points):
+        raise ValueError(f"{path}: {len(points)} frames but {len(labels)} labels")
+    return {"name": path, "times": times, "points": points, "has_hand": ~np.isnan(points[:, 0, 0]),
+            "size": size, "labels": labels}
+
+
+def _segments(labels):
+    """(start, end, gesture) index runs of labels other than "none" (end exclusive)."""
+    runs = []
+    start = 0
+    for i in range(1, len(labels) + 1):
+        if i == len(labels) or labels[i] != labels[start]:
+            if labels[start] != "none":
+                runs.append((start, i, labels[start]))
+            start = i
+    return runs
+
+
+def raw_gestures(clip, thumb_ratio, model=None):
+    """
+    Undebounced gesture names of every frame with a hand, in one vectorized call.
+
+    Args:
+        clip: Dict from ``load_clip``
+        thumb_ratio: Thumb threshold of the finger-state rules
+        model: Trained GestureClassifier replacing the rules (thumb_ratio unused)
+
+    Returns:
+        (N,) array of names ("none" where there is no hand)
+    """
+    names = np.full(len(clip["times"]), "none", dtype=object)
+    hand = clip["has_hand"]
+    if hand.any():
+        if model is not None:
+            aspect = float(clip["size"][0, 0] / clip["size"][0, 1])
+            names[hand] = model.classify(clip["points"][hand], aspect)
+        else:
+            names[hand] = np.asarray(GESTURES, dtype=object)[classify_gestures(clip["points"][hand], thumb_ratio)]
+    return names
+
+
+def evaluate_clip(clip, params, model=None, raw=None):
+    """
+    Replay one clip with one configuration.
+
+    A trigger is a DwellButton (``hover_duration``) fed with "the debounced
+    gesture is X" for every gesture X except "none": holding a gesture
+    that long counts as one click, and letting go re-arms it. A trigger
+    is false when the label of that frame is a different gesture.
+
+    Args:
+        clip: Dict from ``load_clip``
+        params: Complete parameter dict (see ``default_params``)
+        model: Optional trained GestureClassifier
+        raw: Precomputed ``raw_gestures`` for this clip and thumb_ratio
+
+    Returns:
+        Dict of counts: frames (with a hand), correct, triggers,
+        false_triggers, segments, hit_segments, trigger_delay (sum of
+        seconds), duration
+    """
+    if raw is None:
+        raw = raw_gestures(clip, params["thumb_ratio"], model)
+    detector = HandGestureDetector(draw_landmarks=False, backend=None, cursor_filter=False)
+    apply_params(detector, params)
+    clock = ManualClock()
+    buttons = {name: DwellButton(params["hover_duration"], clock=clock) for name in GESTURES if name != "none"}
+
+    times = clip["times"].tolist()
+    has_hand = clip["has_hand"].tolist()
+    labels = clip["labels"]
+    emitted = []
+    fires = []
+    for i, now in enumerate(times):
+        clock.set(now)
+        # Sama seperti HandGestureDetector._interpret: tanpa tangan tidak ada debounce
+        gesture = detector.debounce(raw[i], now) if has_hand[i] else "none"
+        emitted.append(gesture)
+        for name, button in buttons.items():
+            hovering = gesture == name
+            if not hovering and button.triggered:
+                button.reset()
+            button.update(hovering)
+            if button.fired:
+                fires.append((i, name))
+
+    emitted = np.asarray(emitted, dtype=object)
+    hand = clip["has_hand"]
+    false_triggers = sum(1 for i, name in fires if labels[i] != name)
+
+    # Waktu sampai klik: dari awal segmen berlabel sampai trigger benar pertama di dalamnya
+    segments = _segments(labels)
+    hits = 0
+    delay = 0.0
+    fire_index = 0
+    for start, end, name in segments:
+        while fire_index < len(fires) and fires[fire_index][0] < start:
+            fire_index += 1
+        for i, fired_name in fires[fire_index:]:
+            if i >= end:
+                break
+            if fired_name == name:
+                hits += 1
+                delay += times[i] - times[start]
+                break
+    return {"frames": int(hand.sum()), "correct": int(np.sum(emitted[hand] == labels[hand])),
+            "triggers": len(fires), "false_triggers": false_triggers, "segments": len(segments),
+            "hit_segments": hits, "trigger_delay": delay,
+            "duration": times[-1] - times[0] if len(times) > 1 else 0.0}
+
+
+def cursor_quality(clip, min_cutoff, beta):
+    """
+    Jitter (px) and lag (ms) of the cursor filter on the clip's fingertip track.
+
+    See filters.evaluate_filter; no prediction horizon (it depends on the
+    kiosk's measured latency, not on these parameters).
+    """
+    tips = clip["points"][:, 8, :2] * clip["size"]
+    values = [tip if hand else None for tip, hand in zip(tips, clip["has_hand"])]
+    d_cutoff = FILTER_PRESETS["cursor"]["d_cutoff"]
+    result = evaluate_filter(clip["times"], values, lambda: OneEuroFilter(min_cutoff, beta, d_cutoff))
+    return result["jitter_px"], result["lag_ms"], result["samples"]
+
+
+def summarize(counts, cursor=None):
+    """
+    Metrics of one configuration from the summed ``evaluate_clip`` counts.
+
+    Args:
+        counts: Dict of summed counts over the corpus
+        cursor: Optional list of (jitter_px, lag_ms, samples) per clip
+
+    Returns:
+        Dict with the METRICS keys: accuracy (debounced gesture equals the
+        label, frames with a hand), false_per_min (false triggers per
+        minute of recording), time_to_trigger (mean seconds from the start
+        of a labelled gesture to its first correct trigger), missed
+        (labelled gestures that never triggered), jitter_px and lag_ms
+        (sample-weighted over clips)
+    """
+    minutes = counts["duration"] / 60
+    metrics = {
+        "accuracy": counts["correct"] / counts["frames"] if counts["frames"] else 0.0,
+        "false_per_min": counts["false_triggers"] / minutes if minutes > 0 else 0.0,
+        "time_to_trigger": counts["trigger_delay"] / counts["hit_segments"] if counts["hit_segments"] else float("nan"),
+        "missed": counts["segments"] - counts["hit_segments"],
+        "jitter_px": float("nan"),
+        "lag_ms": float("nan"),
+    }
+    if cursor:
+        samples = sum(s for _, _, s in cursor)
+        if samples:
+            metrics["jitter_px"] = sum(j * s for j, _, s in cursor) / samples
+            metrics["lag_ms"] = sum(l * s for _, l, s in cursor) / samples
+    return metrics
+
+
+# Korpus per proses worker (dimuat sekali oleh _init_worker)
+_CORPUS = None
+_MODEL = None
+
+
+def _init_worker(paths, fps, model_path):
+    global _CORPUS, _MODEL
+    _CORPUS = [load_clip(path, fps) for path in paths]
+    _MODEL = load_classifier(model_path) if model_path else None
+    _raw.cache_clear()
+    _cursor.cache_clear()
+
+
+@lru_cache(maxsize=64)
+def _raw(index, thumb_ratio):
+    # Klasifikasi mentah hanya bergantung pada thumb_ratio: dipakai ulang antar konfigurasi
+    return raw_gestures(_CORPUS[index], thumb_ratio, _MODEL)
+
+
+@lru_cache(maxsize=256)
+def _cursor(index, min_cutoff, beta):
+    return cursor_quality(_CORPUS[index], min_cutoff, beta)
+
+
+def _evaluate_config(params):
+    """Metrics of one configuration over the worker's corpus."""
+    totals = {}
+    cursor = []
+    for index, clip in enumerate(_CORPUS):
+        counts = evaluate_clip(clip, params, _MODEL, _raw(index, params["thumb_ratio"]))
+        for key, value in counts.items():
+            totals[key] = totals.get(key, 0) + value
+        cursor.append(_cursor(index, params["cursor_min_cutoff"], params["cursor_beta"]))
+    return params, summarize(totals, cursor)
+
+
+def grid_configs(grid):
+    """
+    Cartesian product of parameter values, other parameters at their defaults.
+
+    Args:
+        grid: Dict of parameter name to a list of values
+
+    Returns:
+        List of complete parameter dicts
+    """
+    names = list(grid)
+    configs = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        config = default_params()
+        config.update(zip(names, values))
+        configs.append(config)
+    return configs
+
+
+def random_configs(count, ranges=None, seed=0):
+    """
+    Uniformly sampled configurations.
+
+    Args:
+        count: Number of configurations
+        ranges: Dict of parameter name to (low, high); only these vary
+                (default: every parameter over its PARAMETERS range)
+        seed: Random seed
+
+    Returns:
+        List of complete parameter dicts
+    """
+    if ranges is None:
+        ranges = {name: (low, high) for name, (_, low, high) in PARAMETERS.items()}
+    rng = np.random.default_rng(seed)
+    configs = []
+    for _ in range(count):
+        config = default_params()
+        for name, (low, high) in ranges.items():
+            config[name] = round(float(rng.uniform(low, high)), 4)
+        configs.append(config)
+    return configs
+
+
+def run_sweep(paths, configs, workers=None, fps=30.0, model_path=None):
+    """
+    Evaluate configurations over a corpus on a process pool.
+
+    Args:
+        paths: Corpus entries (see ``load_clip``)
+        configs: Complete parameter dicts
+        workers: Worker processes (None = CPU count, 1 = in this process)
+        fps: Frame rate assumed for session .npz files
+        model_path: Trained gesture model replacing the rules
+
+    Returns:
+        List of (params, metrics) in ``configs`` order
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(configs) == 1:
+        _init_worker(paths, fps, model_path)
+        return [_evaluate_config(config) for config in configs]
+    # spawn seperti ParallelInference: aman juga saat dipanggil dari aplikasi yang punya thread
+    context = multiprocessing.get_context("spawn")
+    chunksize = max(1, len(configs) // (workers * 4))
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                             initargs=(paths, fps, model_path)) as pool:
+        return list(pool.map(_evaluate_config, configs, chunksize=chunksize))
+
+
+def rank(results):
+    """Results sorted best first: fewest false triggers, then fewest misses, accuracy, fastest trigger."""
+    def key(item):
+        metrics = item[1]
+        delay = metrics["time_to_trigger"]
+        return (round(metrics["false_per_min"], 3), metrics["missed"], -round(metrics["accuracy"], 3),
+                delay if delay == delay else float("inf"))
+    return sorted(results, key=key)
+
+
+def _parse_values(items, count=None):
+    parsed = {}
+    for item in items or ():
+        name, _, values = item.partition("=")
+        if name not in PARAMETERS:
+            raise SystemExit(f"unknown parameter {name!r}, expected one of {', '.join(PARAMETERS)}")
+        numbers = [float(v) for v in values.split(",") if v]
+        if count is not None and len(numbers) != count:
+            raise SystemExit(f"{item}: expected {count} values")
+        parsed[name] = numbers
+    return parsed
+
+
+def _format_row(params, metrics, names):
+    cells = [f"{params[name]:>8.3g}" for name in names]
+    cells += [f"{metrics['accuracy']:8.1%}", f"{metrics['false_per_min']:8.2f}", f"{metrics['time_to_trigger']:8.2f}",
+              f"{metrics['missed']:6d}", f"{metrics['jitter_px']:8.2f}", f"{metrics['lag_ms']:8.1f}"]
+    return " ".join(cells)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep gesture thresholds over labelled landmark recordings.")
+    parser.add_argument("corpus", nargs="+", help="labelled recording directories and/or session .npz files")
+    parser.add_argument("--grid", nargs="*", default=None, metavar="NAME=V1,V2",
+                        help=f"values per parameter ({', '.join(PARAMETERS)})")
+    parser.add_argument("--random", type=int, default=None, metavar="N", help="sample N random configurations")
+    parser.add_argument("--range", nargs="*", default=None, metavar="NAME=LOW,HIGH",
+                        help="parameters varied by --random (default: all, over built-in ranges)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--fps", type=float, default=30.0, help="frame rate of session .npz files")
+    parser.add_argument("--gesture-model", default=None, help="trained gesture classifier .npz")
+    parser.add_argument("--top", type=int, default=15, help="configurations to print")
+    parser.add_argument("--csv", default=None, help="write every configuration and its metrics here")
+    parser.add_argument("--save", default=None, help="write the best configuration as JSON (VTO_GESTURE_PARAMS)")
+    args = parser.parse_args(argv)
+
+    paths = sorted(set(p for pattern in args.corpus for p in (glob.glob(pattern) or [pattern])))
+    if args.random is not None:
+        ranges = _parse_values(args.range, count=2) or None
+        configs = random_configs(args.random, ranges, args.seed)
+        varied = list(ranges) if ranges else list(PARAMETERS)
+    else:
+        grid = _parse_values(args.grid)
+        configs = grid_configs(grid)
+        varied = [name for name in grid if len(grid[name]) > 1] or list(grid)
+    # Konfigurasi bawaan selalu ikut sebagai pembanding
+    baseline = default_params()
+    if baseline not in configs:
+        configs.append(baseline)
+
+    t0 = time.perf_counter()
+    results = run_sweep(paths, configs, args.workers, args.fps, args.gesture_model)
+    elapsed = time.perf_counter() - t0
+    print(f"{len(configs)} configurations x {len(paths)} clips in {elapsed:.1f} s "
+          f"({elapsed / len(configs) * 1000:.0f} ms per configuration)")
+
+    ranked = rank(results)
+    header = " ".join(f"{name[:8]:>8}" for name in varied)
+    print(f"{header} {'accuracy':>8} {'false/min':>8} {'trigger s':>8} {'missed':>6} {'jitter':>8} {'lag ms':>8}")
+    for params, metrics in ranked[:args.top]:
+        print(_format_row(params, metrics, varied))
+    for params, metrics in results:
+        if params == baseline:
+            print("current defaults:")
+            print(_format_row(params, metrics, varied))
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(list(PARAMETERS) + list(METRICS))
+            for params, metrics in ranked:
+                writer.writerow([params[name] for name in PARAMETERS] + [metrics[name] for name in METRICS])
+        print(f"wrote {args.csv}")
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(ranked[0][0], f, indent=2)
+        print(f"saved best configuration to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Swipe Module
+Recognizes left/right swipes from the recent trajectory of the hand.
+"""
+import numpy as np
+
+# Event yang dihasilkan SwipeRecognizer
+SWIPE_EVENTS = ("swipe_left", "swipe_right")
+
+# Pergelangan, pangkal jari tengah (ukuran telapak) dan ujung telunjuk
+_WRIST, _MIDDLE_MCP, _INDEX_TIP = 0, 9, 8
+
+
+class LandmarkRing:
+    """
+    Fixed-size ring buffer of timestamped hand samples.
+
+    Each sample holds the wrist and index fingertip position (pixels) and
+    the palm size. Nothing is allocated after construction; the oldest
+    sample is overwritten when the ring is full.
+    """
+
+    def __init__(self, capacity=32):
+        """
+        Args:
+            capacity: Number of samples kept
+        """
+        self.capacity = capacity
+        self.times = np.zeros(capacity)
+        self.wrist = np.zeros((capacity, 2))
+        self.tip = np.zeros((capacity, 2))
+        self.palm = np.zeros(capacity)
+        self.clear()
+
+    def clear(self):
+        """Drop all samples."""
+        self.head = 0      # slot untuk sampel berikutnya
+        self.count = 0
+
+    def push(self, timestamp, wrist, tip, palm):
+        """Append one sample (overwrites the oldest one when full)."""
+        i = self.head
+        self.times[i] = timestamp
+        self.wrist[i] = wrist
+        self.tip[i] = tip
+        self.palm[i] = palm
+        self.head = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def index(self, age):
+        """Slot of the sample ``age`` pushes ago (0 = newest)."""
+        return (self.head - 1 - age) % self.capacity
+
+
+class SwipeRecognizer:
+    """
+    Emits ``swipe_left``/``swipe_right`` when the hand moves quickly sideways.
+
+    Every frame's wrist and fingertip positions go into a LandmarkRing. The
+    recognizer keeps a pointer to the oldest sample inside the last
+    ``window`` seconds and moves it forward as time passes, so an update is
+    O(1) (amortized) whatever the ring size. A swipe is the palm (mean of
+    wrist and fingertip) travelling at least ``min_distance`` palm sizes
+    horizontally within the window, at ``min_speed`` palm sizes per second
+    or more, with little vertical drift. Distances are divided by the palm
+    size, so the thresholds hold whether the user stands near or far.
+    After a swipe the trajectory is cleared; further swipes wait
+    ``cooldown`` seconds, and the opposite direction (the hand coming back)
+    waits ``rebound`` seconds. A movement suppressed that way is discarded
+    too, so it cannot fire once the wait is over.
+    """
+
+    def __init__(self, window=0.35, min_distance=2.0, min_speed=8.0, max_slope=0.5,
+                 cooldown=0.4, rebound=0.9, capacity=32):
+        """
+        Initialize the recognizer.
+
+        Args:
+            window: Seconds of trajectory a swipe must fit in
+            min_distance: Horizontal travel in palm sizes
+            min_speed: Average horizontal speed in palm sizes per second
+            max_slope: Largest vertical/horizontal travel ratio
+            cooldown: Seconds after a swipe before the next one
+            rebound: Seconds after a swipe before one in the opposite direction
+            capacity: Ring buffer size (must cover ``window`` at the frame rate)
+        """
+        self.window = window
+        self.min_distance = min_distance
+        self.min_speed = min_speed
+        self.max_slope = max_slope
+        self.cooldown = cooldown
+        self.rebound = rebound
+        self.ring = LandmarkRing(capacity)
+        self._tail_age = 0
+        self.last_event = None
+        self.last_event_time = None
+
+        # Statistik
+        self.events = {name: 0 for name in SWIPE_EVENTS}
+
+    def reset(self):
+        """Forget the trajectory (e.g. the hand was lost); cooldowns keep running."""
+        self.ring.clear()
+        self._tail_age = 0
+
+    def update(self, timestamp, points, frame_w, frame_h):
+        """
+        Add one frame and check for a swipe.
+
+        Args:
+            timestamp: Frame time in seconds
+            points: (21, 3) normalized hand landmarks
+            frame_w: Frame width (palm size and distances in pixels)
+            frame_h: Frame height
+
+        Returns:
+            "swipe_left", "swipe_right" or None
+        """
+        ring = self.ring
+        if ring.count and timestamp <= ring.times[ring.index(0)]:
+            return None
+        wrist = (points[_WRIST, 0] * frame_w, points[_WRIST, 1] * frame_h)
+        tip = (points[_INDEX_TIP, 0] * frame_w, points[_INDEX_TIP, 1] * frame_h)
+        palm = np.hypot(points[_MIDDLE_MCP, 0] * frame_w - wrist[0], points[_MIDDLE_MCP, 1] * frame_h - wrist[1])
+        ring.push(timestamp, wrist, tip, palm)
+
+        # Pointer ekor: sampel tertua yang masih di dalam jendela waktu (maju bertahap)
+        self._tail_age = min(self._tail_age + 1, ring.count - 1)
+        while self._tail_age > 0 and timestamp - ring.times[ring.index(self._tail_age)] > self.window:
+            self._tail_age -= 1
+        if self._tail_age == 0:
+            return None
+
+        new, old = ring.index(0), ring.index(self._tail_age)
+        palm_size = max((ring.palm[new] + ring.palm[old]) / 2, 1.0)
+        dx = ((ring.wrist[new, 0] + ring.tip[new, 0]) - (ring.wrist[old, 0] + ring.tip[old, 0])) / 2 / palm_size
+        dy = ((ring.wrist[new, 1] + ring.tip[new, 1]) - (ring.wrist[old, 1] + ring.tip[old, 1])) / 2 / palm_size
+        dt = ring.times[new] - ring.times[old]
+        if abs(dx) < self.min_distance or abs(dx) / dt < self.min_speed or abs(dy) > self.max_slope * abs(dx):
+            return None
+
+        event = "swipe_right" if dx > 0 else "swipe_left"
+        if self.last_event_time is not None:
+            wait = self.cooldown if event == self.last_event else self.rebound
+            if timestamp - self.last_event_time < wait:
+                # Gerakan yang diredam ikut dibuang, supaya tidak terpicu setelah jeda habis
+                self._tail_age = 0
+                return None
+
+        # Lintasan dipakai satu kali: mulai lagi dari sampel ini
+        self._tail_age = 0
+        self.last_event = event
+        self.last_event_time = timestamp
+        self.events[event] += 1
+        return event
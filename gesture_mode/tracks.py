@@ -0,0 +1,261 @@
+"""
+Tracks Module
+Stable IDs for several hands/faces in frame and the choice of the active user.
+"""
+import numpy as np
+
+# Kebijakan pemilihan user aktif
+POLICIES = ("largest", "center", "oldest")
+
+
+class Track:
+    """One tracked person part: id, normalized box (x0, y0, x1, y1) and age."""
+
+    __slots__ = ("track_id", "box", "first_seen", "last_seen", "hits", "misses")
+
+    def __init__(self, track_id, box, timestamp):
+        self.track_id = track_id
+        self.box = box
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.hits = 1
+        self.misses = 0
+
+    @property
+    def center(self):
+        return ((self.box[0] + self.box[2]) / 2, (self.box[1] + self.box[3]) / 2)
+
+    @property
+    def area(self):
+        return max(self.box[2] - self.box[0], 0) * max(self.box[3] - self.box[1], 0)
+
+    def __repr__(self):
+        return f"Track({self.track_id}, box={tuple(round(v, 3) for v in self.box)}, hits={self.hits})"
+
+
+def box_iou(boxes_a, boxes_b):
+    """
+    Pairwise IoU of two box arrays.
+
+    Args:
+        boxes_a: (N, 4) boxes (x0, y0, x1, y1)
+        boxes_b: (M, 4) boxes
+
+    Returns:
+        (N, M) IoU matrix
+    """
+    a = np.asarray(boxes_a, np.float64).reshape(-1, 1, 4)
+    b = np.asarray(boxes_b, np.float64).reshape(1, -1, 4)
+    width = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    height = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = width * height
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    union = area_a + area_b - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def landmark_box(landmarks, indices=None):
+    """
+    Normalized box around (a subset of) a landmark list.
+
+    Args:
+        landmarks: NormalizedLandmarkList
+        indices: Landmark indices to use (None = all)
+    """
+    points = landmarks.landmark
+    if indices is not None:
+        points = [points[i] for i in indices]
+    xs = [lm.x for lm in points]
+    ys = [lm.y for lm in points]
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+class TrackManager:
+    """
+    Assigns stable IDs to detections from frame to frame.
+
+    Detections are matched to existing tracks greedily by IoU; a detection
+    that overlaps no track can still match one whose center is within
+    ``max_center_distance`` track sizes (fast motion between frames).
+    Unmatched detections start new tracks, and tracks unmatched for more
+    than ``max_misses`` updates are dropped.
+    """
+
+    def __init__(self, iou_threshold=0.2, max_center_distance=1.0, max_misses=10):
+        """
+        Initialize the manager.
+
+        Args:
+            iou_threshold: Smallest IoU that counts as the same track
+            max_center_distance: Center distance (in track box sizes) for a
+                                 match when the boxes don't overlap enough
+            max_misses: Updates a track survives without a detection
+        """
+        self.iou_threshold = iou_threshold
+        self.max_center_distance = max_center_distance
+        self.max_misses = max_misses
+        self.tracks = []
+        self._next_id = 1
+
+    def reset(self):
+        """Drop all tracks (IDs keep counting up)."""
+        self.tracks = []
+
+    def update(self, boxes, timestamp):
+        """
+        Match this frame's detections to the tracks.
+
+        Args:
+            boxes: List of normalized (x0, y0, x1, y1) detection boxes
+            timestamp: Frame time in seconds
+
+        Returns:
+            List of Track, one per box, in the order of ``boxes``
+        """
+        assigned = [None] * len(boxes)
+        if boxes and self.tracks:
+            detections = np.asarray(boxes, np.float64)
+            previous = np.array([track.box for track in self.tracks], np.float64)
+            score = box_iou(detections, previous)
+
+            # Tanpa overlap cukup: pakai jarak pusat (skor kecil, IoU tetap diutamakan)
+            det_center = (detections[:, None, :2] + detections[:, None, 2:]) / 2
+            trk_center = (previous[None, :, :2] + previous[None, :, 2:]) / 2
+            trk_size = np.maximum(previous[:, 2] - previous[:, 0], previous[:, 3] - previous[:, 1])
+            distance = np.linalg.norm(det_center - trk_center, axis=-1) / np.maximum(trk_size, 1e-6)
+            near = (score < self.iou_threshold) & (distance < self.max_center_distance)
+            score = np.where(score >= self.iou_threshold, score,
+                             np.where(near, 1e-3 * (1 - distance / self.max_center_distance), -1.0))
+
+            # Greedy: pasangan dengan skor terbaik lebih dulu
+            used = set()
+            for flat in np.argsort(-score, axis=None):
+                det, trk = np.unravel_index(flat, score.shape)
+                if score[det, trk] < 0:
+                    break
+                if assigned[det] is not None or trk in used:
+                    continue
+                used.add(trk)
+                track = self.tracks[trk]
+                track.box = tuple(boxes[det])
+                track.last_seen = timestamp
+                track.hits += 1
+                track.misses = 0
+                assigned[det] = track
+
+        matched = {id(track) for track in assigned if track is not None}
+        for track in self.tracks:
+            if id(track) not in matched:
+                track.misses += 1
+        self.tracks = [track for track in self.tracks if track.misses <= self.max_misses]
+
+        for det, track in enumerate(assigned):
+            if track is None:
+                track = assigned[det] = Track(self._next_id, tuple(boxes[det]), timestamp)
+                self._next_id += 1
+                self.tracks.append(track)
+        return assigned
+
+
+class ActiveUserSelector:
+    """
+    Picks the active track and keeps it stable.
+
+    Tracks are scored by ``policy``: "largest" (box area, the person closest
+    to the camera), "center" (closeness to the frame center) or "oldest"
+    (longest tracked). When ``near`` is given (e.g. the active face box) a
+    hand is scored by its distance to that box instead. The active track
+    is only replaced when it has been missing for ``hold_time`` seconds or
+    when another track has scored ``switch_margin`` times higher for
+    ``switch_after`` seconds, so a passer-by cannot take over during a
+    one-frame dropout.
+    """
+
+    def __init__(self, policy="largest", switch_margin=1.3, switch_after=0.5, hold_time=0.3):
+        """
+        Initialize the selector.
+
+        Args:
+            policy: One of POLICIES
+            switch_margin: Score ratio a challenger needs to take over
+            switch_after: Seconds the challenger must keep that lead
+            hold_time: Seconds the active track is waited for when it is
+                       missing before another track becomes active
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown active user policy {policy!r}, expected one of {POLICIES}")
+        self.policy = policy
+        self.switch_margin = switch_margin
+        self.switch_after = switch_after
+        self.hold_time = hold_time
+        self.switches = 0
+        self.reset()
+
+    def reset(self):
+        """Forget the active track."""
+        self.active_id = None
+        self.active_seen = None
+        self._challenger = None
+
+    def score(self, track, timestamp, near=None):
+        """Policy score of a track (higher is better)."""
+        if near is not None:
+            # Tangan milik wajah aktif: dekat dengan wajah, relatif terhadap ukuran wajah
+            face_center = ((near[0] + near[2]) / 2, (near[1] + near[3]) / 2)
+            face_size = max(near[2] - near[0], near[3] - near[1], 1e-6)
+            cx, cy = track.center
+            return 1.0 / (1.0 + np.hypot(cx - face_center[0], cy - face_center[1]) / face_size)
+        if self.policy == "largest":
+            return track.area
+        if self.policy == "center":
+            cx, cy = track.center
+            return 1.0 / (1.0 + np.hypot(cx - 0.5, cy - 0.5))
+        return timestamp - track.first_seen + 1e-3
+
+    def select(self, tracks, timestamp, near=None):
+        """
+        Choose the active track among this frame's tracks.
+
+        Args:
+            tracks: Tracks detected in this frame
+            timestamp: Frame time in seconds
+            near: Optional normalized box the active track should be close to
+
+        Returns:
+            The active Track, or None (nobody, or the active track is
+            missing but still within ``hold_time``)
+        """
+        current = next((i for i, track in enumerate(tracks) if track.track_id == self.active_id), None)
+        if current is None:
+            if self.active_seen is not None and timestamp - self.active_seen < self.hold_time:
+                # User aktif sebentar tidak terdeteksi: jangan langsung diambil orang lain
+                return None
+            if not tracks:
+                self.reset()
+                return None
+        scores = [self.score(track, timestamp, near) for track in tracks]
+        best = int(np.argmax(scores))
+
+        if current is None:
+            # User aktif hilang (atau belum ada): ambil yang terbaik
+            return self._switch(tracks[best], timestamp)
+        self.active_seen = timestamp
+        if best == current or scores[best] < scores[current] * self.switch_margin:
+            self._challenger = None
+            return tracks[current]
+
+        challenger = tracks[best].track_id
+        if self._challenger is None or self._challenger[0] != challenger:
+            self._challenger = (challenger, timestamp)
+        elif timestamp - self._challenger[1] >= self.switch_after:
+            return self._switch(tracks[best], timestamp)
+        return tracks[current]
+
+    def _switch(self, track, timestamp):
+        if self.active_id is not None:
+            self.switches += 1
+        self.active_id = track.track_id
+        self.active_seen = timestamp
+        self._challenger = None
+        return track
@@ -3,6 +3,7 @@ UI Manager Module
 Manages UI elements within the video frame.
 """
 import cv2
+import time
 import numpy as np
 
 
@@ -388,10 +389,16 @@ class InstructionPanel(UIElement):
 class UIManager:
     """Manages UI elements in the video frame."""
 
-    def __init__(self):
-        """Initialize the UI manager."""
+    def __init__(self, styles=None):
+        """
+        Initialize the UI manager.
+
+        Args:
+            styles: Glasses style names to offer (default: the three drawn
+                    styles; pass GlassesRenderer.styles to include image styles)
+        """
         # Available styles and colors
-        self.styles = ["Rectangle", "Round", "Aviator"]
+        self.styles = list(styles) if styles else ["Rectangle", "Round", "Aviator"]
         self.colors = {
             "Black": (0, 0, 0),
             "Blue": (255, 0, 0),
@@ -411,9 +418,9 @@ class UIManager:
         # Create UI elements (will be positioned appropriately when first frame is received)
         self.ui_initialized = False
 
-        # Click cooldown to prevent multiple clicks
-        self.click_cooldown = 0
-        self.cooldown_frames = 15  # Number of frames to wait between clicks
+        # Click cooldown to prevent multiple clicks (wall time, independent of FPS)
+        self.last_click_time = None
+        self.cooldown_time = 0.5  # Seconds to wait between clicks (was 15 frames)
 
     def _initialize_ui(self, frame_width, frame_height):
         """Initialize UI elements based on frame dimensions."""
@@ -448,7 +455,7 @@ class UIManager:
 
         self.ui_initialized = True
 
-    def update(self, frame, gesture, cursor_pos):
+    def update(self, frame, gesture, cursor_pos, timestamp=None):
         """
         Update the UI state based on gesture and cursor position.
 
@@ -456,7 +463,10 @@ class UIManager:
             frame: The current video frame
             gesture: The current hand gesture
             cursor_pos: The current cursor position
+            timestamp: Current time in seconds (default: ``time.monotonic()``)
         """
+        now = time.monotonic() if timestamp is None else timestamp
+
         # Initialize UI if not already done
         if not self.ui_initialized and frame is not None:
             frame_height, frame_width = frame.shape[:2]
@@ -468,7 +478,8 @@ class UIManager:
                 element.update(cursor_pos)
 
         # Handle gestures
-        if gesture == "left_click" and cursor_pos and self.click_cooldown <= 0:
+        cooled = self.last_click_time is None or now - self.last_click_time >= self.cooldown_time
+        if gesture == "left_click" and cursor_pos and cooled:
             # Handle click
             for element in self.elements:
                 if hasattr(element, 'handle_click'):
@@ -479,14 +490,10 @@ class UIManager:
                         elif isinstance(element, ColorSelector):
                             self.current_color = element.selected_color
 
-                        # Set cooldown
-                        self.click_cooldown = self.cooldown_frames
+                        # Start cooldown
+                        self.last_click_time = now
                         break
 
-        # Update cooldown
-        if self.click_cooldown > 0:
-            self.click_cooldown -= 1
-
     def render(self, frame):
         """
         Render all UI elements on the frame.
@@ -5,32 +5,77 @@ Main application class that handles camera, UI, and rendering.
 import cv2
 import time
 import numpy as np
+import mediapipe as mp
 from .face_detection import FaceDetector
 from .hand_gesture import HandGestureDetector
 from .glasses_renderer import GlassesRenderer
 from .ui_manager import UIManager
+from .frame_source import CameraSource
+from .frame_packet import BufferPool, FramePacket
+from .parallel_inference import ParallelInference
+from .quality import QualityGovernor
+from .filters import LatencyEstimator
 
 class VirtualTryOnApp:
     """Main Virtual Try-On application class with gesture-based UI."""
     
-    def __init__(self):
-        """Initialize the application."""
-        # Initialize components
-        self.face_detector = FaceDetector()
-        self.gesture_detector = HandGestureDetector()
+    def __init__(self, source=None, inference="sequential", backend="solutions", keyframe_rate=None,
+                 face_tracking=False, quality_budget_ms=None, motion_gate=False, max_users=1, recorder=None):
+        """
+        Initialize the application.
+
+        Args:
+            source: FrameSource to read from (default: webcam 0 at 1280x720)
+            inference: "sequential" runs hand and face detection one after the
+                       other in this process; "parallel" runs them in two
+                       worker processes (see ParallelInference)
+            backend: MediaPipe backend, "solutions" or "tasks" (asynchronous
+                     live-stream landmarkers, see landmark_backend)
+            keyframe_rate: Run the detectors only this many times per second
+                           and extrapolate in between (sequential mode)
+            face_tracking: Follow the face with optical flow between Face
+                           Mesh runs (sequential mode, not with keyframe_rate)
+            quality_budget_ms: Detection time budget per frame; when set, a
+                               QualityGovernor lowers and raises the detector
+                               quality to stay within it (sequential mode)
+            motion_gate: Reuse the previous landmarks on frames where nothing
+                         moved around the hand/face (sequential mode)
+            max_users: People to track; above 1 the largest face is the
+                       active user and only the hand nearest to it drives
+                       the UI (sequential mode)
+            recorder: Optional recording.LandmarkRecorder receiving the hand
+                      landmarks, face anchors, cursor and gesture of every
+                      frame (sequential mode); closed when the app exits
+        """
+        # Initialize components (in parallel mode the detectors live in the workers)
+        sequential = inference != "parallel"
+        self.backend = backend
+        # Latency capture -> imshow; cursor dan anchor kacamata diprediksi sebagian darinya
+        self.latency = LatencyEstimator()
+        self.face_detector = FaceDetector(backend=backend, keyframe_rate=keyframe_rate, tracking=face_tracking,
+                                          motion_gate=motion_gate, max_faces=max_users,
+                                          latency=self.latency) if sequential else None
+        self.gesture_detector = HandGestureDetector(backend=backend, keyframe_rate=keyframe_rate,
+                                                    motion_gate=motion_gate, max_hands=max_users,
+                                                    latency=self.latency) if sequential else None
         self.glasses_renderer = GlassesRenderer()
+        self.governor = QualityGovernor(budget_ms=quality_budget_ms) if quality_budget_ms and sequential else None
+        self.recorder = recorder if sequential else None
         
         # UI Manager for handling UI elements
-        self.ui_manager = UIManager()
+        self.ui_manager = UIManager(styles=self.glasses_renderer.styles)
+        
+        # Initialize frame source (webcam, video file, image folder, synthetic)
+        self.cap = source if source is not None else CameraSource(indices=(0,), width=1280, height=720)
+        if not self.cap.open():
+            raise Exception("Could not open frame source.")
         
-        # Initialize webcam
-        self.cap = cv2.VideoCapture(0)
-        if not self.cap.isOpened():
-            raise Exception("Could not open webcam.")
+        # Parallel inference is started on the first frame (needs the frame shape)
+        self.inference = inference
+        self.parallel = None
         
-        # Set webcam resolution (optional)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+        # Mirror/RGB buffers reused every frame
+        self.frame_pool = BufferPool()
         
         # Performance tracking
         self.prev_time = 0
@@ -39,29 +84,63 @@ class VirtualTryOnApp:
         # Application state
         self.running = True
         
-    def process_frame(self, frame):
+    def process_frame(self, frame, timestamp=None):
         """
         Process a single frame from the webcam.
         
         Args:
             frame: BGR frame from the camera
+            timestamp: Capture time in seconds (``time.monotonic()`` clock,
+                       default: now)
             
         Returns:
             Processed frame with UI and virtual items
         """
-        # Flip the frame horizontally for a more natural view
-        frame = cv2.flip(frame, 1)
+        # Flip the frame horizontally for a more natural view; the detectors
+        # share the packet's RGB conversion
+        if timestamp is None:
+            timestamp = time.monotonic()
+        packet = FramePacket(frame, mirror=True, pool=self.frame_pool, timestamp=timestamp)
+        frame = packet.bgr
         
         # Calculate FPS
         current_time = time.time()
         self.fps = 1/(current_time - self.prev_time) if (current_time - self.prev_time) > 0 else 60
         self.prev_time = current_time
         
-        # Process hand gestures for UI control
-        hand_landmarks, gesture, finger_position = self.gesture_detector.process_frame(frame)
-        
-        # Detect face for glasses placement
-        face_landmarks, face_data = self.face_detector.detect_face(frame)
+        if self.inference == "parallel":
+            # Hand and face graphs run concurrently in worker processes
+            if self.parallel is None:
+                self.parallel = ParallelInference(frame.shape, backend=self.backend)
+            hand_result, face_result = self.parallel.process(frame)
+            hand_landmarks, gesture, finger_position = hand_result
+            face_landmarks, face_data = face_result
+            # Workers don't draw into the shared slot, so draw the skeleton here
+            if hand_landmarks:
+                mp.solutions.drawing_utils.draw_landmarks(frame, hand_landmarks, mp.solutions.hands.HAND_CONNECTIONS)
+        else:
+            # Process hand gestures for UI control (multi-user: the hand of the
+            # active face from the previous frame)
+            self.gesture_detector.active_face_box = self.face_detector.active_box
+            start = time.perf_counter()
+            hand_landmarks, gesture, finger_position = self.gesture_detector.process_frame(packet)
+            
+            # Detect face for glasses placement
+            face_landmarks, face_data = self.face_detector.detect_face(packet)
+            
+            # Hanya frame di mana kedua model benar-benar jalan (bukan reuse motion gate)
+            if (self.governor is not None and not self.gesture_detector.motion_reused
+                    and not self.face_detector.motion_reused):
+                level = self.governor.observe((time.perf_counter() - start) * 1000, timestamp)
+                if level is not None:
+                    self.gesture_detector.apply_quality(level)
+                    self.face_detector.apply_quality(level)
+            
+            if self.recorder is not None:
+                self.recorder.append(timestamp, (packet.width, packet.height),
+                                     hand=self.gesture_detector.points, face=self.face_detector.anchors,
+                                     cursor=finger_position, gesture=gesture,
+                                     event=self.gesture_detector.swipe_event)
         
         # Update UI state based on hand gesture
         self.ui_manager.update(frame, gesture, finger_position)
@@ -108,12 +187,15 @@ class VirtualTryOnApp:
             if not ret:
                 print("Failed to grab frame")
                 break
+            # Waktu tangkap dari source, bukan setelah read() (yang bisa menunggu di buffer)
+            captured = self.cap.timestamp
             
             # Process the frame
-            processed_frame = self.process_frame(frame)
+            processed_frame = self.process_frame(frame, captured)
             
             # Display the result
             cv2.imshow('Virtual Try-On', processed_frame)
+            self.latency.observe(time.monotonic() - captured)
             
             # Check for keyboard input
             key = cv2.waitKey(1) & 0xFF
@@ -125,4 +207,11 @@ class VirtualTryOnApp:
         cv2.destroyAllWindows()
         
         # Cleanup
-        self.face_detector.release()
\ No newline at end of file
+        if self.face_detector is not None:
+            self.face_detector.release()
+        if self.gesture_detector is not None:
+            self.gesture_detector.release()
+        if self.parallel is not None:
+            self.parallel.close()
+        if self.recorder is not None:
+            self.recorder.close()
\ No newline at end of file
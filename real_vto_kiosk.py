@@ -4,8 +4,21 @@ from PIL import Image, ImageTk, ImageDraw
 import os
 import threading
 import time
-from gesture_mode.hand_gesture import HandGestureDetector
+from gesture_mode.hand_gesture import HandGestureDetector, apply_params, load_params
 from gesture_mode.virtual_tryon import VirtualTryOnApp
+from gesture_mode.camera_service import CameraService
+from gesture_mode.frame_source import create_source
+from gesture_mode.display import CameraDisplay
+from gesture_mode.frame_packet import BufferPool, FramePacket
+from gesture_mode.remap import load_calibration
+from gesture_mode.canvas_scene import CanvasScene
+from gesture_mode.frame_scheduler import FrameScheduler
+from gesture_mode.inference_worker import InferenceWorker
+from gesture_mode.quality import QualityGovernor
+from gesture_mode.presence import PresenceMonitor
+from gesture_mode.filters import LatencyEstimator
+from gesture_mode.recording import LandmarkRecorder
+from gesture_mode.dwell import DWELL_TIME, DwellButton
 
 
 # --- LIBRARY TAMBAHAN ---
@@ -47,6 +60,107 @@ else:
 def s(value):
     return int(value * SCALE_FACTOR)
 
+# Target FPS loop kamera (deadline per frame = 1 / TARGET_FPS)
+TARGET_FPS = 30
+
+# --- SUMBER KAMERA ---
+# Kosong = kamera kiosk. Isi dengan index kamera, path video, folder gambar,
+# atau "synthetic" (untuk PC/CI tanpa webcam), contoh: VTO_SOURCE=rekaman.mp4
+CAMERA_SOURCE = os.environ.get("VTO_SOURCE")
+
+# --- KALIBRASI LENSA ---
+# File .npz/.json (camera_matrix, dist_coeffs, image_size) untuk kamera wide-angle kiosk.
+# Kosong = tanpa koreksi distorsi. Contoh: VTO_CALIBRATION=kalibrasi_kiosk.npz
+CALIBRATION_FILE = os.environ.get("VTO_CALIBRATION")
+CAMERA_CALIBRATION = load_calibration(CALIBRATION_FILE) if CALIBRATION_FILE else None
+
+def make_camera_display(width, height):
+    # Mirror, crop, scale dan undistort digabung jadi satu cv2.remap (tabel di-cache ke disk)
+    return CameraDisplay(width, height, calibration=CAMERA_CALIBRATION, mirror=True)
+
+# --- BACKEND MEDIAPIPE ---
+# "solutions" = mp.solutions (blocking, default/fallback).
+# "tasks" = MediaPipe Tasks LIVE_STREAM (async), butuh assets/models/hand_landmarker.task
+LANDMARK_BACKEND = os.environ.get("VTO_LANDMARK_BACKEND", "solutions")
+
+# Inferensi tangan di crop kecil sekitar posisi tangan sebelumnya (graph kedua khusus crop).
+# Nonaktif sampai benchmark dengan MediaPipe asli menunjukkan untung:
+# python -m gesture_mode.benchmark --source rekaman.mp4 --roi
+HAND_ROI_TRACKING = os.environ.get("VTO_HAND_ROI") == "1"
+
+# Model tangan dijalankan N kali per detik, cursor diekstrapolasi di antaranya.
+# None = setiap frame. Cek error dulu: python -m gesture_mode.benchmark --mode keyframe
+HAND_KEYFRAME_RATE = None
+
+# Lewati model tangan saat area sekitar tangan (atau layar kosong) tidak berubah
+HAND_MOTION_GATE = True
+
+# Toko ramai: deteksi sampai N tangan, hanya tangan user aktif yang menggerakkan cursor.
+# "largest" = tangan terbesar (paling dekat kamera), "center", atau "oldest".
+# Default 1: dengan N > 1 palm detection jalan tiap frame selama tangan yang terlihat < N
+# (lebih mahal untuk satu user), dan HAND_ROI_TRACKING otomatis nonaktif.
+HAND_MAX_USERS = int(os.environ.get("VTO_MAX_USERS", "1"))
+HAND_ACTIVE_POLICY = "largest"
+
+# Swipe kiri/kanan mengganti pilihan baju di VTOGestureScreen
+HAND_SWIPE = True
+# Detik setelah swipe di mana hover kursor tidak mengubah pilihan
+# (tangan yang baru menyapu biasanya masih di atas kartu lain)
+SWIPE_HOVER_HOLD = 0.8
+
+# Model gestur hasil training (.npz) menggantikan aturan status jari.
+# Kosong = aturan. Buat: python -m gesture_mode.gesture_classifier train sesi/*.npz
+HAND_GESTURE_MODEL = os.environ.get("VTO_GESTURE_MODEL") or None
+
+# Threshold gestur hasil tuning per kiosk (JSON dari sweep --save), kosong = default kode.
+# Buat: python -m gesture_mode.sweep rekaman/* --random 300 --save kiosk.json
+GESTURE_PARAMS = load_params(os.environ.get("VTO_GESTURE_PARAMS"))
+
+# Latency capture -> tampil di layar (diukur di update_camera). Cursor One-Euro
+# diprediksi sebagian latency ini ke depan agar tidak tertinggal dari tangan.
+CURSOR_LATENCY = LatencyEstimator()
+
+# Rekam landmark, cursor dan gestur tiap frame ke folder ini (satu subfolder per sesi)
+# untuk diputar ulang tanpa kamera: python -m gesture_mode.recording replay <folder>
+# Kosong = tidak merekam.
+RECORD_DIR = os.environ.get("VTO_RECORD_DIR") or None
+
+def make_landmark_recorder():
+    return LandmarkRecorder(os.path.join(RECORD_DIR, time.strftime("%Y%m%d_%H%M%S"))) if RECORD_DIR else None
+
+def make_gesture_detector():
+    # Dipanggil di thread worker; skeleton digambar oleh CameraDisplay, bukan ke frame worker
+    detector = HandGestureDetector(draw_landmarks=False, backend=LANDMARK_BACKEND,
+                                   roi_tracking=HAND_ROI_TRACKING, keyframe_rate=HAND_KEYFRAME_RATE,
+                                   motion_gate=HAND_MOTION_GATE, max_hands=HAND_MAX_USERS,
+                                   active_policy=HAND_ACTIVE_POLICY, swipe=HAND_SWIPE,
+                                   gesture_model=HAND_GESTURE_MODEL, latency=CURSOR_LATENCY)
+    apply_params(detector, GESTURE_PARAMS)
+    return detector
+
+# Budget waktu inferensi tangan (ms). Jika terlewati, kualitas diturunkan bertahap
+# (resolusi input, model_complexity, keyframe) dan dinaikkan lagi saat ada ruang.
+# 0 = kualitas tetap. Contoh unit lambat: VTO_QUALITY_BUDGET_MS=50
+QUALITY_BUDGET_MS = float(os.environ.get("VTO_QUALITY_BUDGET_MS", "33"))
+
+# Satu governor untuk semua screen: level yang sudah dipelajari tidak hilang saat pindah layar
+QUALITY_GOVERNOR = QualityGovernor(budget_ms=QUALITY_BUDGET_MS) if QUALITY_BUDGET_MS > 0 else None
+
+# Mode idle: tanpa tangan selama N detik, graph MediaPipe dilepas dan worker hanya
+# memeriksa gerakan IDLE_CHECK_RATE kali per detik; preview turun ke IDLE_FPS.
+# 0 = selalu aktif. Contoh: VTO_IDLE_AFTER=60
+IDLE_AFTER_S = float(os.environ.get("VTO_IDLE_AFTER", "20"))
+IDLE_CHECK_RATE = 5
+IDLE_FPS = 10
+
+def make_presence_monitor():
+    return PresenceMonitor(idle_after=IDLE_AFTER_S, idle_rate=IDLE_CHECK_RATE) if IDLE_AFTER_S > 0 else None
+
+def make_camera_service():
+    if CAMERA_SOURCE:
+        return CameraService(source_factory=lambda: create_source(CAMERA_SOURCE, loop=True))
+    return CameraService()
+
 # -----------------------------------
 
 class App(tk.Tk):
@@ -65,6 +179,12 @@ class App(tk.Tk):
         container.grid_rowconfigure(0, weight=1)
         container.grid_columnconfigure(0, weight=1)
         
+        # Satu kamera dipakai bersama oleh semua screen (dibaca di thread terpisah)
+        self.camera = make_camera_service() if HAS_CV else None
+        # Satu rekaman per sesi aplikasi, dipakai bersama worker semua screen
+        self.recorder = make_landmark_recorder()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        
         self.screens = {}
         
         # --- UPDATE DAFTAR SCREEN DISINI ---
@@ -88,6 +208,16 @@ class App(tk.Tk):
         if hasattr(screen, "on_show"):
             screen.on_show()
 
+    def on_close(self):
+        for screen in self.screens.values():
+            if hasattr(screen, "on_hide"):
+                screen.on_hide()
+        if self.camera:
+            self.camera.stop()
+        if self.recorder is not None:
+            self.recorder.close()
+        self.destroy()
+
 class HomeScreen(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg="#0a0a0a")
@@ -158,17 +288,16 @@ class CalibrationGestureScreen(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg="#0a0a0a")
         self.controller = controller
-        self.cap = None
         self.is_running = False
-        self.detector = None
+        self.worker = None
         self.vto = None
+        # Loop kamera berbasis deadline (menggantikan after(33, ...))
+        self.scheduler = FrameScheduler(self, self.update_camera, target_fps=TARGET_FPS)
         
         # Variabel untuk logika tombol
-        self.hover_start_time = 0
-        self.hover_duration = 1.5  # Waktu (detik) untuk memicu klik
-        self.is_button_active = False # Status apakah tombol sedang di-hover
-        
-        self.success_triggered = False
+        self.hover_duration = GESTURE_PARAMS.get("hover_duration", DWELL_TIME)  # Waktu (detik) untuk memicu klik
+        # Logika dwell terpisah dari Tk (jam bisa diganti saat replay rekaman)
+        self.dwell = DwellButton(self.hover_duration)
 
         if HAS_CV:
             self.mp_hands = mp.solutions.hands
@@ -184,11 +313,15 @@ class CalibrationGestureScreen(tk.Frame):
         self.cw, self.ch = s(620), s(800)
         self.preview_canvas = tk.Canvas(self, width=self.cw, height=self.ch, bg="#1a1a2e", highlightthickness=2, highlightbackground="#4a4a6a")
         self.preview_canvas.pack()
+        self.display = make_camera_display(self.cw, self.ch)
+        self.frame_pool = BufferPool()  # buffer view turunan dipakai ulang di thread Tk
+        # Item canvas dibuat sekali, tiap frame hanya diupdate (coords/itemconfig)
+        self.scene = CanvasScene(self.preview_canvas)
         
         self.create_nav_buttons() 
 
     def on_show(self):
-        self.success_triggered = False
+        self.dwell.reset()
         
         # 1. Reset status label agar user tahu sedang loading
         self.status_label.config(text="Initializing Camera...", fg="#b8b8b8")
@@ -203,46 +336,60 @@ class CalibrationGestureScreen(tk.Frame):
             return
 
         if HAS_CV:
-            self.detector = HandGestureDetector()
+            # Inferensi MediaPipe berjalan di thread worker, loop Tk hanya membaca mailbox
+            self.worker = InferenceWorker(self.controller.camera, make_gesture_detector,
+                                          governor=QUALITY_GOVERNOR, presence=make_presence_monitor(),
+                                          recorder=self.controller.recorder)
             # self.vto = VirtualTryOnApp() # (Ingat baris ini dikomen/matikan agar tombol alumni hilang)
             self.is_running = True
             
-            # --- Proses Berat Dimulai Disini (Tapi layar sudah aman/bersih) ---
-            self.cap = cv2.VideoCapture(1, cv2.CAP_DSHOW)
-            
-            # Fallback ke kamera 0 jika 1 gagal
-            if self.cap is None or not self.cap.isOpened():
-                print("⚠️ Kamera index 1 gagal! Mencoba index 0...")
-                self.cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
+            # Kamera dibuka oleh CameraService (tidak dibuka ulang tiap pindah layar)
+            self.controller.camera.subscribe(self)
+            self.worker.start()
 
             # Update status dan mulai loop kamera
             self.status_label.config(text="Angkat tangan ke depan kamera", fg="#b8b8b8")
-            self.update_camera()
+            self.scheduler.start()
         else:
             self.status_label.config(text="Library OpenCV tidak ditemukan.", fg="#ff5555")
 
     def on_hide(self):
+        if self.is_running:
+            print(f"📊 Calibration: {self.scheduler.report()}")
+            print(f"📊 Calibration: {self.worker.report()}")
         self.is_running = False
-        if self.cap and self.cap.isOpened():
-            self.cap.release()
-        self.preview_canvas.delete("all") 
+        self.scheduler.stop()
+        if self.worker:
+            self.worker.stop()
+        if self.controller.camera:
+            self.controller.camera.unsubscribe(self)
+        self.scene.hide("cursor")
 
     def update_camera(self):
-        if not self.is_running or self.cap is None:
+        if not self.is_running:
             return
 
-        ret, frame = self.cap.read()
-        if ret:
+        # Kiosk kosong (worker idle): preview cukup IDLE_FPS
+        target_fps = IDLE_FPS if self.worker and self.worker.idle else TARGET_FPS
+        if self.scheduler.target_fps != target_fps:
+            self.scheduler.set_target_fps(target_fps)
+
+        latest = self.scheduler.poll(self.controller.camera)
+        if latest:
+            _, _, frame = latest
             # 1. Mirror & Convert
-            frame = cv2.flip(frame, 1)
-            frame_h, frame_w, _ = frame.shape
+            packet = FramePacket(frame, mirror=True, pool=self.frame_pool)
             
             cursor_pos_ui = None
             gesture_detected = "none"
-
-            # 2. Detect Hands
-            if self.detector:
-                _, gesture, finger_pos = self.detector.process_frame(frame)
+            finger_pos = None
+            hand_landmarks = None
+
+            # 2. Hasil deteksi tangan terbaru dari worker (tidak menunggu model)
+            result = self.worker.mailbox.read() if self.worker else None
+            if result:
+                hand_landmarks, gesture, finger_pos = result.points, result.gesture, result.cursor
+                CURSOR_LATENCY.displayed(result.frame_id, result.timestamp)
                 gesture_detected = gesture
                 
                 if gesture != "none":
@@ -254,48 +401,27 @@ class CalibrationGestureScreen(tk.Frame):
                 # if self.vto:
                 #    self.vto.apply_gesture(gesture, frame, finger_pos)
             
-            # 3. --- PROSES GAMBAR UNTUK UI (CROP & SCALE) ---
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            img = Image.fromarray(frame_rgb)
+            elif self.worker:
+                self.status_label.config(text="Memuat model tangan...", fg="#b8b8b8")
             
-            img_w, img_h = img.size
-            target_w, target_h = self.cw, self.ch
-            
-            # Hitung scaling factor (cover)
-            scale = max(target_w / img_w, target_h / img_h)
-            new_w = int(img_w * scale)
-            new_h = int(img_h * scale)
-            img = img.resize((new_w, new_h), Image.Resampling.LANCZOS)
-            
-            # Hitung offset crop
-            left = (new_w - target_w) // 2
-            top = (new_h - target_h) // 2
-            right = left + target_w
-            bottom = top + target_h
-            img = img.crop((left, top, right, bottom))
+            # 3. --- PROSES GAMBAR UNTUK UI (CROP DULU, LALU SCALE) ---
+            self.photo = self.display.update(packet, hand_landmarks)
             
             # 4. --- TRANSFORMASI KOORDINAT CURSOR ---
-            # Kita perlu mengubah koordinat jari (dari frame kamera asli) ke koordinat Canvas UI
-            if finger_pos:
-                fx, fy = finger_pos
-                # Scale
-                ui_x = fx * scale
-                ui_y = fy * scale
-                # Adjust for Crop
-                ui_x -= left
-                ui_y -= top
-                cursor_pos_ui = (ui_x, ui_y)
+            # Koordinat jari (frame kamera asli) -> koordinat Canvas UI, geometri yang sama dengan gambar
+            cursor_pos_ui = self.display.map_point(finger_pos)
 
             # 5. Render ke Canvas
-            self.photo = ImageTk.PhotoImage(img)
-            self.preview_canvas.create_image(0, 0, image=self.photo, anchor="nw")
+            self.scene.begin_frame()
+            self.scene.item("camera", "image", (0, 0), image=self.photo, anchor="nw")
             
             # 6. Gambar UI Overlay (Tombol & Cursor)
             self.draw_overlay_ui(gesture_detected, cursor_pos_ui)
             
-            self.draw_corner_brackets(self.preview_canvas, self.cw, self.ch)
-        
-        self.after(33, self.update_camera)
+            self.draw_corner_brackets(self.scene, self.cw, self.ch)
+            
+            # Setelah frame pertama jumlah item canvas dikunci (tidak bertambah lagi)
+            self.scene.freeze()
 
     def draw_overlay_ui(self, gesture, cursor_pos):
         """Menggambar tombol interaktif dan kursor di atas kamera"""
@@ -307,7 +433,6 @@ class CalibrationGestureScreen(tk.Frame):
         btn_y2 = btn_y1 + btn_h
         
         is_hovering = False
-        progress = 0
         
         # --- LOGIKA HIT TESTING ---
         if cursor_pos:
@@ -318,56 +443,42 @@ class CalibrationGestureScreen(tk.Frame):
                     is_hovering = True
         
         # --- LOGIKA WAKTU (DWELL TIME) ---
-        if is_hovering and not self.success_triggered: # Cek jika belum sukses sebelumnya
-            if not self.is_button_active:
-                self.hover_start_time = time.time()
-                self.is_button_active = True
-            
-            elapsed = time.time() - self.hover_start_time
-            progress = min(elapsed / self.hover_duration, 1.0)
-            
-            if progress >= 1.0:
-                # --- AKSI SUKSES & PINDAH HALAMAN ---
-                btn_color = "#55ff55"
-                btn_text = "SUCCESS!"
-                self.success_triggered = True # Kunci agar tidak terpanggil berkali-kali
-                
-                # Beri jeda 0.5 detik agar user sempat lihat tulisan "SUCCESS" sebelum pindah
-                self.after(500, lambda: self.controller.show_screen("VTOGestureScreen"))
-                
-            else:
-                btn_color = "#ffaa55"
-                btn_text = "HOLD..."
-        else:
+        progress = self.dwell.update(is_hovering)
+        if self.dwell.fired:
+            # --- AKSI SUKSES & PINDAH HALAMAN (hanya sekali, dwell terkunci sampai reset) ---
+            # Beri jeda 0.5 detik agar user sempat lihat tulisan "SUCCESS" sebelum pindah
+            self.after(500, lambda: self.controller.show_screen("VTOGestureScreen"))
+        
+        if self.dwell.triggered:
             # Jika sudah sukses, biarkan tombol hijau sampai pindah
-            if self.success_triggered:
-                btn_color = "#55ff55"
-                btn_text = "SUCCESS!"
-                progress = 1.0
-            else:
-                self.is_button_active = False
-                progress = 0
-                btn_color = "#4a4a6a"
-                btn_text = "TEST BUTTON"
+            btn_color = "#55ff55"
+            btn_text = "SUCCESS!"
+        elif self.dwell.active:
+            btn_color = "#ffaa55"
+            btn_text = "HOLD..."
+        else:
+            btn_color = "#4a4a6a"
+            btn_text = "TEST BUTTON"
 
         # --- GAMBAR TOMBOL ---
-        self.draw_rounded_rect(self.preview_canvas, btn_x1, btn_y1, btn_x2, btn_y2, s(20), fill=btn_color, outline="white", width=2)
+        self.scene.rounded_rect("button", btn_x1, btn_y1, btn_x2, btn_y2, s(20), fill=btn_color, outline="white", width=2)
         
-        if progress > 0 and progress < 1.0:
-            load_w = (btn_x2 - btn_x1) * progress
-            self.preview_canvas.create_rectangle(btn_x1, btn_y2-s(10), btn_x1+load_w, btn_y2, fill="#ffffff", outline="")
+        load_w = (btn_x2 - btn_x1) * progress
+        self.scene.item("progress", "rectangle", (btn_x1, btn_y2-s(10), btn_x1+load_w, btn_y2), fill="#ffffff", outline="",
+                        state="normal" if 0 < progress < 1.0 else "hidden")
 
-        self.preview_canvas.create_text((btn_x1+btn_x2)//2, (btn_y1+btn_y2)//2, text=btn_text, font=("Arial", s(20), "bold"), fill="white")
+        self.scene.item("button_text", "text", ((btn_x1+btn_x2)//2, (btn_y1+btn_y2)//2), text=btn_text, font=("Arial", s(20), "bold"), fill="white")
 
         # --- GAMBAR CURSOR ---
-        if cursor_pos:
-            cx, cy = cursor_pos
-            r = s(15)
-            # Cursor hijau jika pointing/move, merah jika lainnya
-            cur_color = "#00ff00" if (gesture == "pointing" or gesture == "move") else "#ff0000"
-            self.preview_canvas.create_oval(cx-r, cy-r, cx+r, cy+r, fill=cur_color, outline="white", width=2)
-
-    # ... (Method load_icon, draw_corner_brackets, draw_rounded_rect, create_nav_buttons SAMA SEPERTI SEBELUMNYA) ...
+        # Cursor selalu ada di scene, disembunyikan jika tangan tidak terdeteksi
+        cx, cy = cursor_pos if cursor_pos else (0, 0)
+        r = s(15)
+        # Cursor hijau jika pointing/move, merah jika lainnya
+        cur_color = "#00ff00" if (gesture == "pointing" or gesture == "move") else "#ff0000"
+        self.scene.item("cursor", "oval", (cx-r, cy-r, cx+r, cy+r), fill=cur_color, outline="white", width=2,
+                        state="normal" if cursor_pos else "hidden")
+
+    # ... (Method load_icon, draw_corner_brackets, create_nav_buttons SAMA SEPERTI SEBELUMNYA) ...
     def load_icon(self, icon_name, max_size):
         # ... (Salin kode load_icon yang lama) ...
         try:
@@ -382,17 +493,13 @@ class CalibrationGestureScreen(tk.Frame):
         except: pass
         return None
 
-    def draw_rounded_rect(self, canvas, x1, y1, x2, y2, radius, **kwargs):
-        points = [x1+radius, y1, x2-radius, y1, x2, y1, x2, y1+radius, x2, y2-radius, x2, y2, x2-radius, y2, x1+radius, y2, x1, y2, x1, y2-radius, x1, y1+radius, x1, y1]
-        return canvas.create_polygon(points, **kwargs, smooth=True)
-
-    def draw_corner_brackets(self, canvas, w, h):
+    def draw_corner_brackets(self, scene, w, h):
         bl, bw, off = s(60), s(4), s(20)
         bc = "#7a7aff"
-        canvas.create_line(off, off+bl, off, off, off+bl, off, fill=bc, width=bw)
-        canvas.create_line(w-off-bl, off, w-off, off, w-off, off+bl, fill=bc, width=bw)
-        canvas.create_line(off, h-off-bl, off, h-off, off+bl, h-off, fill=bc, width=bw)
-        canvas.create_line(w-off-bl, h-off, w-off, h-off, w-off, h-off-bl, fill=bc, width=bw)
+        scene.item("bracket_tl", "line", (off, off+bl, off, off, off+bl, off), fill=bc, width=bw)
+        scene.item("bracket_tr", "line", (w-off-bl, off, w-off, off, w-off, off+bl), fill=bc, width=bw)
+        scene.item("bracket_bl", "line", (off, h-off-bl, off, h-off, off+bl, h-off), fill=bc, width=bw)
+        scene.item("bracket_br", "line", (w-off-bl, h-off, w-off, h-off, w-off, h-off-bl), fill=bc, width=bw)
     
     def create_nav_buttons(self):
         icon_size = s(250)
@@ -678,12 +785,13 @@ class VTOGestureScreen(tk.Frame):
     def __init__(self, parent, controller):
         super().__init__(parent, bg="#0a0a0a")
         self.controller = controller
-        self.cap = None
         self.is_running = False
-        self.detector = None
+        self.worker = None
+        self.scheduler = FrameScheduler(self, self.update_camera, target_fps=TARGET_FPS)
         
         self.clothes = ["Classic Blazer", "Denim Jacket", "Casual Shirt"]
         self.selected_index = 0
+        self.last_swipe_time = 0.0  # monotonic; hover diabaikan SWIPE_HOVER_HOLD detik setelahnya
         
         # Load Icons (Pastikan Anda punya icon ini di folder assets)
         # Jika tidak ada, kode akan fallback ke kotak berwarna
@@ -694,65 +802,77 @@ class VTOGestureScreen(tk.Frame):
         self.cw, self.ch = s(1080), s(1920)
         self.bg_canvas = tk.Canvas(self, width=self.cw, height=self.ch, bg="#0a0a0a", highlightthickness=0)
         self.bg_canvas.pack(fill="both", expand=True)
+        self.display = make_camera_display(self.cw, self.ch)
+        self.frame_pool = BufferPool()  # buffer view turunan dipakai ulang di thread Tk
+        # Item canvas dibuat sekali, tiap frame hanya diupdate (coords/itemconfig)
+        self.scene = CanvasScene(self.bg_canvas)
 
     def on_show(self):
         if HAS_CV:
-            self.detector = HandGestureDetector()
+            # Inferensi MediaPipe berjalan di thread worker, loop Tk hanya membaca mailbox
+            self.worker = InferenceWorker(self.controller.camera, make_gesture_detector,
+                                          governor=QUALITY_GOVERNOR, presence=make_presence_monitor(),
+                                          recorder=self.controller.recorder)
             self.is_running = True
-            
-            # --- PERBAIKAN DISINI JUGA (Ganti 0 ke 1) ---
-            self.cap = cv2.VideoCapture(1, cv2.CAP_DSHOW)
-            
-            # Fallback (Jaga-jaga jika index 1 tidak ada)
-            if not self.cap.isOpened():
-                 self.cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-                 
-            self.update_camera()
+            self.controller.camera.subscribe(self)
+            self.worker.start()
+            self.scheduler.start()
             
     def on_hide(self):
+        if self.is_running:
+            print(f"📊 VTO Gesture: {self.scheduler.report()}")
+            print(f"📊 VTO Gesture: {self.worker.report()}")
         self.is_running = False
-        if self.cap: self.cap.release()
-        self.bg_canvas.delete("all")
+        self.scheduler.stop()
+        if self.worker: self.worker.stop()
+        if self.controller.camera: self.controller.camera.unsubscribe(self)
+        self.scene.hide("cursor")
 
     def update_camera(self):
-        if not self.is_running or self.cap is None: return
+        if not self.is_running: return
+
+        # Kiosk kosong (worker idle): preview cukup IDLE_FPS
+        target_fps = IDLE_FPS if self.worker and self.worker.idle else TARGET_FPS
+        if self.scheduler.target_fps != target_fps:
+            self.scheduler.set_target_fps(target_fps)
 
-        ret, frame = self.cap.read()
-        if ret:
-            frame = cv2.flip(frame, 1)
+        latest = self.scheduler.poll(self.controller.camera)
+        if latest:
+            _, _, frame = latest
+            packet = FramePacket(frame, mirror=True, pool=self.frame_pool)
             
-            # 1. Deteksi Gestur
-            cursor_pos = None
+            # 1. Hasil Gestur terbaru dari worker (tidak menunggu model)
             gesture = "none"
-            if self.detector:
-                _, gesture, finger_pos = self.detector.process_frame(frame)
+            finger_pos = None
+            hand_landmarks = None
+            result = self.worker.mailbox.read() if self.worker else None
+            if result:
+                hand_landmarks, gesture, finger_pos = result.points, result.gesture, result.cursor
+                CURSOR_LATENCY.displayed(result.frame_id, result.timestamp)
+            
+            # Swipe (event dari worker, masing-masing dipakai sekali): kanan = berikutnya, seperti perintah suara
+            for event in (self.worker.poll_events() if self.worker else ()):
+                if event == "swipe_right":
+                    self.selected_index = (self.selected_index + 1) % len(self.clothes)
+                    self.last_swipe_time = time.monotonic()
+                elif event == "swipe_left":
+                    self.selected_index = (self.selected_index - 1) % len(self.clothes)
+                    self.last_swipe_time = time.monotonic()
                 
             # 2. Gambar Kamera (Full Screen Crop)
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            img = Image.fromarray(frame_rgb)
-            img_w, img_h = img.size
-            target_w, target_h = self.cw, self.ch
-            scale = max(target_w / img_w, target_h / img_h)
-            new_w, new_h = int(img_w * scale), int(img_h * scale)
-            img = img.resize((new_w, new_h), Image.Resampling.LANCZOS)
-            left = (new_w - target_w) // 2
-            top = (new_h - target_h) // 2
-            img = img.crop((left, top, left + target_w, top + target_h))
+            self.photo = self.display.update(packet, hand_landmarks)
             
             # 3. Transformasi Cursor
-            if finger_pos:
-                fx, fy = finger_pos
-                ui_x = (fx * scale) - left
-                ui_y = (fy * scale) - top
-                cursor_pos = (ui_x, ui_y)
+            cursor_pos = self.display.map_point(finger_pos)
             
-            self.photo = ImageTk.PhotoImage(img)
-            self.bg_canvas.create_image(0, 0, image=self.photo, anchor="nw")
+            self.scene.begin_frame()
+            self.scene.item("camera", "image", (0, 0), image=self.photo, anchor="nw")
             
             # 4. Gambar UI Baru
             self.draw_modern_ui(gesture, cursor_pos)
             
-        self.after(33, self.update_camera)
+            # Setelah frame pertama jumlah item canvas dikunci (tidak bertambah lagi)
+            self.scene.freeze()
 
     def draw_modern_ui(self, gesture, cursor_pos):
         # --- A. TOMBOL SIDEBAR (KANAN ATAS) ---
@@ -767,9 +887,9 @@ class VTOGestureScreen(tk.Frame):
         btn_shirt_x2 = btn_shirt_x1 + btn_size
         btn_shirt_y2 = btn_shirt_y1 + btn_size
         
-        self.draw_rounded_rect(self.bg_canvas, btn_shirt_x1, btn_shirt_y1, btn_shirt_x2, btn_shirt_y2, s(30), fill="#2d2d44", outline="#4a4a6a", width=0)
+        self.scene.rounded_rect("btn_shirt", btn_shirt_x1, btn_shirt_y1, btn_shirt_x2, btn_shirt_y2, s(30), fill="#2d2d44", outline="#4a4a6a", width=0)
         if self.icon_shirt:
-            self.bg_canvas.create_image((btn_shirt_x1+btn_shirt_x2)//2, (btn_shirt_y1+btn_shirt_y2)//2, image=self.icon_shirt)
+            self.scene.item("icon_shirt", "image", ((btn_shirt_x1+btn_shirt_x2)//2, (btn_shirt_y1+btn_shirt_y2)//2), image=self.icon_shirt)
 
         # Tombol Exit (Merah Kecoklatan)
         btn_exit_x1 = btn_shirt_x1
@@ -777,9 +897,9 @@ class VTOGestureScreen(tk.Frame):
         btn_exit_x2 = btn_exit_x1 + btn_size
         btn_exit_y2 = btn_exit_y1 + btn_size
         
-        self.draw_rounded_rect(self.bg_canvas, btn_exit_x1, btn_exit_y1, btn_exit_x2, btn_exit_y2, s(30), fill="#442d2d", outline="#6a4a4a", width=0)
+        self.scene.rounded_rect("btn_exit", btn_exit_x1, btn_exit_y1, btn_exit_x2, btn_exit_y2, s(30), fill="#442d2d", outline="#6a4a4a", width=0)
         if self.icon_exit:
-            self.bg_canvas.create_image((btn_exit_x1+btn_exit_x2)//2, (btn_exit_y1+btn_exit_y2)//2, image=self.icon_exit)
+            self.scene.item("icon_exit", "image", ((btn_exit_x1+btn_exit_x2)//2, (btn_exit_y1+btn_exit_y2)//2), image=self.icon_exit)
 
         # --- B. AREA BAWAH (GRADASI GELAP) ---
         # Kita buat kotak semi-transparan di bawah untuk menampung kartu (simulasi gradasi)
@@ -789,7 +909,7 @@ class VTOGestureScreen(tk.Frame):
         # self.bg_canvas.create_rectangle(0, panel_y, self.cw, self.ch, fill="#0a0a0a", outline="") # Opsional jika mau background penuh
         
         # Text "Swipe to change"
-        self.bg_canvas.create_text(self.cw//2, panel_y + s(50), text="Swipe to change", font=("Arial", s(20)), fill="white")
+        self.scene.item("swipe_text", "text", (self.cw//2, panel_y + s(50)), text="Swipe to change", font=("Arial", s(20)), fill="white")
 
         # --- C. KARTU BAJU ---
         card_w, card_h = s(280), s(320)
@@ -797,6 +917,8 @@ class VTOGestureScreen(tk.Frame):
         total_w = (card_w * 3) + (card_gap * 2)
         start_x = (self.cw - total_w) // 2
         card_start_y = panel_y + s(100)
+        # Pilihan hasil swipe tidak langsung ditimpa hover
+        hover_select = time.monotonic() - self.last_swipe_time >= SWIPE_HOVER_HOLD
         
         for i, name in enumerate(self.clothes):
             x = start_x + (i * (card_w + card_gap))
@@ -812,7 +934,7 @@ class VTOGestureScreen(tk.Frame):
             if cursor_pos:
                 cx, cy = cursor_pos
                 # Hover detection
-                if x < cx < x+card_w and y < cy < y+card_h:
+                if hover_select and x < cx < x+card_w and y < cy < y+card_h:
                     if gesture == "selecting" or gesture == "pointing":
                         self.selected_index = i
                 
@@ -822,21 +944,18 @@ class VTOGestureScreen(tk.Frame):
                         self.controller.show_screen("HomeScreen")
 
             # Gambar Kartu
-            self.draw_rounded_rect(self.bg_canvas, x, y, x+card_w, y+card_h, s(20), fill=fill_col, outline=border_col, width=border_w)
+            self.scene.rounded_rect(f"card_{i}", x, y, x+card_w, y+card_h, s(20), fill=fill_col, outline=border_col, width=border_w)
             
             # Label Nama
-            self.bg_canvas.create_text(x + card_w//2, y + card_h + s(30), text=name, font=("Arial", s(16), "bold"), fill="white")
+            self.scene.item(f"card_label_{i}", "text", (x + card_w//2, y + card_h + s(30)), text=name, font=("Arial", s(16), "bold"), fill="white")
 
         # --- D. CURSOR ---
-        if cursor_pos:
-            cx, cy = cursor_pos
-            cr = s(15)
-            cc = "#00ff00" if gesture == "pointing" else ("#ffff00" if gesture == "selecting" else "#ff0000")
-            self.bg_canvas.create_oval(cx-cr, cy-cr, cx+cr, cy+cr, fill=cc, outline="white", width=2)
-
-    def draw_rounded_rect(self, canvas, x1, y1, x2, y2, radius, **kwargs):
-        points = [x1+radius, y1, x2-radius, y1, x2, y1, x2, y1+radius, x2, y2-radius, x2, y2, x2-radius, y2, x1+radius, y2, x1, y2, x1, y2-radius, x1, y1+radius, x1, y1]
-        return canvas.create_polygon(points, **kwargs, smooth=True)
+        # Cursor selalu ada di scene, disembunyikan jika tangan tidak terdeteksi
+        cx, cy = cursor_pos if cursor_pos else (0, 0)
+        cr = s(15)
+        cc = "#00ff00" if gesture == "pointing" else ("#ffff00" if gesture == "selecting" else "#ff0000")
+        self.scene.item("cursor", "oval", (cx-cr, cy-cr, cx+cr, cy+cr), fill=cc, outline="white", width=2,
+                        state="normal" if cursor_pos else "hidden")
 
     def load_icon(self, icon_name, target_size):
         try:
@@ -975,8 +1094,8 @@ class VTOVoiceScreen(tk.Frame):
         self.selected_index = 0
         
         # Variabel Kamera
-        self.cap = None
         self.is_camera_running = False
+        self.scheduler = FrameScheduler(self, self.update_camera, target_fps=TARGET_FPS)
         self.cam_image_id = None 
         self.photo = None # Simpan referensi agar tidak di-garbage collect
         
@@ -995,6 +1114,8 @@ class VTOVoiceScreen(tk.Frame):
         self.cw, self.ch = s(1080), s(1920)
         self.canvas = tk.Canvas(self, width=self.cw, height=self.ch, bg="#0a0a0a", highlightthickness=0)
         self.canvas.pack(fill="both", expand=True)
+        self.display = make_camera_display(self.cw, self.ch)
+        self.frame_pool = BufferPool()  # buffer view turunan dipakai ulang di thread Tk
 
         # Init UI
         self.draw_ui()
@@ -1026,21 +1147,11 @@ class VTOVoiceScreen(tk.Frame):
         """Dipanggil saat layar ditampilkan"""
         print("📸 Membuka Kamera untuk Voice Mode...")
         
-        # 1. Mulai Kamera
+        # 1. Mulai Kamera (dibagi dengan screen lain lewat CameraService)
         if HAS_CV:
             self.is_camera_running = True
-            # Prioritas: Coba 0 dulu (Laptop), kalau gagal baru 1 (USB)
-            # Ubah urutan ini jika kamu pakai kamera eksternal sebagai utama
-            self.cap = cv2.VideoCapture(0, cv2.CAP_DSHOW) 
-            if not self.cap.isOpened():
-                print("⚠️ Kamera 0 gagal, mencoba kamera 1...")
-                self.cap = cv2.VideoCapture(1, cv2.CAP_DSHOW)
-            
-            if self.cap.isOpened():
-                print("✅ Kamera Berhasil Dibuka!")
-                self.update_camera()
-            else:
-                print("❌ ERROR: Tidak ada kamera yang terdeteksi!")
+            self.controller.camera.subscribe(self)
+            self.scheduler.start()
 
         # 2. Mulai Voice Listener
         self.is_listening = True
@@ -1054,37 +1165,23 @@ class VTOVoiceScreen(tk.Frame):
         """Dipanggil saat pindah ke layar lain"""
         self.is_listening = False
         self.is_camera_running = False
-        if self.cap and self.cap.isOpened():
-            self.cap.release()
-            print("📸 Kamera Voice Mode Ditutup.")
+        self.scheduler.stop()
+        if self.controller.camera:
+            self.controller.camera.unsubscribe(self)
 
     def update_camera(self):
         """Looping untuk update gambar kamera ke Canvas"""
-        if not self.is_camera_running or self.cap is None:
+        if not self.is_camera_running:
             return
 
-        ret, frame = self.cap.read()
-        if ret:
-            # 1. Flip & Convert Color
-            frame = cv2.flip(frame, 1)
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            img = Image.fromarray(frame_rgb)
-            
-            # 2. Resize & Crop (Agar Full Screen)
-            img_w, img_h = img.size
-            target_w, target_h = self.cw, self.ch
-            scale = max(target_w / img_w, target_h / img_h)
-            new_w, new_h = int(img_w * scale), int(img_h * scale)
+        latest = self.scheduler.poll(self.controller.camera)
+        if latest:
+            _, _, frame = latest
+            # 1. Packet (mirror dilakukan di dalam remap display)
+            packet = FramePacket(frame, mirror=True, pool=self.frame_pool)
             
-            img = img.resize((new_w, new_h), Image.Resampling.LANCZOS)
-            
-            # Crop Center
-            left = (new_w - target_w) // 2
-            top = (new_h - target_h) // 2
-            img = img.crop((left, top, left + target_w, top + target_h))
-            
-            # 3. Update ke Canvas
-            self.photo = ImageTk.PhotoImage(img)
+            # 2. Crop, Scale & Convert ke PhotoImage yang sama (diupdate in-place)
+            self.photo = self.display.update(packet)
             
             if self.cam_image_id is None:
                 # Buat image item baru dengan tag "cam"
@@ -1099,9 +1196,6 @@ class VTOVoiceScreen(tk.Frame):
             # Pastikan UI ("ui_element") selalu di paling atas
             self.canvas.tag_raise("ui_element")
 
-        # Ulangi setiap 33ms (~30 FPS)
-        self.after(33, self.update_camera)
-
     def draw_ui(self):
         """Menggambar UI (Tombol & Teks)"""
         self.canvas.delete("ui_element") # Hapus UI lama, JANGAN hapus kamera